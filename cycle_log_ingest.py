@@ -0,0 +1,245 @@
+"""Chunked ingestion of per-cycle field logs into a calibrated cycle time table.
+
+Fleet management exports (CSV, one row per loading cycle) are read in fixed-size
+chunks and folded into fixed-bin histograms per digger / truck model. Histograms
+add up, so a new day's log is merged into the saved state without touching the
+history, and memory stays bounded by (models x bins) however long the logs are.
+Median, percentiles and trimmed mean come from the histograms. Example:
+
+    python cycle_log_ingest.py logs/2024-05-*.csv
+    python cycle_log_ingest.py logs/2024-06-01.csv   # hanya file baru yang diproses
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from match_factor_engine import CALIBRATED_CYCLE_TIME_CSV, CYCLE_TIME_CSV, DATA_DIR
+
+DEFAULT_STATE_PATH = os.path.join(DATA_DIR, 'cycle_log_state.npz')
+DEFAULT_TRUCK_SPEED_CSV = os.path.join(DATA_DIR, 'truck speed calibrated.csv')
+LOG_STATE_VERSION = 1
+
+# Histogram per field: (batas bawah, batas atas, lebar bin); nilai di luar rentang masuk bin tepi
+LOG_FIELDS = {
+    'cycle_time': (0.0, 300.0, 0.1),  # detik per swing cycle digger
+    'efficiency': (0.0, 1.0, 0.001),
+    'speed_loaded': (0.0, 100.0, 0.1),  # km/h
+    'speed_empty': (0.0, 100.0, 0.1),  # km/h
+}
+# Model mana yang memiliki field tersebut
+FIELD_OWNER = {'cycle_time': 'digger', 'efficiency': 'digger', 'speed_loaded': 'truck', 'speed_empty': 'truck'}
+
+# Nama kolom yang dikenali di file log (huruf besar/kecil diabaikan)
+COLUMN_ALIASES = {
+    'digger': ('digger', 'excavator', 'loader', 'loader_model'),
+    'truck': ('truck', 'hauler', 'truck_model'),
+    'cycle_time': ('cycle_time', 'cycle_time_s', 'swing_cycle', 'digger_cycle_time'),
+    'efficiency': ('efficiency', 'operator_efficiency', 'eff'),
+    'speed_loaded': ('speed_loaded', 'loaded_speed', 'speed_full'),
+    'speed_empty': ('speed_empty', 'empty_speed', 'return_speed'),
+}
+
+def _n_bins(field):
+    low, high, width = LOG_FIELDS[field]
+    return int(round((high - low) / width))
+
+def empty_state():
+    """Fresh ingestion state: no files, no models"""
+    return {
+        'files': {},
+        'models': {'digger': [], 'truck': []},
+        'hist': {field: np.zeros((0, _n_bins(field)), dtype=np.int64) for field in LOG_FIELDS},
+    }
+
+def load_log_state(path=DEFAULT_STATE_PATH):
+    """Load the saved state, or an empty one if the file is missing or from an older version"""
+    if not os.path.exists(path):
+        return empty_state()
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta.get('version') != LOG_STATE_VERSION:
+            return empty_state()
+        return {
+            'files': meta['files'],
+            'models': meta['models'],
+            'hist': {field: data[f'hist_{field}'] for field in LOG_FIELDS},
+        }
+
+def save_log_state(state, path=DEFAULT_STATE_PATH):
+    """Write the state atomically (temp file + rename)"""
+    meta = {'version': LOG_STATE_VERSION, 'files': state['files'], 'models': state['models']}
+    tmp_path = path + '.tmp.npz'
+    np.savez_compressed(
+        tmp_path, meta=np.array(json.dumps(meta)),
+        **{f'hist_{field}': hist for field, hist in state['hist'].items()}
+    )
+    os.replace(tmp_path, path)
+
+def _file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _resolve_columns(columns):
+    """Map canonical field names to the log's actual column names"""
+    lookup = {str(col).strip().lower(): col for col in columns}
+    resolved = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                resolved[field] = lookup[alias]
+                break
+    return resolved
+
+def _model_rows(state, kind, names):
+    """Row index per model name in the state's histograms, adding new models as needed"""
+    known = {name: i for i, name in enumerate(state['models'][kind])}
+    uniques, codes = np.unique(names, return_inverse=True)
+    new = [name for name in uniques if name not in known]
+    if new:
+        state['models'][kind].extend(new)
+        known.update({name: len(known) + k for k, name in enumerate(new)})
+        for field, owner in FIELD_OWNER.items():
+            if owner == kind:
+                hist = state['hist'][field]
+                pad = np.zeros((len(new), hist.shape[1]), dtype=np.int64)
+                state['hist'][field] = np.vstack([hist, pad])
+    rows = np.array([known[name] for name in uniques], dtype=np.int64)
+    return rows[codes]
+
+def ingest_chunk(state, chunk):
+    """Fold one DataFrame chunk of log rows into the state's histograms (in place)"""
+    columns = _resolve_columns(chunk.columns)
+    for field, owner in FIELD_OWNER.items():
+        if field not in columns or owner not in columns:
+            continue
+        values = pd.to_numeric(chunk[columns[field]], errors='coerce').to_numpy(dtype=float)
+        owners = chunk[columns[owner]]
+        names = owners.astype(str).str.strip().to_numpy(dtype=object)
+        # Nilai kosong / tidak positif dianggap record rusak
+        valid = np.isfinite(values) & (values > 0) & owners.notna().to_numpy() & (names != '')
+        if not valid.any():
+            continue
+        rows = _model_rows(state, owner, names[valid].astype(str))
+        low, _, width = LOG_FIELDS[field]
+        n_bins = _n_bins(field)
+        bins = np.clip(((values[valid] - low) / width).astype(np.int64), 0, n_bins - 1)
+        hist = state['hist'][field]
+        counts = np.bincount(rows * n_bins + bins, minlength=hist.size)
+        hist += counts.reshape(hist.shape)
+
+def ingest_cycle_logs(paths, state_path=DEFAULT_STATE_PATH, chunksize=500_000):
+    """Ingest log CSVs not yet in the state (by content hash) and save the updated state.
+
+    Returns (state, ingested_paths).
+    """
+    state = load_log_state(state_path)
+    ingested = []
+    for path in paths:
+        digest = _file_digest(path)
+        if digest in state['files']:
+            continue
+        rows = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize, encoding='utf-8-sig', low_memory=False):
+            ingest_chunk(state, chunk)
+            rows += len(chunk)
+        state['files'][digest] = {'path': os.path.abspath(path), 'rows': rows}
+        # Simpan per file: bila proses terhenti, file yang sudah selesai tidak diulang
+        save_log_state(state, state_path)
+        ingested.append(path)
+    return state, ingested
+
+def histogram_stats(hist, field, percentiles=(10, 50, 90), trim=0.1):
+    """Count, percentiles, mean and trimmed mean per histogram row (bin centres; resolution = bin width)"""
+    low, _, width = LOG_FIELDS[field]
+    hist = np.asarray(hist, dtype=float)
+    centres = low + (np.arange(hist.shape[1]) + 0.5) * width
+    count = hist.sum(axis=1)
+    cdf = np.cumsum(hist, axis=1)
+    safe = np.where(count > 0, count, 1.0)
+    stats = {'n': count.astype(np.int64)}
+    for p in percentiles:
+        idx = (cdf < (p / 100.0) * safe[:, None]).sum(axis=1)
+        stats[f'p{p:g}'] = np.where(count > 0, centres[np.minimum(idx, len(centres) - 1)], np.nan)
+    stats['mean'] = np.where(count > 0, hist @ centres / safe, np.nan)
+    # Trimmed mean: buang massa `trim` dari masing-masing ujung, termasuk sebagian bin batas
+    lower, upper = trim * safe[:, None], (1 - trim) * safe[:, None]
+    kept = np.clip(np.minimum(cdf, upper) - np.maximum(cdf - hist, lower), 0, None)
+    kept_total = kept.sum(axis=1)
+    stats['trimmed_mean'] = np.where(kept_total > 0, kept @ centres / np.where(kept_total > 0, kept_total, 1.0), np.nan)
+    return stats
+
+def summarize_log_state(state, percentiles=(10, 50, 90), trim=0.1):
+    """Per-model robust statistics as (digger_stats, truck_stats) DataFrames indexed by model"""
+    tables = {}
+    for kind in ('digger', 'truck'):
+        columns = {}
+        for field, owner in FIELD_OWNER.items():
+            if owner != kind:
+                continue
+            for stat, values in histogram_stats(state['hist'][field], field, percentiles, trim).items():
+                columns[f'{field}_{stat}'] = values
+        tables[kind] = pd.DataFrame(columns, index=pd.Index(state['models'][kind], name=kind))
+    return tables['digger'], tables['truck']
+
+def write_calibrated_cycle_time(state, output_path=CALIBRATED_CYCLE_TIME_CSV, base_path=CYCLE_TIME_CSV,
+                                min_samples=30, truck_output_path=DEFAULT_TRUCK_SPEED_CSV):
+    """Write the calibrated cycle time table in the 'data cycle time.csv' layout.
+
+    Cycle_time and Efficiency become the per-model medians where a model has at
+    least min_samples records; other diggers keep their base values. Bucket_capacity
+    and Product_type are carried over from base_path, so diggers that only appear in
+    the logs are left out (listed in attrs['unmatched']). Percentile, trimmed-mean and
+    count columns are appended (the catalog loader ignores them). Truck speed
+    statistics go to truck_output_path. Returns the digger table.
+    """
+    digger_stats, truck_stats = summarize_log_state(state)
+    base = pd.read_csv(base_path, encoding='utf-8-sig')
+    base.columns = base.columns.astype(str).str.strip()
+    base['Digger'] = base['Digger'].astype(str).str.strip()
+    table = base.set_index('Digger')
+
+    stats = digger_stats.reindex(table.index)
+    for field, column in (('cycle_time', 'Cycle_time'), ('efficiency', 'Efficiency')):
+        n = stats[f'{field}_n'].fillna(0).astype(np.int64)
+        table[column] = np.where(n >= min_samples, stats[f'{field}_p50'].round(4), table[column])
+        for stat in ('p10', 'p90', 'trimmed_mean'):
+            table[f'{column}_{stat}'] = stats[f'{field}_{stat}'].round(4)
+        table[f'{column}_n'] = n
+    table.reset_index().to_csv(output_path, index=False)
+    table.attrs['unmatched'] = list(digger_stats.index.difference(base['Digger']))
+
+    if truck_output_path and len(truck_stats):
+        truck_stats.round(4).rename_axis('Truck').reset_index().to_csv(truck_output_path, index=False)
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest field cycle logs and write a calibrated cycle time table.")
+    parser.add_argument('logs', nargs='*', help="Per-cycle log CSVs (files already ingested are skipped)")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="Histogram state file (NPZ)")
+    parser.add_argument('-o', '--output', default=CALIBRATED_CYCLE_TIME_CSV, help="Calibrated cycle time CSV")
+    parser.add_argument('--truck-output', default=DEFAULT_TRUCK_SPEED_CSV, help="Truck speed statistics CSV")
+    parser.add_argument('--base', default=CYCLE_TIME_CSV, help="Hand-maintained cycle time CSV to start from")
+    parser.add_argument('--chunksize', type=int, default=500_000, help="Rows per chunk (default: 500000)")
+    parser.add_argument('--min-samples', type=int, default=30, help="Minimum records before a model is recalibrated")
+    args = parser.parse_args(argv)
+
+    state, ingested = ingest_cycle_logs(args.logs, args.state, args.chunksize)
+    table = write_calibrated_cycle_time(state, args.output, args.base, args.min_samples, args.truck_output)
+    total_rows = sum(info['rows'] for info in state['files'].values())
+    print(f"{len(ingested)} file baru diproses ({len(state['files'])} total, {total_rows} record); "
+          f"{len(table)} digger ditulis ke {args.output}", file=sys.stderr)
+    if table.attrs['unmatched']:
+        print("Digger tanpa data bucket di tabel dasar (dilewati): " + ", ".join(table.attrs['unmatched']),
+              file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
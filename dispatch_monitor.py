@@ -0,0 +1,365 @@
+"""Live rolling match factor per loader from a dispatch event feed.
+
+Events are newline-delimited, either JSON ({"ts": 1717200000.5, "event": "load",
+"truck": "DT-12", "loader": "EX-01"}) or CSV (ts,event,truck,loader). Event types:
+
+    arrive  truck tiba di loader (mulai antre)
+    load    loading selesai, truck berangkat bermuatan
+    dump    truck selesai dumping (loader boleh kosong)
+
+Every completed load yields one sample per loader: loading time (from the later of
+the truck's arrival and the previous load end), queue wait and the truck's cycle
+since its previous load, excluding the wait, which matches the cycle definition in
+calculate_match_factor. Samples sit in a time window with running sums, so each
+event is O(1) amortised. Live MF = active trucks x mean loading time / mean cycle.
+The feed is tailed from a growing file or read from a local TCP socket with
+asyncio; the dashboard reads snapshot() from the in-memory monitor. Example:
+
+    python dispatch_monitor.py --file dispatch.log --window 3600
+    python dispatch_monitor.py --port 9300
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from match_factor_engine import calculate_match_factor
+
+MONITOR_EVENTS = ('arrive', 'load', 'dump')
+# Sampel loading lebih lama dari ini (jam) dianggap loader berhenti, bukan loading
+MAX_LOADING_HOURS = 0.5
+
+def parse_event(line):
+    """Parse one feed line into (ts_seconds, event, truck, loader); None if unusable"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    try:
+        if line[0] == '{':
+            record = json.loads(line)
+            ts, event = record.get('ts'), record.get('event')
+            truck, loader = record.get('truck'), record.get('loader')
+        else:
+            parts = [part.strip() for part in line.split(',')]
+            ts, event, truck = parts[0], parts[1], parts[2]
+            loader = parts[3] if len(parts) > 3 else None
+        if isinstance(ts, str):
+            try:
+                ts = float(ts)
+            except ValueError:
+                ts = datetime.fromisoformat(ts).timestamp()
+        ts = time.time() if ts is None else float(ts)
+    except (ValueError, IndexError, TypeError, AttributeError):
+        return None
+    event = str(event).lower() if event is not None else None
+    if event not in MONITOR_EVENTS or not truck:
+        return None
+    return ts, event, str(truck), (str(loader) if loader else None)
+
+# Komponen per sampel load (jam): loading, antre, load->dump (haul + dumping),
+# dump->arrive (return + spotting) dan cycle truck tanpa waktu antre
+WINDOW_COMPONENTS = ('loading_time', 'queue_time', 'haul_loaded_time', 'haul_empty_time', 'cycle_time')
+
+class _LoaderWindow:
+    """Rolling window of load samples for one loader with running sums per component"""
+    __slots__ = ('samples', 'sums', 'counts', 'trucks', 'last_load_ts')
+
+    def __init__(self):
+        self.samples = deque()
+        self.sums = [0.0] * len(WINDOW_COMPONENTS)
+        self.counts = [0] * len(WINDOW_COMPONENTS)
+        self.trucks = {}
+        self.last_load_ts = None
+
+    def add(self, ts, truck, values):
+        self.samples.append((ts, truck, values))
+        for i, value in enumerate(values):
+            if value is not None:
+                self.sums[i] += value
+                self.counts[i] += 1
+        self.trucks[truck] = self.trucks.get(truck, 0) + 1
+
+    def evict(self, cutoff):
+        samples = self.samples
+        while samples and samples[0][0] < cutoff:
+            _, truck, values = samples.popleft()
+            for i, value in enumerate(values):
+                if value is not None:
+                    self.sums[i] -= value
+                    self.counts[i] -= 1
+            count = self.trucks[truck] - 1
+            if count:
+                self.trucks[truck] = count
+            else:
+                del self.trucks[truck]
+
+    def mean(self, i):
+        return self.sums[i] / self.counts[i] if self.counts[i] else float('nan')
+
+class LiveMatchFactorMonitor:
+    """Rolling-window cycle components and live MF per loader.
+
+    process_event() is O(1) amortised; snapshot() is O(loaders). Times in the
+    snapshot are in hours, like calculate_match_factor. set_plan() attaches the
+    planned scenario (per loader, or the default for all loaders) and the snapshot
+    then reports plan MF and the deviation. set_window() changes the window in place;
+    samples already evicted by a shorter window are not recovered.
+    """
+
+    def __init__(self, window_seconds=3600.0):
+        self.window_seconds = float(window_seconds)
+        self.loaders = {}
+        self.truck_arrive = {}
+        self.truck_load = {}
+        self.truck_dump = {}
+        self.plans = {}
+        self.accepted = 0
+        self.rejected = 0
+        self.latest_ts = None
+        # Kegagalan feed di thread latar belakang (bind port, baca file), dibaca oleh dashboard
+        self.error = None
+        self.lock = threading.Lock()
+
+    def set_window(self, window_seconds):
+        """Change the rolling window; the next snapshot evicts samples outside it"""
+        with self.lock:
+            self.window_seconds = float(window_seconds)
+
+    def set_plan(self, excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                 job_condition='Average', reposition_time=20, loader_id=None):
+        """Attach the planned scenario; loader_id=None sets the default for all loaders"""
+        plan = calculate_match_factor(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                                      job_condition, reposition_time)
+        with self.lock:
+            self.plans[loader_id] = plan
+        return plan
+
+    def process_event(self, ts, event, truck, loader=None):
+        """Update state for one event"""
+        with self.lock:
+            self._process(ts, event, truck, loader)
+
+    def process_lines(self, lines):
+        """Parse and apply a batch of feed lines under one lock acquisition"""
+        with self.lock:
+            for line in lines:
+                if not line.strip():
+                    continue
+                parsed = parse_event(line)
+                if parsed is None:
+                    self.rejected += 1
+                else:
+                    self._process(*parsed)
+
+    def _process(self, ts, event, truck, loader):
+        if event == 'load' and loader is None:
+            self.rejected += 1  # load tanpa loader tidak bisa dihitung
+            return
+        self.accepted += 1
+        if self.latest_ts is None or ts > self.latest_ts:
+            self.latest_ts = ts
+        if event == 'arrive':
+            self.truck_arrive[truck] = ts
+        elif event == 'dump':
+            self.truck_dump[truck] = ts
+        else:
+            window = self.loaders.get(loader)
+            if window is None:
+                window = self.loaders[loader] = _LoaderWindow()
+            arrive = self.truck_arrive.pop(truck, None)
+            dump = self.truck_dump.pop(truck, None)
+            last_load = self.truck_load.get(truck)
+            previous_end = window.last_load_ts
+            # Loader melayani satu truck: loading mulai saat truck tiba atau loading sebelumnya selesai
+            starts = [t for t in (arrive, previous_end) if t is not None and t <= ts]
+            start = max(starts) if starts else None
+            loading = (ts - start) / 3600.0 if start is not None else None
+            if loading is not None and loading > MAX_LOADING_HOURS:
+                loading = None
+            queue = max(start - arrive, 0.0) / 3600.0 if arrive is not None and start is not None else 0.0
+            cycle = (ts - last_load) / 3600.0 - queue if last_load is not None and last_load < ts else None
+            haul_loaded = (dump - last_load) / 3600.0 if dump is not None and last_load is not None and last_load <= dump else None
+            haul_empty = (arrive - dump) / 3600.0 if dump is not None and arrive is not None and dump <= arrive else None
+            window.add(ts, truck, (loading, queue, haul_loaded, haul_empty, cycle))
+            window.last_load_ts = ts
+            self.truck_load[truck] = ts
+        cutoff = self.latest_ts - self.window_seconds
+        if loader is not None and loader in self.loaders:
+            self.loaders[loader].evict(cutoff)
+
+    def snapshot(self):
+        """Current per-loader values as a DataFrame indexed by loader"""
+        with self.lock:
+            rows = []
+            cutoff = (self.latest_ts or 0.0) - self.window_seconds
+            hours = self.window_seconds / 3600.0
+            for loader_id, window in self.loaders.items():
+                window.evict(cutoff)
+                loads = len(window.samples)
+                active = len(window.trucks)
+                row = {
+                    'loader': loader_id,
+                    'active_trucks': active,
+                    'loads': loads,
+                    'loads_per_hour': loads / hours if hours > 0 else float('nan'),
+                }
+                for i, component in enumerate(WINDOW_COMPONENTS):
+                    row[component] = window.mean(i)
+                # Definisi sama dengan calculate_match_factor: N x loading / cycle
+                row['match_factor'] = active * row['loading_time'] / row['cycle_time']
+                plan = self.plans.get(loader_id, self.plans.get(None))
+                if plan is not None:
+                    row['plan_match_factor'] = plan['match_factor']
+                    row['plan_loading_time'] = plan['loading_cycle_truck']
+                    row['plan_cycle_time'] = plan['total_cycle_time']
+                    row['mf_deviation'] = row['match_factor'] - plan['match_factor']
+                rows.append(row)
+            return pd.DataFrame(rows).set_index('loader') if rows else pd.DataFrame()
+
+    def stats(self):
+        """Accepted and rejected event counts (disjoint), loaders seen and latest event time"""
+        with self.lock:
+            return {'accepted': self.accepted, 'rejected': self.rejected, 'loaders': len(self.loaders),
+                    'latest_ts': self.latest_ts}
+
+async def tail_file(path, monitor, from_start=False, poll_interval=0.2, stop=None, read_size=1 << 20):
+    """Follow a growing log file like `tail -F`, feeding complete lines to the monitor.
+
+    Reads at most read_size bytes per step and carries the unfinished last line over
+    to the next read, so a large backlog never sits in memory at once. A line longer
+    than read_size is dropped (counted as rejected). Truncation or rotation (file
+    shorter than the read position) restarts from the beginning. Runs until stop
+    (an asyncio.Event) is set.
+    """
+    position = None
+    pending = b''
+    discarding = False  # sedang membuang sisa baris yang terlalu panjang
+    while stop is None or not stop.is_set():
+        try:
+            with open(path, 'rb') as fh:
+                fh.seek(0, 2)
+                size = fh.tell()
+                if position is None:
+                    position = 0 if from_start else size
+                if size < position:
+                    position, pending, discarding = 0, b'', False
+                fh.seek(position)
+                chunk = fh.read(read_size)
+                position = fh.tell()
+        except FileNotFoundError:
+            chunk = b''
+        if not chunk:
+            await asyncio.sleep(poll_interval)
+            continue
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()  # baris terakhir mungkin belum lengkap
+        if discarding and lines:
+            lines.pop(0)
+            discarding = False
+        if len(pending) > read_size:
+            pending = b''
+            if not discarding:
+                discarding = True
+                with monitor.lock:
+                    monitor.rejected += 1
+        monitor.process_lines([line.decode('utf-8', errors='replace') for line in lines])
+        await asyncio.sleep(0)  # beri giliran ke task lain di antara chunk
+
+async def serve_feed(monitor, host='127.0.0.1', port=9300):
+    """Accept newline-delimited events on a local TCP socket"""
+    async def handle(reader, writer):
+        pending = ''
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                lines = (pending + data.decode('utf-8', errors='replace')).split('\n')
+                pending = lines.pop()
+                monitor.process_lines(lines)
+        finally:
+            writer.close()
+    return await asyncio.start_server(handle, host, port)
+
+def start_background_monitor(path=None, port=None, host='127.0.0.1', window_seconds=3600.0, from_start=False):
+    """Run a monitor on its own event loop in a daemon thread and return it.
+
+    The caller (e.g. the dashboard) reads monitor.snapshot() directly; nothing is
+    re-read from disk. Startup failures (e.g. the port is already bound) are raised
+    here; a feed that fails later is stored in monitor.error.
+    """
+    monitor = LiveMatchFactorMonitor(window_seconds)
+    ready = threading.Event()
+
+    def record_failure(task):
+        if not task.cancelled() and task.exception() is not None:
+            monitor.error = task.exception()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            if port is not None:
+                loop.run_until_complete(serve_feed(monitor, host, port))
+        except OSError as exc:
+            monitor.error = exc
+            ready.set()
+            loop.close()
+            return
+        if path:
+            loop.create_task(tail_file(path, monitor, from_start=from_start)).add_done_callback(record_failure)
+        # Dijadwalkan setelah langkah pertama tail_file, jadi posisi awal file sudah tercatat
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    threading.Thread(target=run, name='dispatch-monitor', daemon=True).start()
+    if not ready.wait(timeout=5):
+        raise TimeoutError("Monitor dispatch tidak siap dalam 5 detik")
+    if monitor.error is not None:
+        raise monitor.error
+    return monitor
+
+async def _report(monitor, interval):
+    while True:
+        await asyncio.sleep(interval)
+        snapshot = monitor.snapshot()
+        stats = monitor.stats()
+        print(f"{stats['accepted']} event diterima ({stats['rejected']} ditolak), {stats['loaders']} loader", file=sys.stderr)
+        if len(snapshot):
+            print(snapshot.round(3).to_string(), file=sys.stderr)
+
+async def _run(args):
+    monitor = LiveMatchFactorMonitor(args.window)
+    tasks = [asyncio.create_task(_report(monitor, args.interval))]
+    if args.port is not None:
+        server = await serve_feed(monitor, args.host, args.port)
+        tasks.append(asyncio.create_task(server.serve_forever()))
+    if args.file:
+        tasks.append(asyncio.create_task(tail_file(args.file, monitor, from_start=args.from_start)))
+    await asyncio.gather(*tasks)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live rolling match factor per loader from a dispatch event feed.")
+    parser.add_argument('--file', help="Event log file to follow")
+    parser.add_argument('--from-start', action='store_true', help="Read the file from the beginning, not just new lines")
+    parser.add_argument('--port', type=int, help="Also accept events on this local TCP port")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--window', type=float, default=3600.0, help="Rolling window in seconds (default: 3600)")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between printed snapshots")
+    args = parser.parse_args(argv)
+    if not args.file and args.port is None:
+        parser.error("--file atau --port wajib diisi")
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Precomputed, memory-mapped optimal-fleet lookup index.
+
+For the ratio model the optimal truck count is
+
+    N* = 1 + (dump + spot + d * (1/v_loaded + 1/v_empty)) / L,   L = a + b * reposition
+
+where a = cycle_time * bucket_pass / (efficiency * 3600) and b = 1 / (efficiency * 3600)
+depend only on the excavator x truck x material triple (job condition does not
+enter N*). The index stores (a, b) per triple, the catalog truck speeds, and for the
+queue model a table of the finite-source optimum over log(loading / time away),
+since loader utilisation depends on that ratio alone. Queries are an array lookup
+plus (for the queue model) linear interpolation; the file is opened with np.memmap
+so worker processes share the OS page cache instead of rebuilding state. Example:
+
+    python fleet_index.py build
+    python fleet_index.py query R9300 HD785-7 Clay 4.5 --model queue
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from match_factor_engine import (
+    DATA_DIR,
+    EQUIPMENT_CSV,
+    EXCAVATOR_FIELDS,
+    MATERIAL_FIELDS,
+    TRUCK_FIELDS,
+    catalog_columns,
+    finite_source_optimum,
+    load_equipment_tables_cached,
+    resolve_cycle_time_path,
+    source_digest,
+)
+
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, 'fleet_index.bin')
+INDEX_MAGIC = b'MFIDX001'
+INDEX_ALIGN = 64
+QUEUE_TARGETS = (0.80, 0.85, 0.90, 0.95)
+# Rentang tabel antrian dalam log(loading / waktu di luar loader); di luar rentang dihitung langsung
+QUEUE_LOG_RATIO_RANGE = (np.log(1e-3), np.log(10.0))
+# Dumping + spotting (jam), sama dengan calculate_optimal_trucks_for_mf1
+FIXED_CYCLE_HOURS = (1.4 + 0.7) / 60
+
+def _triple_coefficients(excavators, trucks, materials):
+    """(a, b) per (excavator, truck, material): loading hours = a + b * reposition_time"""
+    _, exc = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    _, truck = catalog_columns(trucks, TRUCK_FIELDS)
+    _, mat = catalog_columns(materials, MATERIAL_FIELDS)
+    ff = mat['fill_factor'][None, None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bucket_pass = np.ceil(
+            (truck['capacity'][None, :, None] * ff)
+            / (ff * exc['bucket_capacity'][:, None, None] * mat['density_loose'][None, None, :])
+        )
+        per_second = 1.0 / (np.maximum(exc['efficiency'], 1e-6) * 3600.0)
+        a = exc['cycle_time'][:, None, None] * bucket_pass * per_second[:, None, None]
+    b = np.broadcast_to(per_second[:, None, None], a.shape)
+    return np.stack([a, b], axis=-1)
+
+def _catalog_digest(equipment_path=EQUIPMENT_CSV, cycle_time_path=None):
+    """source_digest of the catalog files load_equipment_tables_cached reads for these paths"""
+    return source_digest((equipment_path, resolve_cycle_time_path(cycle_time_path)))
+
+def _data_start(header_length):
+    return -(-(len(INDEX_MAGIC) + 8 + header_length) // INDEX_ALIGN) * INDEX_ALIGN
+
+def build_fleet_index(excavators, trucks, materials, path=DEFAULT_INDEX_PATH, queue_targets=QUEUE_TARGETS,
+                      queue_grid=16384, source_digest=None):
+    """Write the lookup index for a catalog to path (atomically) and return its header.
+
+    source_digest identifies the catalog files the tables came from; it defaults to
+    the digest of the default catalog files, which is what is_stale() checks.
+    """
+    exc_names, _ = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, _ = catalog_columns(materials, MATERIAL_FIELDS)
+    low, high = QUEUE_LOG_RATIO_RANGE
+    log_ratio = np.linspace(low, high, queue_grid)
+    arrays = {
+        'coef': _triple_coefficients(excavators, trucks, materials).astype(np.float64),
+        'truck_speed': np.stack([truck['speed_loaded'], truck['speed_empty']], axis=-1).astype(np.float64),
+        'queue_optimum': np.stack([finite_source_optimum(np.exp(log_ratio), target) for target in queue_targets]),
+    }
+
+    header = {
+        'excavators': [str(name) for name in exc_names],
+        'trucks': [str(name) for name in truck_names],
+        'materials': [str(name) for name in mat_names],
+        'queue_targets': list(queue_targets),
+        'queue_log_ratio': [float(low), float(high), int(queue_grid)],
+        'fixed_cycle_hours': FIXED_CYCLE_HOURS,
+        'source_digest': _catalog_digest() if source_digest is None else source_digest,
+        'arrays': {},
+    }
+    # Offset array relatif terhadap awal blok data (setelah header, rata 64 byte)
+    offset = 0
+    for name, values in arrays.items():
+        header['arrays'][name] = {'offset': offset, 'shape': list(values.shape), 'dtype': values.dtype.str}
+        offset += -(-values.nbytes // INDEX_ALIGN) * INDEX_ALIGN
+    header_bytes = json.dumps(header).encode()
+    data_start = _data_start(len(header_bytes))
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as fh:
+        fh.write(INDEX_MAGIC + len(header_bytes).to_bytes(8, 'little') + header_bytes)
+        for name, values in arrays.items():
+            fh.seek(data_start + header['arrays'][name]['offset'])
+            fh.write(np.ascontiguousarray(values).tobytes())
+        fh.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return header
+
+class FleetLookupIndex:
+    """Read-only, memory-mapped optimal-truck index built by build_fleet_index"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as fh:
+            if fh.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"Bukan file fleet index: {path}")
+            header_length = int.from_bytes(fh.read(8), 'little')
+            self.header = json.loads(fh.read(header_length))
+        data_start = _data_start(header_length)
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        self.arrays = {
+            name: np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=self._map,
+                             offset=data_start + spec['offset'])
+            for name, spec in self.header['arrays'].items()
+        }
+        self.excavator_index = {name: i for i, name in enumerate(self.header['excavators'])}
+        self.truck_index = {name: i for i, name in enumerate(self.header['trucks'])}
+        self.material_index = {name: i for i, name in enumerate(self.header['materials'])}
+        self._name_indexes = tuple(pd.Index(self.header[key], dtype=object) for key in ('excavators', 'trucks', 'materials'))
+        self.queue_targets = {round(target, 6): i for i, target in enumerate(self.header['queue_targets'])}
+        low, high, size = self.header['queue_log_ratio']
+        self._queue_low, self._queue_step, self._queue_size = low, (high - low) / (size - 1), size
+
+    def is_stale(self, equipment_path=EQUIPMENT_CSV, cycle_time_path=None):
+        """True when the catalog files no longer match the ones the index was built from"""
+        return self.header.get('source_digest') != _catalog_digest(equipment_path, cycle_time_path)
+
+    def _queue_optimum(self, ratio, target_utilisation):
+        row = self.queue_targets.get(round(float(target_utilisation), 6))
+        if row is None:
+            return finite_source_optimum(ratio, target_utilisation)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            position = (np.log(ratio) - self._queue_low) / self._queue_step
+        inside = (position >= 0) & (position <= self._queue_size - 1)
+        table = self.arrays['queue_optimum'][row]
+        i = np.clip(np.nan_to_num(position, nan=0.0), 0, self._queue_size - 2).astype(np.int64)
+        w = position - i
+        result = table[i] * (1 - w) + table[i + 1] * w
+        # Rasio di luar rentang tabel (jarang) dihitung langsung
+        outside = ~inside & np.isfinite(ratio) & (ratio > 0)
+        if outside.any():
+            result[outside] = finite_source_optimum(ratio[outside], target_utilisation)
+        return result
+
+    def optimal_trucks_batch(self, excavator, truck, material, haul_distance, speed_loaded=None, speed_empty=None,
+                             reposition_time=20, model='ratio', target_utilisation=0.9):
+        """Vectorized optimal truck counts; names may be scalars or arrays (broadcast together).
+
+        Unknown names give NaN. Speeds default to the catalog truck speeds.
+        """
+        if model not in ('ratio', 'queue'):
+            raise ValueError(f"Model tidak dikenal: {model!r} (pilihan: 'ratio', 'queue')")
+        e, t, m = np.broadcast_arrays(*(
+            index.get_indexer(np.atleast_1d(np.asarray(names, dtype=object)).ravel()).reshape(np.shape(names))
+            for index, names in zip(self._name_indexes, (excavator, truck, material))
+        ))
+        known = (e >= 0) & (t >= 0) & (m >= 0)
+        coef = self.arrays['coef'][np.where(known, e, 0), np.where(known, t, 0), np.where(known, m, 0)]
+        speeds = self.arrays['truck_speed'][np.where(known, t, 0)]
+        speed_loaded = speeds[..., 0] if speed_loaded is None else np.asarray(speed_loaded, dtype=float)
+        speed_empty = speeds[..., 1] if speed_empty is None else np.asarray(speed_empty, dtype=float)
+
+        loading = coef[..., 0] + coef[..., 1] * np.asarray(reposition_time, dtype=float)
+        away = self.header['fixed_cycle_hours'] + np.asarray(haul_distance, dtype=float) * (1.0 / speed_loaded + 1.0 / speed_empty)
+        if model == 'ratio':
+            optimum = 1.0 + away / loading
+        else:
+            ratio = np.broadcast_to(loading / away, np.broadcast_shapes(np.shape(loading), np.shape(away)))
+            optimum = self._queue_optimum(np.atleast_1d(ratio), target_utilisation).reshape(ratio.shape)
+        return np.where(known, optimum, np.nan)
+
+    def optimal_trucks(self, excavator, truck, material, haul_distance, speed_loaded=None, speed_empty=None,
+                       reposition_time=20, model='ratio', target_utilisation=0.9):
+        """Optimal trucks for one scenario using dict lookups and float arithmetic (microseconds per query)"""
+        e = self.excavator_index.get(excavator)
+        t = self.truck_index.get(truck)
+        m = self.material_index.get(material)
+        if e is None or t is None or m is None:
+            raise KeyError(f"Kombinasi tidak ada di index: {excavator} / {truck} / {material}")
+        a, b = self.arrays['coef'][e, t, m].tolist()
+        if speed_loaded is None or speed_empty is None:
+            catalog_loaded, catalog_empty = self.arrays['truck_speed'][t].tolist()
+            speed_loaded = catalog_loaded if speed_loaded is None else speed_loaded
+            speed_empty = catalog_empty if speed_empty is None else speed_empty
+        loading = a + b * reposition_time
+        away = self.header['fixed_cycle_hours'] + haul_distance * (1.0 / speed_loaded + 1.0 / speed_empty)
+        if model == 'ratio':
+            return 1.0 + away / loading
+        if model != 'queue':
+            raise ValueError(f"Model tidak dikenal: {model!r} (pilihan: 'ratio', 'queue')")
+        row = self.queue_targets.get(round(float(target_utilisation), 6))
+        position = (math.log(loading / away) - self._queue_low) / self._queue_step if loading > 0 and away > 0 else -1.0
+        if row is None or not 0 <= position <= self._queue_size - 1:
+            return float(finite_source_optimum(loading / away, target_utilisation)[0])
+        i = min(int(position), self._queue_size - 2)
+        low, high = self.arrays['queue_optimum'][row, i:i + 2].tolist()
+        return low + (high - low) * (position - i)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the precomputed optimal-fleet lookup index.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="Build the index from the equipment catalog")
+    build.add_argument('-o', '--output', default=DEFAULT_INDEX_PATH)
+    build.add_argument('--catalog', '--equipment-csv', dest='catalog', default=EQUIPMENT_CSV,
+                       help="Equipment catalog, flattened CSV or .xlsx workbook")
+    build.add_argument('--cycle-time-csv', default=None,
+                       help="Cycle time table (default: calibrated table if present, else 'data cycle time.csv')")
+    query = sub.add_parser('query', help="Optimal trucks for one scenario")
+    query.add_argument('excavator')
+    query.add_argument('truck')
+    query.add_argument('material')
+    query.add_argument('haul_distance', type=float)
+    query.add_argument('--index', default=DEFAULT_INDEX_PATH)
+    query.add_argument('--speed-loaded', type=float)
+    query.add_argument('--speed-empty', type=float)
+    query.add_argument('--reposition-time', type=float, default=20)
+    query.add_argument('--model', choices=['ratio', 'queue'], default='ratio')
+    query.add_argument('--target-utilisation', type=float, default=0.9)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        cycle_time_path = resolve_cycle_time_path(args.cycle_time_csv)
+        excavators, trucks, materials, _ = load_equipment_tables_cached(args.catalog, cycle_time_path)
+        header = build_fleet_index(excavators, trucks, materials, args.output,
+                                   source_digest=_catalog_digest(args.catalog, cycle_time_path))
+        n = len(header['excavators']) * len(header['trucks']) * len(header['materials'])
+        print(f"Index {n} kombinasi ditulis ke {args.output} ({os.path.getsize(args.output) / 1e3:.0f} kB)",
+              file=sys.stderr)
+        return 0
+
+    index = FleetLookupIndex(args.index)
+    optimum = index.optimal_trucks(args.excavator, args.truck, args.material, args.haul_distance,
+                                   args.speed_loaded, args.speed_empty, args.reposition_time, args.model,
+                                   args.target_utilisation)
+    print(f"{optimum:.4f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
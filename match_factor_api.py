@@ -0,0 +1,301 @@
+"""Local HTTP/JSON API around the match factor model.
+
+The catalog is loaded once per worker at startup; requests are scored with
+score_scenarios, the same vectorised path as the batch CLI. Endpoints:
+
+    GET  /health              status and catalog sizes
+    GET  /catalog             equipment, material and job condition names
+    POST /match-factor        one scenario object -> one result object
+    POST /match-factor/batch  columnar {"excavator": [...], ...} or a list of
+                              scenario objects -> columnar results
+
+Scenario fields follow match_factor_cli.py: excavator, truck, material,
+haul_distance, num_trucks, optional job_condition, reposition_time, speed_loaded,
+speed_empty. Oversized requests get 413 from Content-Length (or the bytes read)
+before any JSON parsing; parsing and scoring run in a worker thread so the event
+loop keeps serving other requests. Example:
+
+    python match_factor_api.py serve --port 8600
+    python match_factor_api.py bench --scenarios 20000 --batch-size 2000
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Route
+
+from match_factor_engine import (
+    EQUIPMENT_CSV,
+    JOB_EFFICIENCY,
+    apply_job_efficiency,
+    load_equipment_tables_cached,
+    score_scenarios,
+)
+
+REQUIRED_FIELDS = ('excavator', 'truck', 'material', 'haul_distance', 'num_trucks')
+NUMERIC_FIELDS = ('haul_distance', 'num_trucks', 'reposition_time', 'speed_loaded', 'speed_empty')
+MAX_BATCH_SCENARIOS = 200_000
+# Batas ukuran body, dicek sebelum JSON diparse (~512 byte per skenario sudah sangat longgar)
+MAX_BATCH_BYTES = MAX_BATCH_SCENARIOS * 512
+MAX_SINGLE_BYTES = 64 * 1024
+# Path katalog diteruskan lewat environment agar tiap worker uvicorn memuat katalog yang sama
+CATALOG_ENV = 'MF_API_CATALOG'
+CYCLE_TIME_ENV = 'MF_API_CYCLE_TIME'
+
+class ScenarioError(ValueError):
+    """Request body that cannot be turned into a scenario frame"""
+
+class PayloadTooLarge(ScenarioError):
+    """Request body or scenario count above the endpoint limit"""
+
+def _json_response(payload, status_code=200):
+    # allow_nan=False memastikan output JSON valid; NaN sudah diubah jadi null
+    body = json.dumps(payload, allow_nan=False, separators=(',', ':'))
+    return Response(body, status_code=status_code, media_type='application/json')
+
+async def read_body(request, limit):
+    """Request body as bytes; PayloadTooLarge as soon as Content-Length or the bytes read exceed limit"""
+    declared = request.headers.get('content-length', '')
+    if declared.isdigit() and int(declared) > limit:
+        raise PayloadTooLarge(f"Body melebihi {limit} byte")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise PayloadTooLarge(f"Body melebihi {limit} byte")
+    return bytes(body)
+
+def parse_json(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise ScenarioError("Body bukan JSON yang valid")
+
+def payload_size(payload):
+    """Scenario count of a columnar dict or record list, without building a frame"""
+    if isinstance(payload, dict):
+        return max((len(v) for v in payload.values() if isinstance(v, list)), default=0)
+    return len(payload) if isinstance(payload, list) else 0
+
+def scenarios_frame(payload):
+    """Build a scenario DataFrame from columnar dict or list-of-records JSON"""
+    if isinstance(payload, dict):
+        lengths = {len(v) for v in payload.values() if isinstance(v, list)}
+        if len(lengths) != 1 or any(not isinstance(v, list) for v in payload.values()):
+            raise ScenarioError("Format kolom: semua field harus berupa list dengan panjang sama")
+        frame = pd.DataFrame(payload)
+    elif isinstance(payload, list):
+        if not all(isinstance(row, dict) for row in payload):
+            raise ScenarioError("Format record: list berisi objek skenario")
+        frame = pd.DataFrame.from_records(payload)
+    else:
+        raise ScenarioError("Body harus objek kolom atau list skenario")
+    missing = [field for field in REQUIRED_FIELDS if field not in frame]
+    if missing:
+        raise ScenarioError(f"Field wajib tidak ada: {', '.join(missing)}")
+    for field in NUMERIC_FIELDS:
+        if field in frame:
+            frame[field] = pd.to_numeric(frame[field], errors='coerce')
+    if frame['haul_distance'].isna().any() or frame['num_trucks'].isna().any():
+        raise ScenarioError("haul_distance dan num_trucks harus berupa angka")
+    return frame
+
+def columnar(frame):
+    """DataFrame -> {column: list}, with NaN/NA as null"""
+    result = {}
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy(dtype=float)
+            result[column] = np.where(np.isnan(values), None, values).tolist()
+        elif pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+            result[column] = series.to_numpy(dtype=np.int64).tolist()
+        else:
+            values = series.to_numpy(dtype=object)
+            values[series.isna().to_numpy()] = None
+            result[column] = [value.item() if isinstance(value, np.generic) else value for value in values]
+    return result
+
+def create_app(equipment_path=None, cycle_time_path=None):
+    """Starlette app with the catalog loaded once"""
+    equipment_path = equipment_path or os.environ.get(CATALOG_ENV) or EQUIPMENT_CSV
+    cycle_time_path = cycle_time_path or os.environ.get(CYCLE_TIME_ENV) or None
+    excavators, trucks, materials, job_conditions = load_equipment_tables_cached(equipment_path, cycle_time_path)
+    apply_job_efficiency(job_conditions)
+
+    def score(frame):
+        return score_scenarios(frame, excavators, trucks, materials)
+
+    def error_response(exc):
+        return _json_response({'error': str(exc)}, 413 if isinstance(exc, PayloadTooLarge) else 400)
+
+    async def health(request):
+        return _json_response({
+            'status': 'ok',
+            'excavators': len(excavators), 'trucks': len(trucks), 'materials': len(materials),
+        })
+
+    async def catalog(request):
+        return _json_response({
+            'excavators': list(excavators.index), 'trucks': list(trucks.index),
+            'materials': list(materials.index), 'job_conditions': list(JOB_EFFICIENCY),
+        })
+
+    # Parsing dan scoring berjalan di threadpool supaya event loop tetap melayani request lain
+    def score_single(body):
+        try:
+            payload = parse_json(body)
+            if not isinstance(payload, dict):
+                raise ScenarioError("Body harus satu objek skenario")
+            frame = scenarios_frame([payload])
+        except ScenarioError as exc:
+            return error_response(exc)
+        scored = score(frame)
+        record = {key: values[0] for key, values in columnar(scored).items()}
+        if record['efficiency_status'] == 'Unknown':
+            return _json_response({'error': "Excavator, truck atau material tidak ada di katalog", 'result': record}, 404)
+        return _json_response(record)
+
+    def score_batch(body):
+        try:
+            payload = parse_json(body)
+            if payload_size(payload) > MAX_BATCH_SCENARIOS:
+                raise PayloadTooLarge(f"Maksimum {MAX_BATCH_SCENARIOS} skenario per request")
+            frame = scenarios_frame(payload)
+        except ScenarioError as exc:
+            return error_response(exc)
+        scored = score(frame)
+        return _json_response({
+            'n': len(scored),
+            'unknown': int((scored['efficiency_status'] == 'Unknown').sum()),
+            'columns': columnar(scored),
+        })
+
+    async def single(request):
+        try:
+            body = await read_body(request, MAX_SINGLE_BYTES)
+        except ScenarioError as exc:
+            return error_response(exc)
+        return await run_in_threadpool(score_single, body)
+
+    async def batch(request):
+        try:
+            body = await read_body(request, MAX_BATCH_BYTES)
+        except ScenarioError as exc:
+            return error_response(exc)
+        return await run_in_threadpool(score_batch, body)
+
+    app = Starlette(routes=[
+        Route('/health', health),
+        Route('/catalog', catalog),
+        Route('/match-factor', single, methods=['POST']),
+        Route('/match-factor/batch', batch, methods=['POST']),
+    ])
+    app.state.catalog = (excavators, trucks, materials, job_conditions)
+    return app
+
+def start_local_server(host='127.0.0.1', port=8600, equipment_path=None, cycle_time_path=None):
+    """Run the API in a daemon thread (for benchmarks and local tests); returns the uvicorn server"""
+    app = create_app(equipment_path, cycle_time_path)
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level='warning'))
+    threading.Thread(target=server.run, name='match-factor-api', daemon=True).start()
+    deadline = time.time() + 30
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    return server
+
+def random_scenarios(excavators, trucks, materials, n, seed=0):
+    """Columnar random scenarios drawn from the catalog"""
+    rng = np.random.default_rng(seed)
+    return {
+        'excavator': rng.choice(list(excavators.index), n).tolist(),
+        'truck': rng.choice(list(trucks.index), n).tolist(),
+        'material': rng.choice(list(materials.index), n).tolist(),
+        'haul_distance': np.round(rng.uniform(0.5, 15.0, n), 2).tolist(),
+        'num_trucks': rng.integers(1, 40, n).tolist(),
+        'job_condition': rng.choice(list(JOB_EFFICIENCY), n).tolist(),
+    }
+
+def benchmark_api(host, port, scenarios, batch_size=1000, single_requests=200):
+    """Throughput of the bulk and single endpoints over one keep-alive connection"""
+    n = len(scenarios['excavator'])
+    conn = http.client.HTTPConnection(host, port)
+    headers = {'Content-Type': 'application/json'}
+
+    def post(path, payload):
+        conn.request('POST', path, json.dumps(payload), headers)
+        response = conn.getresponse()
+        body = response.read()
+        if response.status >= 500:
+            raise RuntimeError(f"{path}: HTTP {response.status} {body[:200]!r}")
+        return body
+
+    start = time.perf_counter()
+    for offset in range(0, n, batch_size):
+        post('/match-factor/batch', {key: values[offset:offset + batch_size] for key, values in scenarios.items()})
+    bulk_seconds = time.perf_counter() - start
+
+    records = [{key: values[i] for key, values in scenarios.items()} for i in range(min(single_requests, n))]
+    start = time.perf_counter()
+    for record in records:
+        post('/match-factor', record)
+    single_seconds = time.perf_counter() - start
+    conn.close()
+    return {
+        'bulk_scenarios': n, 'batch_size': batch_size, 'bulk_seconds': bulk_seconds,
+        'bulk_scenarios_per_second': n / bulk_seconds,
+        'single_requests': len(records), 'single_seconds': single_seconds,
+        'single_requests_per_second': len(records) / single_seconds if records else float('nan'),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON API for match factor evaluation.")
+    parser.add_argument('command', choices=['serve', 'bench'], help="serve: jalankan API; bench: ukur throughput")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=1, help="Uvicorn worker processes (serve)")
+    parser.add_argument('--catalog', '--equipment-csv', dest='catalog', default=EQUIPMENT_CSV,
+                        help="Equipment catalog, flattened CSV or .xlsx workbook")
+    parser.add_argument('--cycle-time-csv', default=None,
+                        help="Cycle time table (default: calibrated table if present, else 'data cycle time.csv')")
+    parser.add_argument('--url', help="bench: server yang sudah berjalan (host:port); default server lokal baru")
+    parser.add_argument('--scenarios', type=int, default=20_000, help="bench: jumlah skenario bulk")
+    parser.add_argument('--batch-size', type=int, default=1000, help="bench: skenario per request bulk")
+    parser.add_argument('--single-requests', type=int, default=200, help="bench: jumlah request tunggal")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        os.environ[CATALOG_ENV] = args.catalog
+        if args.cycle_time_csv:
+            os.environ[CYCLE_TIME_ENV] = args.cycle_time_csv
+        uvicorn.run('match_factor_api:create_app', factory=True, host=args.host, port=args.port,
+                    workers=args.workers, log_level='info')
+        return 0
+
+    if args.url:
+        host, _, port = args.url.rpartition(':')
+        host, port = host or '127.0.0.1', int(port)
+    else:
+        host, port = args.host, args.port
+        start_local_server(host, port, args.catalog, args.cycle_time_csv)
+    excavators, trucks, materials, _ = load_equipment_tables_cached(args.catalog, args.cycle_time_csv)
+    scenarios = random_scenarios(excavators, trucks, materials, args.scenarios)
+    result = benchmark_api(host, port, scenarios, args.batch_size, args.single_requests)
+    print(f"Bulk  : {result['bulk_scenarios']} skenario dalam {result['bulk_seconds']:.2f} s "
+          f"({result['bulk_scenarios_per_second']:,.0f} skenario/s, batch {result['batch_size']})", file=sys.stderr)
+    print(f"Single: {result['single_requests']} request dalam {result['single_seconds']:.2f} s "
+          f"({result['single_requests_per_second']:,.0f} request/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
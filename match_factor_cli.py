@@ -0,0 +1,81 @@
+"""Streaming batch scorer for match factor scenarios.
+
+Reads scenarios (CSV or JSON Lines) from a file or stdin in fixed-size chunks and
+writes each scored chunk immediately, so memory stays constant however many rows
+the input has. Example:
+
+    python match_factor_cli.py dispatch_plan.csv -o scored.csv
+    cat plan.jsonl | python match_factor_cli.py --input-format jsonl > scored.jsonl
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from match_factor_engine import (
+    EQUIPMENT_CSV,
+    apply_job_efficiency,
+    load_equipment_tables_cached,
+    score_scenarios,
+)
+
+def _detect_format(path, default):
+    if path and path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if path and path.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+def read_scenario_chunks(source, fmt, chunksize):
+    """Yield DataFrame chunks of scenarios from a path or file object"""
+    if fmt == 'jsonl':
+        return pd.read_json(source, lines=True, chunksize=chunksize, dtype=False)
+    return pd.read_csv(source, chunksize=chunksize)
+
+def write_chunk(frame, out, fmt, first):
+    """Append one scored chunk to out in the requested format"""
+    if fmt == 'jsonl':
+        text = frame.to_json(orient='records', lines=True)
+        out.write(text if text.endswith('\n') else text + '\n')
+    else:
+        frame.to_csv(out, index=False, header=first)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score match factor scenarios from CSV/JSONL in streaming chunks.")
+    parser.add_argument('input', nargs='?', default='-', help="Scenario file (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="Default: from extension, else csv")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help="Default: same as input")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument('--catalog', '--equipment-csv', dest='catalog', default=EQUIPMENT_CSV,
+                        help="Equipment catalog, flattened CSV or .xlsx workbook")
+    parser.add_argument('--cycle-time-csv', default=None,
+                        help="Cycle time table (default: calibrated table if present, else 'data cycle time.csv')")
+    args = parser.parse_args(argv)
+
+    input_path = None if args.input == '-' else args.input
+    output_path = None if args.output == '-' else args.output
+    input_format = args.input_format or _detect_format(input_path, 'csv')
+    output_format = args.output_format or _detect_format(output_path, input_format)
+
+    excavators, trucks, materials, job_conditions = load_equipment_tables_cached(args.catalog, args.cycle_time_csv)
+    apply_job_efficiency(job_conditions)
+
+    source = input_path if input_path else sys.stdin
+    out = open(output_path, 'w', newline='') if output_path else sys.stdout
+    rows = unknown = 0
+    try:
+        for i, chunk in enumerate(read_scenario_chunks(source, input_format, args.chunksize)):
+            scored = score_scenarios(chunk, excavators, trucks, materials)
+            write_chunk(scored, out, output_format, first=(i == 0))
+            out.flush()
+            rows += len(scored)
+            unknown += int((scored['efficiency_status'] == 'Unknown').sum())
+    finally:
+        if output_path:
+            out.close()
+    print(f"{rows} scenario diproses, {unknown} dengan equipment tidak dikenal", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
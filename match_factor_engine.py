@@ -0,0 +1,2365 @@
+"""Headless match factor engine: equipment catalog loader and calculation model.
+
+No Streamlit imports here, so batch jobs, the CLI and other services can use the
+same numbers as the dashboard.
+"""
+import os
+import json
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import numpy as np
+
+# Lokasi file data default (relatif ke modul ini, bukan working directory)
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+EQUIPMENT_CSV = os.path.join(DATA_DIR, 'CONTOH DATA.csv')
+EQUIPMENT_XLSX = os.path.join(DATA_DIR, 'CONTOH DATA.xlsx')
+CYCLE_TIME_CSV = os.path.join(DATA_DIR, 'data cycle time.csv')
+# Tabel cycle time hasil kalibrasi log lapangan (cycle_log_ingest.py); dipakai bila ada
+CALIBRATED_CYCLE_TIME_CSV = os.path.join(DATA_DIR, 'data cycle time calibrated.csv')
+
+def resolve_cycle_time_path(cycle_time_path=None):
+    """Explicit path as given; otherwise the calibrated table if present, else the hand-maintained CSV"""
+    if cycle_time_path is not None:
+        return cycle_time_path
+    return CALIBRATED_CYCLE_TIME_CSV if os.path.exists(CALIBRATED_CYCLE_TIME_CSV) else CYCLE_TIME_CSV
+
+def _read_cycle_time_table(cycle_time_path):
+    """Read the cycle time CSV as a table indexed by digger name (empty if unreadable)"""
+    columns = ['bucket_capacity', 'cycle_time', 'efficiency']
+    try:
+        cycle_df = pd.read_csv(cycle_time_path, encoding='utf-8-sig')
+    except Exception:
+        # Jika file tidak bisa dibaca, lanjut tanpa merge
+        return pd.DataFrame(columns=columns, dtype=float)
+    # Normalisasi header (hilangkan BOM, spasi)
+    cycle_df.columns = cycle_df.columns.astype(str).str.strip().str.replace('\ufeff', '', regex=True)
+    if 'Digger' not in cycle_df.columns:
+        return pd.DataFrame(columns=columns, dtype=float)
+    cycle_df = cycle_df.dropna(subset=['Digger'])
+    table = pd.DataFrame(index=cycle_df['Digger'].astype(str).str.strip())
+    # Kolom yang hilang tetap ada sebagai NaN, fallback dilakukan saat merge
+    for column, source in zip(columns, ['Bucket_capacity', 'Cycle_time', 'Efficiency']):
+        values = cycle_df[source] if source in cycle_df.columns else np.nan
+        table[column] = pd.to_numeric(pd.Series(values, index=cycle_df.index), errors='coerce').to_numpy(dtype=float)
+    # Baris terakhir menang bila nama digger dobel
+    return table[~table.index.duplicated(keep='last')]
+
+def _dedupe_by_name(table):
+    """Keep the last row per name but the first-seen name order, like repeated dict assignment"""
+    order = pd.unique(table.index)
+    return table[~table.index.duplicated(keep='last')].reindex(order)
+
+def _parse_job_efficiency(conditions, efficiencies):
+    """Job condition table from label/value columns; '83%' and 0.83 both become 0.83"""
+    labels = pd.Series(conditions).astype(str).str.strip()
+    text = pd.Series(efficiencies).astype(str).str.strip()
+    values = pd.to_numeric(text.str.rstrip('%'), errors='coerce')
+    values = values.where(~text.str.endswith('%'), values / 100.0)
+    table = pd.DataFrame({'job_efficiency': values.to_numpy()}, index=labels.to_numpy()).dropna()
+    return table[~table.index.duplicated(keep='last')]
+
+def _csv_job_efficiency(df):
+    """Operator_Efisiensi block of the flattened CSV (sub-header row, then label/value rows)"""
+    if 'Operator_Efisiensi' not in df.columns:
+        return None
+    i = df.columns.get_loc('Operator_Efisiensi')
+    block = df.iloc[:, [i, i + 1]].dropna(how='all')
+    is_header = block.iloc[:, 0].astype(str).str.strip() == 'Operating Conditions'
+    if is_header.any():
+        block = block[is_header.to_numpy().cumsum() > 0].iloc[1:]
+    return _parse_job_efficiency(block.iloc[:, 0], block.iloc[:, 1])
+
+# Kolom opsional biaya kepemilikan + operasi per jam di tabel Equipment_Caps (nama pertama yang ada dipakai)
+HOURLY_COST_COLUMNS = ('Hourly Cost', 'Hourly_Cost', 'Biaya per Jam', 'Biaya/Jam')
+
+def _equipment_hourly_cost(equipment):
+    """Hourly cost per equipment row from the optional cost column (NaN when absent)"""
+    columns = {str(column).strip(): column for column in equipment.columns}
+    for name in HOURLY_COST_COLUMNS:
+        if name in columns:
+            text = equipment[columns[name]].astype(str).str.replace(',', '', regex=False).str.strip()
+            return pd.to_numeric(text, errors='coerce').astype(float)
+    return pd.Series(np.nan, index=equipment.index)
+
+def _build_catalog_tables(equipment, material_rows, job_table, cycle_time_path):
+    """Catalog tables from the raw equipment and material rows (CSV or workbook)"""
+    # Kapasitas non-numerik (mis. '30t', '1000kVA' di workbook) dianggap kosong
+    equipment = equipment.assign(Capacity=pd.to_numeric(equipment['Capacity'], errors='coerce'))
+    equipment = equipment.dropna(subset=['Equipment', 'Capacity'])
+    hourly_cost = _equipment_hourly_cost(equipment)
+
+    # Excavators (Backhoe and Shovel) - merge dengan tabel cycle time bila tersedia
+    exc_rows = equipment[equipment['Product'].isin(['Backhoe', 'Shovel'])]
+    names = exc_rows['Equipment'].astype(str).str.strip()
+    cycle = _read_cycle_time_table(cycle_time_path).reindex(names)
+    if 'Waktu Siklus Rata-rata (detik)' in equipment.columns:
+        csv_cycle_time = pd.to_numeric(exc_rows['Waktu Siklus Rata-rata (detik)'], errors='coerce').to_numpy()
+    else:
+        csv_cycle_time = np.nan
+    excavators = pd.DataFrame({
+        'bucket_capacity': cycle['bucket_capacity'].fillna(pd.Series(exc_rows['Capacity'].astype(float).to_numpy(), index=cycle.index)),  # m³
+        'cycle_time': cycle['cycle_time'].fillna(pd.Series(csv_cycle_time, index=cycle.index)).fillna(25.0),  # detik
+        'efficiency': cycle['efficiency'].fillna(0.92),  # faktor efisiensi
+        'product_type': exc_rows['Product'].to_numpy(),  # referensi dari CONTOH DATA.csv
+        'hourly_cost': hourly_cost[exc_rows.index].to_numpy(),  # biaya per jam, NaN bila tidak ada
+    }, index=names.to_numpy())
+    excavators = _dedupe_by_name(excavators)
+
+    # Trucks (Truck and Dump Truck from your CSV data); XDE130 punya kecepatan khusus
+    truck_rows = equipment[equipment['Product'].isin(['Truck', 'Dump Truck', 'Truck Art'])]
+    is_xde130 = (truck_rows['Equipment'] == 'XDE130').to_numpy()
+    trucks = pd.DataFrame({
+        'capacity': truck_rows['Capacity'].astype(float).to_numpy(),
+        'speed_loaded': np.where(is_xde130, 20, 23),
+        'speed_empty': np.where(is_xde130, 18, 21),
+        'product_type': truck_rows['Product'].to_numpy(),
+        'hourly_cost': hourly_cost[truck_rows.index].to_numpy(),
+    }, index=truck_rows['Equipment'].to_numpy())
+    trucks = _dedupe_by_name(trucks)
+
+    # Materials
+    material_rows = material_rows.dropna(subset=['Material'])
+    materials = pd.DataFrame({
+        'density_bank': material_rows['Bank (ton/m_)'].astype(float).fillna(2.0).to_numpy(),
+        'density_loose': material_rows['Loose (ton/m_)'].astype(float).fillna(1.5).to_numpy(),
+        'swell_factor': material_rows['Swell (Loose/Bank)'].astype(float).fillna(0.8).to_numpy(),
+        'fill_factor': 0.9,
+    }, index=material_rows['Material'].to_numpy())
+    materials = _dedupe_by_name(materials)
+
+    for table in (excavators, trucks):
+        table['product_type'] = table['product_type'].astype('category')
+
+    # Kondisi kerja: dari file data bila ada, fallback ke nilai default JOB_EFFICIENCY
+    if job_table is None or job_table.empty:
+        job_table = pd.DataFrame({'job_efficiency': list(DEFAULT_JOB_EFFICIENCY.values())},
+                                 index=list(DEFAULT_JOB_EFFICIENCY.keys()))
+    return excavators, trucks, materials, job_table
+
+# Judul tabel pada workbook (sel judul, baris berikutnya header kolom)
+WORKBOOK_TABLES = ('Equipment_Caps', 'SG_Material', 'Operator_Efisiensi')
+
+def read_workbook_tables(workbook_path, titles=WORKBOOK_TABLES):
+    """Stream titled tables out of an .xlsx workbook, sheet by sheet, in read-only mode.
+
+    A table starts at a cell whose value is one of titles; the next row holds its
+    header (up to the first empty cell) and data rows follow until a row that is
+    empty across the table's columns. Tables may sit side by side in one sheet.
+    Reading stops as soon as every requested table has been found, so the rest of
+    the workbook is never loaded. Returns {title: DataFrame}.
+    """
+    from openpyxl import load_workbook  # opsional, hanya dibutuhkan untuk sumber .xlsx
+
+    wanted = set(titles)
+    found = {}
+    # keep_links=False: jangan parse external link (bisa puluhan MB dan tidak dipakai)
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        for sheet in workbook.worksheets:
+            pending = {}   # kolom -> judul, menunggu baris header
+            active = {}    # judul -> (kolom awal, header, rows)
+            for row in sheet.iter_rows(values_only=True):
+                for title, (start, header, rows) in list(active.items()):
+                    cells = row[start:start + len(header)]
+                    if all(cell is None for cell in cells):
+                        found[title] = pd.DataFrame(rows, columns=header)
+                        del active[title]
+                    else:
+                        rows.append(tuple(cells) + (None,) * (len(header) - len(cells)))
+                for start, title in pending.items():
+                    header = []
+                    for cell in row[start:]:
+                        if cell is None:
+                            break
+                        header.append(str(cell).strip())
+                    if header:
+                        active[title] = (start, header, [])
+                pending = {
+                    col: cell for col, cell in enumerate(row)
+                    if isinstance(cell, str) and cell.strip() in wanted - set(found) - set(active)
+                }
+                if not pending and not active and wanted <= set(found):
+                    return found
+            # Tabel yang berjalan sampai akhir sheet
+            for title, (start, header, rows) in active.items():
+                found[title] = pd.DataFrame(rows, columns=header)
+    finally:
+        workbook.close()
+    return found
+
+def load_workbook_tables(workbook_path, cycle_time_path=None):
+    """load_equipment_tables for the multi-table .xlsx workbook (streamed, read-only)"""
+    cycle_time_path = resolve_cycle_time_path(cycle_time_path)
+    tables = read_workbook_tables(workbook_path)
+    missing = {'Equipment_Caps', 'SG_Material'} - set(tables)
+    if missing:
+        raise ValueError(f"Tabel {sorted(missing)} tidak ditemukan di {workbook_path}")
+    job_table = None
+    if 'Operator_Efisiensi' in tables:
+        job = tables['Operator_Efisiensi']
+        job_table = _parse_job_efficiency(job.iloc[:, 0], job.iloc[:, 1])
+    return _build_catalog_tables(tables['Equipment_Caps'], tables['SG_Material'], job_table, cycle_time_path)
+
+def load_equipment_tables(equipment_path=EQUIPMENT_CSV, cycle_time_path=None):
+    """Load the catalog as columnar (excavators, trucks, materials, job_conditions) DataFrames indexed by name.
+
+    equipment_path may be the flattened CSV or the .xlsx workbook. Fallbacks:
+    excavator bucket capacity, cycle time and efficiency come from the cycle time file
+    first, then the 'Capacity' / 'Waktu Siklus Rata-rata (detik)' columns, then 25 s
+    and 0.92. job_conditions comes from the Operator_Efisiensi table, or the built-in
+    defaults when the source has none. Without cycle_time_path the calibrated
+    cycle time table is used when present (resolve_cycle_time_path). An optional
+    hourly cost column (HOURLY_COST_COLUMNS) becomes 'hourly_cost', NaN otherwise.
+    """
+    cycle_time_path = resolve_cycle_time_path(cycle_time_path)
+    if str(equipment_path).lower().endswith(('.xlsx', '.xlsm')):
+        return load_workbook_tables(equipment_path, cycle_time_path)
+    # Use latin-1 encoding and skip the first row (header categories)
+    df = pd.read_csv(equipment_path, encoding='latin-1', header=1)
+    return _build_catalog_tables(df, df, _csv_job_efficiency(df), cycle_time_path)
+
+def apply_job_efficiency(job_table):
+    """Replace the JOB_EFFICIENCY entries in place with a loaded job_conditions table"""
+    if job_table is None or job_table.empty:
+        return JOB_EFFICIENCY
+    JOB_EFFICIENCY.clear()
+    JOB_EFFICIENCY.update({str(k): float(v) for k, v in job_table['job_efficiency'].items()})
+    return JOB_EFFICIENCY
+
+def catalog_to_dicts(table):
+    """Per-item {name: {field: value}} view of a catalog table, for the scalar API"""
+    return table.astype({'product_type': object} if 'product_type' in table else {}).to_dict('index')
+
+# Naikkan bila format/isi tabel katalog berubah, supaya cache lama otomatis dibangun ulang
+CATALOG_CACHE_VERSION = 3
+CATALOG_TABLE_NAMES = ('excavators', 'trucks', 'materials', 'job_conditions')
+
+def _source_stats(paths):
+    """(path, mtime_ns, size) per source file; missing files are recorded as such"""
+    stats = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+            stats.append([os.path.abspath(path), info.st_mtime_ns, info.st_size])
+        except OSError:
+            stats.append([os.path.abspath(path), None, None])
+    return stats
+
+def source_digest(paths):
+    """SHA-256 hex digest of the catalog source files' contents and names (plus cache version).
+
+    Used to tell whether artifacts derived from the catalog (NPZ cache, fleet index)
+    still match the files on disk; missing files hash as a fixed marker.
+    """
+    digest = hashlib.sha256(f'catalog-cache-v{CATALOG_CACHE_VERSION}'.encode())
+    for path in paths:
+        digest.update(b'\0' + os.path.basename(path).encode() + b'\0')
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        except OSError:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+def _save_catalog_cache(cache_path, tables, meta):
+    arrays = {}
+    layout = {}
+    for name, table in zip(CATALOG_TABLE_NAMES, tables):
+        arrays[f'{name}.index'] = table.index.to_numpy(dtype=str)
+        layout[name] = []
+        for column in table.columns:
+            values = table[column]
+            is_category = isinstance(values.dtype, pd.CategoricalDtype)
+            is_text = is_category or values.dtype.kind not in 'biuf'
+            arrays[f'{name}.{column}'] = values.to_numpy(dtype=str) if is_text else values.to_numpy()
+            layout[name].append([column, 'category' if is_category else ('str' if is_text else 'num')])
+    meta = dict(meta, layout=layout)
+    arrays['meta'] = np.array(json.dumps(meta))
+    # Tulis ke file sementara lalu rename (atomik), aman bila beberapa replica start bersamaan
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, cache_path)
+
+def _load_catalog_cache(cache_path):
+    with np.load(cache_path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        tables = []
+        for name in CATALOG_TABLE_NAMES:
+            table = pd.DataFrame(index=data[f'{name}.index'].astype(object))
+            for column, kind in meta['layout'][name]:
+                values = data[f'{name}.{column}']
+                table[column] = values.astype(object) if kind != 'num' else values
+                if kind == 'category':
+                    table[column] = table[column].astype('category')
+            tables.append(table)
+    return meta, tuple(tables)
+
+def load_equipment_tables_cached(equipment_path=EQUIPMENT_CSV, cycle_time_path=None, cache_path=None):
+    """load_equipment_tables backed by a persistent NPZ cache next to the equipment file.
+
+    The cache is reused while the sources' mtime/size match; if they changed, the
+    content hash decides, so a touched-but-identical file does not force a re-parse.
+    Otherwise the catalog is parsed and the cache rewritten. An unreadable or
+    unwritable cache silently falls back to parsing.
+    """
+    cycle_time_path = resolve_cycle_time_path(cycle_time_path)
+    paths = (equipment_path, cycle_time_path)
+    if cache_path is None:
+        source = os.path.abspath(equipment_path)
+        cache_path = os.path.join(os.path.dirname(source), f'.{os.path.basename(source)}.catalog_cache.npz')
+    stats = _source_stats(paths)
+
+    meta = None
+    try:
+        meta, tables = _load_catalog_cache(cache_path)
+    except (OSError, ValueError, KeyError):
+        pass
+    if meta is not None and meta.get('version') == CATALOG_CACHE_VERSION:
+        if meta.get('stats') == stats:
+            return tables
+        digest = source_digest(paths)
+        if meta.get('digest') == digest:
+            # Isi sama, hanya mtime berubah: perbarui stat di cache tanpa parsing ulang
+            try:
+                _save_catalog_cache(cache_path, tables, {'version': CATALOG_CACHE_VERSION, 'digest': digest, 'stats': stats})
+            except OSError:
+                pass
+            return tables
+    else:
+        digest = source_digest(paths)
+
+    tables = load_equipment_tables(equipment_path, cycle_time_path)
+    try:
+        _save_catalog_cache(cache_path, tables, {'version': CATALOG_CACHE_VERSION, 'digest': digest, 'stats': stats})
+    except OSError:
+        pass
+    return tables
+
+def load_equipment_data(equipment_path=EQUIPMENT_CSV, cycle_time_path=None):
+    """Load EXCAVATORS, TRUCKS and MATERIALS dicts from the equipment and cycle time files"""
+    tables = load_equipment_tables_cached(equipment_path, cycle_time_path)
+    return tuple(catalog_to_dicts(table) for table in tables[:3])
+
+# Job efficiency factors from CSV (default; apply_job_efficiency mengisi dari file data)
+DEFAULT_JOB_EFFICIENCY = {
+    'Good': 0.83,
+    'Average': 0.75,
+    'Rather Poor': 0.67,
+    'Poor': 0.58
+}
+JOB_EFFICIENCY = dict(DEFAULT_JOB_EFFICIENCY)
+
+# Update fungsi calculate_match_factor (sekitar baris 225-235)
+def calculate_match_factor(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition='Average', reposition_time=20):
+    """Calculate Match Factor based on equipment specifications from CSV data"""
+    
+    # Get job efficiency factor
+    job_efficiency = JOB_EFFICIENCY.get(job_condition, 0.75)
+    
+    # Hitung Bucket Pass (sesuai formula yang diminta)
+    vessel_truck_capacity_ton = truck_data['capacity']
+    ff = material_data['fill_factor']
+    bucket_cap_m3 = excavator_data['bucket_capacity']
+    density_loose = material_data['density_loose']
+    bucket_pass_calc = (vessel_truck_capacity_ton * ff) / (ff * bucket_cap_m3 * density_loose)
+    bucket_pass = int(np.ceil(bucket_pass_calc))  # pembulatan ke atas
+    
+    # Hitung Loading Cycle Truck (dalam jam) - sinkron dengan sidebar
+    loading_cycle_truck_hours = (
+        ((excavator_data['cycle_time'] * bucket_pass) + reposition_time) / max(excavator_data['efficiency'], 1e-6)
+    ) / 3600.0  # konversi detik ke jam
+    
+    # Travel times (convert to hours)
+    travel_time_loaded = haul_distance / truck_data['speed_loaded']  # hours
+    travel_time_empty = haul_distance / truck_data['speed_empty']    # hours
+    
+    # Total cycle time (hours)
+    dumping_time = 1.4 / 60  # menit ke jam
+    spotting_time = 0.7 / 60  # menit ke jam
+    total_cycle_time = loading_cycle_truck_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
+
+    # Match Factor calculation - FORMULA BARU
+    match_factor = (num_trucks * loading_cycle_truck_hours) / total_cycle_time
+    
+    # Productivity calculation - PERBAIKAN
+    truck_efficiency = truck_data.get('efficiency', 0.92)  # Tambahkan truck efficiency
+    truck_productivity_tons_per_hour = (truck_data['capacity'] * truck_efficiency * job_efficiency) / total_cycle_time
+    truck_productivity_bcm_per_hour = truck_productivity_tons_per_hour / material_data['density_bank']
+    # Produktivitas total fleet (num_trucks * produktivitas per truck)
+    total_fleet_productivity_tons = num_trucks * truck_productivity_tons_per_hour
+    total_fleet_productivity_bcm = num_trucks * truck_productivity_bcm_per_hour
+    
+    # Hitung produktivitas digger maksimal (sama dengan yang ditampilkan di sidebar)
+    digger_max_productivity_bcm = (
+        excavator_data['bucket_capacity']
+        * material_data['fill_factor']
+        * material_data['swell_factor']
+        * excavator_data['efficiency']
+        * job_efficiency
+    ) * (3600 / excavator_data['cycle_time'])
+    digger_max_productivity_tons = digger_max_productivity_bcm * material_data['density_bank']
+    
+    # Batasi produktivitas total fleet agar tidak melebihi kemampuan digger
+    if total_fleet_productivity_bcm > digger_max_productivity_bcm:
+        total_fleet_productivity_bcm = digger_max_productivity_bcm
+        total_fleet_productivity_tons = digger_max_productivity_tons
+    # Jika kurang, gunakan formula sebenarnya (tidak perlu else karena sudah dihitung di atas)
+    if 1.0 <= match_factor <= 1.2:
+        efficiency_status = "Optimal"
+        status_color = "🟢"
+    elif match_factor < 1.0:
+        efficiency_status = "Under-truck"
+        status_color = "🔴"
+    else:
+        efficiency_status = "Over-truck"
+        status_color = "🟡"
+    
+    return {
+        'match_factor': match_factor,
+        'productivity': total_fleet_productivity_bcm,  # Total fleet BCM/h
+        'productivity_tons': total_fleet_productivity_tons,  # Total fleet ton/h
+        'productivity_per_truck_bcm': truck_productivity_bcm_per_hour,  # Per truck BCM/h
+        'productivity_per_truck_tons': truck_productivity_tons_per_hour,  # Per truck ton/h
+        'efficiency_status': efficiency_status,
+        'status_color': status_color,
+        'loading_time': loading_cycle_truck_hours,  # Ganti nama untuk konsistensi
+        'loading_cycle_truck': loading_cycle_truck_hours,  # Tambah key baru
+        'total_cycle_time': total_cycle_time,
+        'job_efficiency': job_efficiency
+    }
+
+# Tambahkan fungsi untuk menghitung jumlah truck optimal yang menghasilkan MF=1.0
+def calculate_optimal_trucks_for_mf1(excavator_data, truck_data, material_data, haul_distance, job_condition='Average', reposition_time=20,
+                                     model='ratio', target_utilisation=0.9):
+    """Calculate optimal number of trucks for Match Factor = 1.0
+
+    model='ratio' uses the MF ratio (cycle time / loading time). model='queue' uses
+    finite_source_queue and returns the (interpolated) truck count at which loader
+    utilisation reaches target_utilisation, since queueing keeps it below 100%.
+    """
+    if model == 'queue':
+        return optimal_trucks_finite_source(
+            excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time, target_utilisation
+        )
+    if model != 'ratio':
+        raise ValueError(f"Model tidak dikenal: {model!r} (pilihan: 'ratio', 'queue')")
+
+    # Get job efficiency factor
+    job_efficiency = JOB_EFFICIENCY.get(job_condition, 0.75)
+    
+    # Hitung Bucket Pass
+    vessel_truck_capacity_ton = truck_data['capacity']
+    ff = material_data['fill_factor']
+    bucket_cap_m3 = excavator_data['bucket_capacity']
+    density_loose = material_data['density_loose']
+    bucket_pass_calc = (vessel_truck_capacity_ton * ff) / (ff * bucket_cap_m3 * density_loose)
+    bucket_pass = int(np.ceil(bucket_pass_calc))
+    
+    # Hitung Loading Cycle Truck (dalam jam)
+    loading_cycle_truck_hours = (
+        ((excavator_data['cycle_time'] * bucket_pass) + reposition_time) / max(excavator_data['efficiency'], 1e-6)
+    ) / 3600.0
+    
+    # Travel times (convert to hours)
+    travel_time_loaded = haul_distance / truck_data['speed_loaded']
+    travel_time_empty = haul_distance / truck_data['speed_empty']
+    
+    # Total cycle time (hours)
+    dumping_time = 1.4 / 60
+    spotting_time = 0.7 / 60
+    total_cycle_time = loading_cycle_truck_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
+    
+    # Untuk MF = 1.0: num_trucks = total_cycle_time / loading_cycle_truck_hours
+    optimal_trucks = total_cycle_time / loading_cycle_truck_hours
+    
+    return optimal_trucks
+
+def job_efficiency_array(job_condition):
+    """Map job condition label(s) to job efficiency factor(s), 0.75 for unknown labels"""
+    if isinstance(job_condition, str):
+        return JOB_EFFICIENCY.get(job_condition, 0.75)
+    conditions = np.asarray(job_condition)
+    if conditions.dtype.kind in 'fiu':
+        # Sudah berupa faktor efisiensi numerik
+        return conditions.astype(float)
+    # Label kondisi hanya sedikit, jadi cukup satu perbandingan vektor per label
+    factors = np.full(conditions.shape, 0.75)
+    for label, efficiency in JOB_EFFICIENCY.items():
+        factors[conditions == label] = efficiency
+    return factors
+
+def calculate_match_factor_batch(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition='Average', reposition_time=20,
+                                 dumping_time=1.4, spotting_time=0.7):
+    """Vectorized calculate_match_factor over NumPy arrays.
+
+    Every value in the equipment dicts and every scenario argument may be a scalar
+    or an array; they are broadcast together. dumping_time and spotting_time are in
+    minutes (defaults match the scalar model). Returns a dict of columnar arrays with
+    the same numeric keys as calculate_match_factor plus 'bucket_pass' and
+    'digger_productivity' (digger capacity in BCM/h).
+    """
+    job_efficiency = job_efficiency_array(job_condition)
+    haul_distance = np.asarray(haul_distance, dtype=float)
+    num_trucks = np.asarray(num_trucks, dtype=float)
+    reposition_time = np.asarray(reposition_time, dtype=float)
+
+    truck_capacity = np.asarray(truck_data['capacity'], dtype=float)
+    ff = np.asarray(material_data['fill_factor'], dtype=float)
+    bucket_cap_m3 = np.asarray(excavator_data['bucket_capacity'], dtype=float)
+    cycle_time = np.asarray(excavator_data['cycle_time'], dtype=float)
+    excavator_efficiency = np.asarray(excavator_data['efficiency'], dtype=float)
+    density_loose = np.asarray(material_data['density_loose'], dtype=float)
+    density_bank = np.asarray(material_data['density_bank'], dtype=float)
+
+    # Bucket pass dan loading cycle truck (jam), sama dengan versi skalar
+    bucket_pass = np.ceil((truck_capacity * ff) / (ff * bucket_cap_m3 * density_loose))
+    loading_cycle_truck_hours = (
+        ((cycle_time * bucket_pass) + reposition_time) / np.maximum(excavator_efficiency, 1e-6)
+    ) / 3600.0
+
+    travel_time_loaded = haul_distance / np.asarray(truck_data['speed_loaded'], dtype=float)
+    travel_time_empty = haul_distance / np.asarray(truck_data['speed_empty'], dtype=float)
+    dumping_time = np.asarray(dumping_time, dtype=float) / 60
+    spotting_time = np.asarray(spotting_time, dtype=float) / 60
+    total_cycle_time = loading_cycle_truck_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
+
+    match_factor = (num_trucks * loading_cycle_truck_hours) / total_cycle_time
+
+    truck_efficiency = np.asarray(truck_data.get('efficiency', 0.92), dtype=float)
+    truck_productivity_tons_per_hour = (truck_capacity * truck_efficiency * job_efficiency) / total_cycle_time
+    truck_productivity_bcm_per_hour = truck_productivity_tons_per_hour / density_bank
+    total_fleet_productivity_bcm = num_trucks * truck_productivity_bcm_per_hour
+    total_fleet_productivity_tons = num_trucks * truck_productivity_tons_per_hour
+
+    digger_max_productivity_bcm = (
+        bucket_cap_m3
+        * ff
+        * np.asarray(material_data['swell_factor'], dtype=float)
+        * excavator_efficiency
+        * job_efficiency
+    ) * (3600 / cycle_time)
+    digger_max_productivity_tons = digger_max_productivity_bcm * density_bank
+
+    # Batasi produktivitas fleet ke kemampuan digger
+    capped = total_fleet_productivity_bcm > digger_max_productivity_bcm
+    total_fleet_productivity_bcm = np.where(capped, digger_max_productivity_bcm, total_fleet_productivity_bcm)
+    total_fleet_productivity_tons = np.where(capped, digger_max_productivity_tons, total_fleet_productivity_tons)
+
+    shape = np.broadcast(match_factor, total_fleet_productivity_bcm).shape
+    return {
+        'match_factor': np.broadcast_to(match_factor, shape),
+        'productivity': total_fleet_productivity_bcm,
+        'productivity_tons': total_fleet_productivity_tons,
+        'productivity_per_truck_bcm': np.broadcast_to(truck_productivity_bcm_per_hour, shape),
+        'productivity_per_truck_tons': np.broadcast_to(truck_productivity_tons_per_hour, shape),
+        'loading_time': np.broadcast_to(loading_cycle_truck_hours, shape),
+        'loading_cycle_truck': np.broadcast_to(loading_cycle_truck_hours, shape),
+        'total_cycle_time': np.broadcast_to(total_cycle_time, shape),
+        'job_efficiency': np.broadcast_to(job_efficiency, shape),
+        'bucket_pass': np.broadcast_to(bucket_pass, shape).astype(np.int64),
+        'digger_productivity': np.broadcast_to(digger_max_productivity_bcm, shape),
+    }
+
+def match_factor_grid(excavator_data, truck_data, material_data, haul_distances, truck_counts,
+                      job_condition='Average', reposition_time=20):
+    """Match factor and capped fleet productivity over a haul distance x truck count grid.
+
+    One broadcast pass of calculate_match_factor_batch; result arrays have shape
+    (len(haul_distances), len(truck_counts)).
+    """
+    haul_distances = np.asarray(haul_distances, dtype=float)
+    truck_counts = np.asarray(truck_counts, dtype=float)
+    res = calculate_match_factor_batch(
+        excavator_data, truck_data, material_data,
+        haul_distances[:, None], truck_counts[None, :], job_condition, reposition_time
+    )
+    return {
+        'haul_distance': haul_distances,
+        'num_trucks': truck_counts,
+        'match_factor': np.ascontiguousarray(res['match_factor']),
+        'productivity': res['productivity'],
+        'productivity_tons': res['productivity_tons'],
+    }
+
+def finite_source_queue(excavator_data, truck_data, material_data, haul_distance, max_trucks,
+                        job_condition='Average', reposition_time=20):
+    """Finite-source (machine-repair) M/M/1//N queue for 1..max_trucks trucks.
+
+    The loader is the server (mean service = loading cycle) and each truck is a
+    source whose mean time away is the rest of its cycle. The idle probability
+    p0(N) follows from the recurrence p0(N) = p0(N-1) / (p0(N-1) + N*r), r = load/away,
+    evaluated for all N at once and vectorized over any array-valued inputs. Result
+    arrays have a trailing truck-count axis of length max_trucks: num_trucks,
+    loader_utilisation, mean_wait (minutes in queue per load), throughput (loads/h),
+    productivity (BCM/h) and productivity_tons, capped at the digger capacity like
+    the MF model, plus the ratio match_factor for comparison.
+    """
+    counts = np.arange(1, int(max_trucks) + 1, dtype=float)
+    base = calculate_match_factor_batch(
+        excavator_data, truck_data, material_data, haul_distance, 1, job_condition, reposition_time
+    )
+    service = np.asarray(base['loading_cycle_truck'], dtype=float)[..., None]  # jam per muatan
+    away = np.asarray(base['total_cycle_time'], dtype=float)[..., None] - service
+    ratio = service / away
+
+    p0 = np.empty(np.broadcast_shapes(ratio.shape, counts.shape))
+    prev = np.ones(ratio.shape[:-1])
+    for i, n in enumerate(counts):
+        prev = prev / (prev + n * ratio[..., 0])
+        p0[..., i] = prev
+
+    utilisation = 1.0 - p0
+    throughput = utilisation / service  # muatan per jam
+    in_system = counts - utilisation / ratio
+    mean_wait = np.maximum(in_system / throughput - service, 0.0) * 60
+
+    payload_bcm = np.asarray(base['productivity_per_truck_bcm'], dtype=float)[..., None] * (service + away)
+    digger = np.asarray(base['digger_productivity'], dtype=float)[..., None]
+    productivity = np.minimum(throughput * payload_bcm, digger)
+    density_bank = np.asarray(material_data['density_bank'], dtype=float)[..., None]
+    return {
+        'num_trucks': counts.astype(np.int64),
+        'loader_utilisation': utilisation,
+        'mean_wait': mean_wait,
+        'throughput': throughput,
+        'productivity': productivity,
+        'productivity_tons': productivity * density_bank,
+        'match_factor': counts * service / (service + away),
+    }
+
+def optimal_trucks_finite_source(excavator_data, truck_data, material_data, haul_distance,
+                                 job_condition='Average', reposition_time=20, target_utilisation=0.9):
+    """Truck count (linearly interpolated) where finite-source loader utilisation hits the target"""
+    ratio_optimum = calculate_optimal_trucks_for_mf1(
+        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time
+    )
+    max_trucks = int(np.ceil(ratio_optimum * 4)) + 10
+    utilisation = finite_source_queue(
+        excavator_data, truck_data, material_data, haul_distance, max_trucks, job_condition, reposition_time
+    )['loader_utilisation']
+    above = np.flatnonzero(utilisation >= target_utilisation)
+    if not len(above):
+        return float(max_trucks)
+    i = above[0]
+    if i == 0:
+        return float(target_utilisation / utilisation[0])
+    low, high = utilisation[i - 1], utilisation[i]
+    return float(i + (target_utilisation - low) / (high - low))
+
+def finite_source_optimum(ratio, target_utilisation=0.9):
+    """Vectorized optimal_trucks_finite_source as a function of r = loading / time away only.
+
+    Loader utilisation of the M/M/1//N queue depends on N and r alone, so the
+    interpolated truck count can be tabulated or evaluated for many r at once (same
+    search range and interpolation as optimal_trucks_finite_source).
+    """
+    ratio = np.atleast_1d(np.asarray(ratio, dtype=float))
+    limit = np.ceil((1.0 + 1.0 / ratio) * 4) + 10  # = max_trucks di optimal_trucks_finite_source
+    result = limit.copy()
+    pending = np.isfinite(ratio) & (ratio > 0)
+    result[~pending] = np.nan
+    p0 = np.ones(ratio.shape)
+    previous = np.zeros(ratio.shape)
+    n = 0
+    while pending.any():
+        n += 1
+        p0 = p0 / (p0 + n * ratio)
+        utilisation = 1.0 - p0
+        hit = pending & (utilisation >= target_utilisation) & (n <= limit)
+        if n == 1:
+            result[hit] = target_utilisation / utilisation[hit]
+        else:
+            result[hit] = (n - 1) + (target_utilisation - previous[hit]) / (utilisation[hit] - previous[hit])
+        pending &= ~hit & (n < limit)
+        previous = utilisation
+    return result
+
+def efficiency_status_batch(match_factor):
+    """Vectorized efficiency_status labels for an array of match factors"""
+    match_factor = np.asarray(match_factor)
+    return np.where(
+        (match_factor >= 1.0) & (match_factor <= 1.2),
+        "Optimal",
+        np.where(match_factor < 1.0, "Under-truck", "Over-truck")
+    )
+
+# Kolom numerik katalog yang dipakai batch math, beserta default bila tidak ada
+EXCAVATOR_FIELDS = {'bucket_capacity': np.nan, 'cycle_time': 25.0, 'efficiency': 0.92}
+TRUCK_FIELDS = {'capacity': np.nan, 'speed_loaded': 23, 'speed_empty': 21, 'efficiency': 0.92}
+MATERIAL_FIELDS = {'density_bank': 2.0, 'density_loose': 1.5, 'swell_factor': 0.8, 'fill_factor': 0.9}
+
+def catalog_columns(catalog, fields):
+    """Turn a catalog table or {name: {field: value}} dict into (names, {field: array}) for batch math"""
+    if isinstance(catalog, pd.DataFrame):
+        names = catalog.index.to_numpy(dtype=object)
+        columns = {
+            field: catalog[field].to_numpy(dtype=float) if field in catalog else np.full(len(names), default, dtype=float)
+            for field, default in fields.items()
+        }
+        return names, columns
+    names = np.array(list(catalog.keys()), dtype=object)
+    columns = {
+        field: np.array([catalog[name].get(field, default) for name in names], dtype=float)
+        for field, default in fields.items()
+    }
+    return names, columns
+
+def _catalog_sweep_grid(excavators, trucks, materials, haul_distances, truck_counts, job_conditions,
+                        reposition_time, speed_loaded, speed_empty):
+    """Shared setup for catalog sweeps: axis values, grid shape and a broadcasting evaluator"""
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+    if speed_loaded is not None:
+        truck_cols['speed_loaded'] = np.full(len(truck_names), float(speed_loaded))
+    if speed_empty is not None:
+        truck_cols['speed_empty'] = np.full(len(truck_names), float(speed_empty))
+
+    haul_distances = np.atleast_1d(np.asarray(haul_distances, dtype=float))
+    truck_counts = np.atleast_1d(np.asarray(truck_counts, dtype=int))
+    job_conditions = np.atleast_1d(np.asarray(job_conditions, dtype=object))
+    job_factors = job_efficiency_array(job_conditions.astype(str))
+
+    def evaluate(e, t, m, d, n, j):
+        return calculate_match_factor_batch(
+            {key: col[e] for key, col in exc_cols.items()},
+            {key: col[t] for key, col in truck_cols.items()},
+            {key: col[m] for key, col in mat_cols.items()},
+            haul_distances[d], truck_counts[n], job_factors[j], reposition_time
+        )
+
+    axes = (exc_names, truck_names, mat_names, haul_distances, truck_counts, job_conditions)
+    return axes, tuple(len(axis) for axis in axes), evaluate
+
+SWEEP_RESULT_KEYS = ('match_factor', 'productivity', 'productivity_tons', 'productivity_per_truck_bcm', 'bucket_pass')
+
+def _sweep_frame(axes, e, t, m, d, n, j, res):
+    """Result rows of a catalog sweep for index arrays e..j (flat, same length)"""
+    exc_names, truck_names, mat_names, haul_distances, truck_counts, job_conditions = axes
+    return pd.DataFrame({
+        'Excavator': exc_names[e],
+        'Truck': truck_names[t],
+        'Material': mat_names[m],
+        'Haul_Distance_km': haul_distances[d],
+        'Num_Trucks': truck_counts[n],
+        'Job_Condition': job_conditions[j],
+        'Match_Factor': res['match_factor'],
+        'Total_Fleet_Productivity_BCM': res['productivity'],
+        'Total_Fleet_Productivity_Tons': res['productivity_tons'],
+        'Per_Truck_Productivity_BCM': res['productivity_per_truck_bcm'],
+        'Bucket_Pass': res['bucket_pass'],
+    })
+
+def _sweep_blocks(grid_shape, chunk_size):
+    """Yield (start, combos, broadcast index axes) per block of (excavator, truck, material) combos"""
+    n_combos = grid_shape[0] * grid_shape[1] * grid_shape[2]
+    inner = grid_shape[3] * grid_shape[4] * grid_shape[5]
+    # Satu chunk = blok kombinasi (excavator, truck, material) x seluruh grid skenario
+    block = max(1, chunk_size // max(inner, 1))
+    d_axis = np.arange(grid_shape[3])[None, :, None, None]
+    n_axis = np.arange(grid_shape[4])[None, None, :, None]
+    j_axis = np.arange(grid_shape[5])[None, None, None, :]
+    for start in range(0, n_combos, block):
+        combos = np.arange(start, min(start + block, n_combos), dtype=np.int64)
+        e, t, m = (axis[:, None, None, None] for axis in np.unravel_index(combos, grid_shape[:3]))
+        yield start * inner, (e, t, m, d_axis, n_axis, j_axis)
+
+def sweep_equipment_catalog(excavators, trucks, materials, haul_distances, truck_counts,
+                            job_conditions=('Average',), reposition_time=20,
+                            speed_loaded=None, speed_empty=None,
+                            mf_min=1.0, mf_max=1.2, top_n=50, chunk_size=250_000):
+    """Evaluate every excavator x truck x material x distance x trucks x job condition combination.
+
+    The grid is walked in blocks of equipment combinations of roughly chunk_size
+    scenarios each, so memory stays bounded regardless of catalog size. Only scenarios with mf_min <= MF <= mf_max
+    are kept, and the top_n by capped fleet productivity (BCM/h) are returned as a
+    DataFrame sorted best first (ties go to the MF closest to 1.0). speed_loaded and
+    speed_empty override the catalog speeds when given.
+    """
+    axes, grid_shape, evaluate = _catalog_sweep_grid(
+        excavators, trucks, materials, haul_distances, truck_counts, job_conditions,
+        reposition_time, speed_loaded, speed_empty
+    )
+
+    best_index = np.empty(0, dtype=np.int64)
+    best_score = np.empty(0, dtype=float)
+    best_dev = np.empty(0, dtype=float)
+    for offset, index_axes in _sweep_blocks(grid_shape, chunk_size):
+        res = evaluate(*index_axes)
+        mf = res['match_factor'].ravel()
+        feasible = np.flatnonzero((mf >= mf_min) & (mf <= mf_max))
+        # Indeks datar grid = combo * inner + indeks skenario di dalam blok
+        cand_index = np.concatenate([best_index, offset + feasible])
+        cand_score = np.concatenate([best_score, res['productivity'].ravel()[feasible]])
+        cand_dev = np.concatenate([best_dev, np.abs(mf[feasible] - 1.0)])
+        if len(cand_index) > top_n:
+            # Ambil semua yang >= skor ke-N dulu (termasuk seri), baru urutkan deterministik
+            threshold = -np.partition(-cand_score, top_n - 1)[top_n - 1]
+            keep = np.flatnonzero(cand_score >= threshold)
+            keep = keep[np.lexsort((cand_index[keep], cand_dev[keep], -cand_score[keep]))][:top_n]
+            cand_index, cand_score, cand_dev = cand_index[keep], cand_score[keep], cand_dev[keep]
+        best_index, best_score, best_dev = cand_index, cand_score, cand_dev
+
+    # Urutan final: produktivitas turun, MF terdekat ke 1.0, lalu indeks grid naik
+    order = np.lexsort((best_index, best_dev, -best_score))
+    index = np.unravel_index(best_index[order], grid_shape)
+    return _sweep_frame(axes, *index, evaluate(*index))
+
+def iter_catalog_sweep(excavators, trucks, materials, haul_distances, truck_counts,
+                       job_conditions=('Average',), reposition_time=20,
+                       speed_loaded=None, speed_empty=None, mf_min=None, mf_max=None, chunk_size=250_000):
+    """Yield every scenario of a catalog sweep as DataFrame chunks (same columns as sweep_equipment_catalog).
+
+    Rows come in grid order, roughly chunk_size per chunk, so exports of millions of
+    rows never hold more than one chunk. mf_min / mf_max optionally filter rows; if
+    the filter drops every row, one empty chunk with the same columns is yielded so
+    writers still get the schema.
+    """
+    axes, grid_shape, evaluate = _catalog_sweep_grid(
+        excavators, trucks, materials, haul_distances, truck_counts, job_conditions,
+        reposition_time, speed_loaded, speed_empty
+    )
+    yielded, empty = False, None
+    for offset, index_axes in _sweep_blocks(grid_shape, chunk_size):
+        res = evaluate(*index_axes)
+        shape = res['match_factor'].shape
+        mf = res['match_factor'].ravel()
+        keep = np.ones(mf.shape, dtype=bool)
+        if mf_min is not None:
+            keep &= mf >= mf_min
+        if mf_max is not None:
+            keep &= mf <= mf_max
+        rows = np.flatnonzero(keep)
+        if len(rows) == 0 and (yielded or empty is not None):
+            continue
+        index = np.unravel_index(offset + rows, grid_shape)
+        flat = {key: np.broadcast_to(res[key], shape).ravel()[rows] for key in SWEEP_RESULT_KEYS}
+        if len(rows) == 0:
+            # Frame kosong (dtype sama) sebagai fallback bila tidak ada baris yang lolos filter
+            empty = _sweep_frame(axes, *index, flat)
+            continue
+        yielded = True
+        yield _sweep_frame(axes, *index, flat)
+    if not yielded and empty is not None:
+        yield empty
+
+# Urutan sumbu grid untuk parallel sweep (indeks datar mengikuti urutan ini)
+PARALLEL_SWEEP_AXES = ('excavator', 'truck', 'material', 'haul_distance', 'speed_loaded',
+                       'speed_empty', 'reposition_time', 'num_trucks', 'job_condition')
+
+def _run_sweep_shard(spec, shard_id, start, stop, shard_path):
+    """Evaluate grid indices [start, stop) and write the in-band scenarios to shard_path"""
+    axes = spec['axes']
+    grid_shape = tuple(len(axes[name]) for name in PARALLEL_SWEEP_AXES)
+    flat = np.arange(start, stop, dtype=np.int64)
+    e, t, m, d, sl, se, r, n, j = np.unravel_index(flat, grid_shape)
+    truck_data = {key: col[t] for key, col in spec['trucks'].items()}
+    truck_data['speed_loaded'] = axes['speed_loaded'][sl]
+    truck_data['speed_empty'] = axes['speed_empty'][se]
+    res = calculate_match_factor_batch(
+        {key: col[e] for key, col in spec['excavators'].items()},
+        truck_data,
+        {key: col[m] for key, col in spec['materials'].items()},
+        axes['haul_distance'][d], axes['num_trucks'][n], spec['job_factors'][j], axes['reposition_time'][r]
+    )
+    keep = (res['match_factor'] >= spec['mf_min']) & (res['match_factor'] <= spec['mf_max'])
+    # Tulis ke file sementara lalu rename, supaya shard setengah jadi tidak pernah terbaca saat resume
+    tmp_path = shard_path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        index=flat[keep],
+        match_factor=res['match_factor'][keep],
+        productivity=res['productivity'][keep],
+        productivity_tons=res['productivity_tons'][keep],
+        productivity_per_truck_bcm=res['productivity_per_truck_bcm'][keep],
+        total_cycle_time=res['total_cycle_time'][keep],
+    )
+    os.replace(tmp_path, shard_path)
+    return shard_id
+
+def run_parallel_sweep(excavators, trucks, materials, haul_distances, truck_counts,
+                       speeds_loaded, speeds_empty, reposition_times, job_conditions=('Average',),
+                       checkpoint_dir='sweep_checkpoints', max_workers=None, shard_size=2_000_000,
+                       mf_min=1.0, mf_max=1.2):
+    """Shard a very large scenario grid across a process pool with on-disk checkpoints.
+
+    The grid is excavator x truck x material x distance x loaded speed x empty speed x
+    reposition time x trucks x job condition. Each shard is a contiguous range of flat
+    grid indices evaluated with calculate_match_factor_batch and saved as
+    checkpoint_dir/shard_NNNNNN.npz. Shards already on disk are skipped, so rerunning
+    with the same arguments resumes after an interruption; a manifest guards against
+    resuming with a different grid. Returns every scenario with mf_min <= MF <= mf_max
+    ordered by grid index, independent of max_workers.
+    """
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+    job_conditions = np.atleast_1d(np.asarray(job_conditions, dtype=object))
+    axes = {
+        'excavator': exc_names,
+        'truck': truck_names,
+        'material': mat_names,
+        'haul_distance': np.atleast_1d(np.asarray(haul_distances, dtype=float)),
+        'speed_loaded': np.atleast_1d(np.asarray(speeds_loaded, dtype=float)),
+        'speed_empty': np.atleast_1d(np.asarray(speeds_empty, dtype=float)),
+        'reposition_time': np.atleast_1d(np.asarray(reposition_times, dtype=float)),
+        'num_trucks': np.atleast_1d(np.asarray(truck_counts, dtype=int)),
+        'job_condition': job_conditions,
+    }
+    spec = {
+        'axes': axes,
+        'excavators': exc_cols,
+        'trucks': truck_cols,
+        'materials': mat_cols,
+        'job_factors': np.atleast_1d(job_efficiency_array(job_conditions.astype(str))),
+        'mf_min': mf_min,
+        'mf_max': mf_max,
+    }
+    grid_shape = tuple(len(axes[name]) for name in PARALLEL_SWEEP_AXES)
+    total = int(np.prod(grid_shape))
+    bounds = [(start, min(start + shard_size, total)) for start in range(0, total, shard_size)]
+
+    # Manifest: sidik jari grid + katalog, supaya resume tidak mencampur hasil grid lain
+    fingerprint = hashlib.sha256()
+    for name in PARALLEL_SWEEP_AXES:
+        fingerprint.update(repr(axes[name].tolist()).encode())
+    for cols in (exc_cols, truck_cols, mat_cols):
+        for key in sorted(cols):
+            fingerprint.update(key.encode() + cols[key].tobytes())
+    fingerprint.update(repr((mf_min, mf_max, shard_size)).encode())
+    manifest = {'fingerprint': fingerprint.hexdigest(), 'total': total, 'shards': len(bounds)}
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != manifest:
+                raise ValueError(f"Checkpoint di {checkpoint_dir} berasal dari grid sweep yang berbeda")
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+    shard_paths = [os.path.join(checkpoint_dir, f'shard_{i:06d}.npz') for i in range(len(bounds))]
+    pending = [i for i, path in enumerate(shard_paths) if not os.path.exists(path)]
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_run_sweep_shard, spec, i, bounds[i][0], bounds[i][1], shard_paths[i])
+                for i in pending
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+    # Gabungkan shard sesuai urutan id -> urutan output deterministik
+    parts = []
+    for path in shard_paths:
+        with np.load(path) as shard:
+            parts.append({key: shard[key] for key in shard.files})
+    if not parts:
+        return pd.DataFrame()
+    columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    idx = np.unravel_index(columns.pop('index'), grid_shape)
+    frame = {
+        'Excavator': axes['excavator'][idx[0]],
+        'Truck': axes['truck'][idx[1]],
+        'Material': axes['material'][idx[2]],
+        'Haul_Distance_km': axes['haul_distance'][idx[3]],
+        'Speed_Loaded_kmh': axes['speed_loaded'][idx[4]],
+        'Speed_Empty_kmh': axes['speed_empty'][idx[5]],
+        'Reposition_Time_s': axes['reposition_time'][idx[6]],
+        'Num_Trucks': axes['num_trucks'][idx[7]],
+        'Job_Condition': axes['job_condition'][idx[8]],
+        'Match_Factor': columns['match_factor'],
+        'Total_Fleet_Productivity_BCM': columns['productivity'],
+        'Total_Fleet_Productivity_Tons': columns['productivity_tons'],
+        'Per_Truck_Productivity_BCM': columns['productivity_per_truck_bcm'],
+        'Total_Cycle_Time_h': columns['total_cycle_time'],
+    }
+    return pd.DataFrame(frame)
+
+# Kolom hasil yang ditambahkan score_scenarios ke setiap baris skenario
+SCENARIO_RESULT_COLUMNS = ('match_factor', 'productivity', 'productivity_tons', 'productivity_per_truck_bcm',
+                           'productivity_per_truck_tons', 'total_cycle_time', 'bucket_pass', 'efficiency_status')
+
+def _lookup_columns(catalog, fields, names):
+    """Gather catalog columns for a Series of equipment names; unknown names give NaN"""
+    catalog_names, columns = catalog_columns(catalog, fields)
+    index = pd.Index(catalog_names).get_indexer(names.astype(str).str.strip())
+    # Indeks -1 (tidak ditemukan) jatuh ke elemen NaN yang ditambahkan di akhir
+    gathered = {key: np.append(col, np.nan)[index] for key, col in columns.items()}
+    return gathered, index >= 0
+
+def score_scenarios(scenarios, excavators, trucks, materials):
+    """Evaluate a DataFrame of named scenarios against the catalog in one batch.
+
+    Required columns: excavator, truck, material, haul_distance, num_trucks. Optional:
+    job_condition (default 'Average'), reposition_time (20 s), speed_loaded and
+    speed_empty (catalog speeds). Returns the input with SCENARIO_RESULT_COLUMNS
+    appended; rows naming equipment not in the catalog get NaN and status 'Unknown'.
+    """
+    exc, exc_known = _lookup_columns(excavators, EXCAVATOR_FIELDS, scenarios['excavator'])
+    truck, truck_known = _lookup_columns(trucks, TRUCK_FIELDS, scenarios['truck'])
+    mat, mat_known = _lookup_columns(materials, MATERIAL_FIELDS, scenarios['material'])
+    for speed in ('speed_loaded', 'speed_empty'):
+        if speed in scenarios:
+            truck[speed] = scenarios[speed].astype(float).fillna(pd.Series(truck[speed], index=scenarios.index)).to_numpy()
+    job_condition = scenarios['job_condition'].fillna('Average').astype(str).to_numpy() if 'job_condition' in scenarios else 'Average'
+    reposition_time = scenarios['reposition_time'].astype(float).fillna(20).to_numpy() if 'reposition_time' in scenarios else 20
+
+    with np.errstate(invalid='ignore'):
+        res = calculate_match_factor_batch(
+            exc, truck, mat,
+            scenarios['haul_distance'].to_numpy(dtype=float),
+            scenarios['num_trucks'].to_numpy(dtype=float),
+            job_condition, reposition_time
+        )
+    known = exc_known & truck_known & mat_known
+    results = {key: res[key] for key in SCENARIO_RESULT_COLUMNS[:-2]}
+    results['bucket_pass'] = pd.array(np.where(known, res['bucket_pass'], 0), dtype='Int64')
+    results['bucket_pass'][~known] = pd.NA
+    results['efficiency_status'] = np.where(known, efficiency_status_batch(res['match_factor']), 'Unknown')
+    # Satu concat, bukan setitem per kolom: overhead pandas per request kecil tetap rendah
+    scored = pd.DataFrame(results, index=scenarios.index)
+    return pd.concat([scenarios.drop(columns=scored.columns, errors='ignore'), scored], axis=1)
+
+def scenario_key(excavator, truck, material, speed_loaded, speed_empty, haul_distance, num_trucks,
+                 job_condition='Average', reposition_time=20):
+    """Normalized, hashable key for one dashboard scenario (names stripped, floats rounded)"""
+    return (
+        str(excavator).strip(), str(truck).strip(), str(material).strip(),
+        round(float(speed_loaded), 6), round(float(speed_empty), 6), round(float(haul_distance), 6),
+        int(num_trucks), str(job_condition).strip(), round(float(reposition_time), 6),
+    )
+
+class ScenarioMemo:
+    """Bounded, thread-safe LRU memo for scenario results with hit/miss/eviction counters.
+
+    Values are shared by reference, so callers must treat them as read-only.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, or compute(), store and return it"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Hitung di luar lock supaya sesi lain tidak ikut menunggu
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+# Sebaran input Monte Carlo: parameter -> (distribusi, sebaran relatif terhadap nilai nominal)
+# normal: sebaran = koefisien variasi; triangular/uniform: sebaran = setengah lebar (fraksi nominal)
+# 'density' menskalakan density_bank dan density_loose bersama (material yang sama)
+DEFAULT_UNCERTAINTY = {
+    'cycle_time': ('normal', 0.10),
+    'speed_loaded': ('triangular', 0.15),
+    'speed_empty': ('triangular', 0.15),
+    'reposition_time': ('uniform', 0.50),
+    'density': ('normal', 0.05),
+    'dumping_time': ('triangular', 0.30),
+    'spotting_time': ('triangular', 0.30),
+}
+MONTE_CARLO_DISTRIBUTIONS = ('normal', 'triangular', 'uniform', 'fixed')
+
+def _sample_factor(rng, dist, spread, size):
+    """Multiplicative factors around 1.0, floored at 5% so samples stay physical"""
+    if dist == 'fixed' or spread <= 0:
+        return np.ones(size)
+    if dist == 'normal':
+        factor = rng.normal(1.0, spread, size)
+    elif dist == 'triangular':
+        factor = rng.triangular(1.0 - spread, 1.0, 1.0 + spread, size)
+    elif dist == 'uniform':
+        factor = rng.uniform(1.0 - spread, 1.0 + spread, size)
+    else:
+        raise ValueError(f"Distribusi tidak dikenal: {dist!r} (pilihan: {', '.join(MONTE_CARLO_DISTRIBUTIONS)})")
+    return np.maximum(factor, 0.05)
+
+def _monte_carlo_chunks(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                        job_condition, reposition_time, n_draws, uncertainty, seed, chunk_size):
+    """Yield (factors, results) per chunk of draws; shared by the summary and the draw export"""
+    uncertainty = dict(DEFAULT_UNCERTAINTY if uncertainty is None else uncertainty)
+    unknown = set(uncertainty) - set(DEFAULT_UNCERTAINTY)
+    if unknown:
+        raise ValueError(f"Parameter ketidakpastian tidak dikenal: {', '.join(sorted(unknown))}")
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, n_draws, chunk_size):
+        size = min(chunk_size, n_draws - start)
+        factor = {
+            name: _sample_factor(rng, *uncertainty.get(name, ('fixed', 0.0)), size)
+            for name in DEFAULT_UNCERTAINTY
+        }
+        excavator = dict(excavator_data, cycle_time=excavator_data['cycle_time'] * factor['cycle_time'])
+        truck = dict(
+            truck_data,
+            speed_loaded=truck_data['speed_loaded'] * factor['speed_loaded'],
+            speed_empty=truck_data['speed_empty'] * factor['speed_empty'],
+        )
+        material = dict(
+            material_data,
+            density_bank=material_data['density_bank'] * factor['density'],
+            density_loose=material_data['density_loose'] * factor['density'],
+        )
+        res = calculate_match_factor_batch(
+            excavator, truck, material, haul_distance, num_trucks, job_condition,
+            reposition_time * factor['reposition_time'],
+            dumping_time=1.4 * factor['dumping_time'],
+            spotting_time=0.7 * factor['spotting_time'],
+        )
+        yield factor, res
+
+def monte_carlo_match_factor(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                             job_condition='Average', reposition_time=20, n_draws=100_000,
+                             uncertainty=None, seed=42, chunk_size=250_000, percentiles=(10, 50, 90)):
+    """Monte Carlo match factor and fleet productivity for one fleet.
+
+    Inputs listed in uncertainty (default DEFAULT_UNCERTAINTY) are sampled around
+    their nominal values and pushed through calculate_match_factor_batch in chunks
+    of chunk_size draws. Results are reproducible for a given seed and chunk_size.
+    Returns a dict with a 'summary' DataFrame (P10/P50/P90 and mean per metric),
+    'p_loader_bottleneck' (share of draws where the digger caps fleet output) and
+    'n_draws'.
+    """
+    n_draws = int(n_draws)
+    match_factor = np.empty(n_draws, dtype=np.float32)
+    productivity = np.empty(n_draws, dtype=np.float32)
+    productivity_tons = np.empty(n_draws, dtype=np.float32)
+    loader_bound = 0
+
+    start = 0
+    for _, res in _monte_carlo_chunks(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                                      job_condition, reposition_time, n_draws, uncertainty, seed, chunk_size):
+        stop = start + len(res['match_factor'])
+        match_factor[start:stop] = res['match_factor']
+        productivity[start:stop] = res['productivity']
+        productivity_tons[start:stop] = res['productivity_tons']
+        loader_bound += int(np.count_nonzero(res['productivity'] >= res['digger_productivity']))
+        start = stop
+
+    rows = {}
+    for metric, values in (('match_factor', match_factor), ('productivity', productivity),
+                           ('productivity_tons', productivity_tons)):
+        qs = np.percentile(values, percentiles)
+        rows[metric] = {**{f'P{p:g}': float(q) for p, q in zip(percentiles, qs)}, 'mean': float(values.mean(dtype=np.float64))}
+    return {
+        'summary': pd.DataFrame.from_dict(rows, orient='index'),
+        'p_loader_bottleneck': loader_bound / n_draws if n_draws else float('nan'),
+        'n_draws': n_draws,
+    }
+
+def iter_monte_carlo_draws(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                           job_condition='Average', reposition_time=20, n_draws=100_000,
+                           uncertainty=None, seed=42, chunk_size=250_000):
+    """Yield the individual Monte Carlo draws as DataFrame chunks.
+
+    Same sampling as monte_carlo_match_factor (identical draws for the same seed and
+    chunk_size): one row per draw with the sampled multiplicative factors and the
+    resulting match factor, productivity and loader-bound flag.
+    """
+    start = 0
+    for factor, res in _monte_carlo_chunks(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                                           job_condition, reposition_time, int(n_draws), uncertainty, seed,
+                                           chunk_size):
+        size = len(res['match_factor'])
+        chunk = {'draw': np.arange(start, start + size)}
+        chunk.update({f'factor_{name}': values.astype(np.float32) for name, values in factor.items()})
+        chunk['match_factor'] = res['match_factor'].astype(np.float32)
+        chunk['productivity'] = res['productivity'].astype(np.float32)
+        chunk['productivity_tons'] = res['productivity_tons'].astype(np.float32)
+        chunk['loader_bound'] = res['productivity'] >= res['digger_productivity']
+        start += size
+        yield pd.DataFrame(chunk)
+
+# Input calculate_match_factor yang diuji sensitivitasnya: nama -> (grup, field)
+SENSITIVITY_PARAMETERS = {
+    'haul_distance': ('scenario', 'haul_distance'),
+    'speed_loaded': ('truck', 'speed_loaded'),
+    'speed_empty': ('truck', 'speed_empty'),
+    'cycle_time': ('excavator', 'cycle_time'),
+    'bucket_capacity': ('excavator', 'bucket_capacity'),
+    'excavator_efficiency': ('excavator', 'efficiency'),
+    'truck_capacity': ('truck', 'capacity'),
+    'truck_efficiency': ('truck', 'efficiency'),
+    'fill_factor': ('material', 'fill_factor'),
+    'swell_factor': ('material', 'swell_factor'),
+    'density_loose': ('material', 'density_loose'),
+    'density_bank': ('material', 'density_bank'),
+    'reposition_time': ('scenario', 'reposition_time'),
+    'job_efficiency': ('scenario', 'job_efficiency'),
+    'num_trucks': ('scenario', 'num_trucks'),
+}
+
+def _sensitivity_arrays(groups, parameters, swing, step):
+    """Evaluate base, +-swing and +-step perturbations of every parameter in one batch call.
+
+    groups maps 'excavator', 'truck', 'material' and 'scenario' to {field: array (K,)}.
+    Returns base MF/productivity (K,) and per-parameter results (K, P).
+    """
+    n_params = len(parameters)
+    # Slot: 0 = basis, lalu -swing, +swing, -step, +step untuk tiap parameter
+    factors = np.ones((1 + 4 * n_params, n_params))
+    for p in range(n_params):
+        factors[1 + p, p] = 1.0 - swing
+        factors[1 + n_params + p, p] = 1.0 + swing
+        factors[1 + 2 * n_params + p, p] = 1.0 - step
+        factors[1 + 3 * n_params + p, p] = 1.0 + step
+    values = {group: {field: np.asarray(col, dtype=float)[:, None] for field, col in cols.items()}
+              for group, cols in groups.items()}
+    for p, name in enumerate(parameters):
+        group, field = SENSITIVITY_PARAMETERS[name]
+        values[group][field] = values[group][field] * factors[None, :, p]
+    scenario = values['scenario']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        res = calculate_match_factor_batch(
+            values['excavator'], values['truck'], values['material'], scenario['haul_distance'],
+            scenario['num_trucks'], scenario['job_efficiency'], scenario['reposition_time']
+        )
+    out = {'mf_base': res['match_factor'][:, 0], 'productivity_base': res['productivity'][:, 0]}
+    for metric, key in (('mf', 'match_factor'), ('productivity', 'productivity')):
+        result = res[key]
+        base = result[:, :1]
+        low, high = result[:, 1:1 + n_params], result[:, 1 + n_params:1 + 2 * n_params]
+        down, up = result[:, 1 + 2 * n_params:1 + 3 * n_params], result[:, 1 + 3 * n_params:]
+        out[f'{metric}_low'] = low
+        out[f'{metric}_high'] = high
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[f'{metric}_elasticity'] = (up - down) / (2 * step * base)
+    return out
+
+def sensitivity_analysis(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                         job_condition='Average', reposition_time=20, swing=0.10, step=0.01, parameters=None):
+    """Local sensitivity of MF and capped fleet productivity to every model input.
+
+    Each parameter in SENSITIVITY_PARAMETERS is moved by -swing/+swing (relative,
+    others at base) for the tornado values, and by +-step for a central-difference
+    elasticity (% change of output per % change of input), all in one vectorized
+    evaluation. Bucket pass is rounded up, so bucket and truck capacity inputs can
+    show step changes or zero elasticity. Returns a DataFrame indexed by parameter;
+    attrs holds the base match_factor and productivity.
+    """
+    parameters = list(SENSITIVITY_PARAMETERS if parameters is None else parameters)
+    groups = {
+        'excavator': {field: [excavator_data.get(field, default)] for field, default in EXCAVATOR_FIELDS.items()},
+        'truck': {field: [truck_data.get(field, default)] for field, default in TRUCK_FIELDS.items()},
+        'material': {field: [material_data.get(field, default)] for field, default in MATERIAL_FIELDS.items()},
+        'scenario': {
+            'haul_distance': [haul_distance], 'num_trucks': [num_trucks], 'reposition_time': [reposition_time],
+            'job_efficiency': [job_efficiency_array(job_condition)],
+        },
+    }
+    out = _sensitivity_arrays(groups, parameters, swing, step)
+    frame = pd.DataFrame({
+        'base_value': [groups[SENSITIVITY_PARAMETERS[name][0]][SENSITIVITY_PARAMETERS[name][1]][0] for name in parameters],
+        'mf_low': out['mf_low'][0],
+        'mf_high': out['mf_high'][0],
+        'mf_elasticity': out['mf_elasticity'][0],
+        'productivity_low': out['productivity_low'][0],
+        'productivity_high': out['productivity_high'][0],
+        'productivity_elasticity': out['productivity_elasticity'][0],
+    }, index=pd.Index(parameters, name='parameter'))
+    frame.attrs.update(match_factor=float(out['mf_base'][0]), productivity=float(out['productivity_base'][0]),
+                       swing=swing)
+    return frame
+
+def sensitivity_catalog(excavators, trucks, materials, haul_distance, num_trucks=None, job_condition='Average',
+                        reposition_time=20, speed_loaded=None, speed_empty=None, swing=0.10, parameters=None,
+                        chunk_size=500_000):
+    """Rank every excavator x truck x material fleet by robustness of capped productivity.
+
+    num_trucks=None sizes each fleet at the ratio optimum rounded up (MF >= 1).
+    For each fleet the productivity swing (high - low, % of base) is computed for
+    every parameter at +-swing; fleets are sorted by the largest swing, most robust
+    first. Fleets with invalid catalog data are dropped; an empty catalog gives an
+    empty frame with the same columns.
+    """
+    parameters = list(SENSITIVITY_PARAMETERS if parameters is None else parameters)
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+    if speed_loaded is not None:
+        truck_cols['speed_loaded'] = np.full(len(truck_names), float(speed_loaded))
+    if speed_empty is not None:
+        truck_cols['speed_empty'] = np.full(len(truck_names), float(speed_empty))
+    shape = (len(exc_names), len(truck_names), len(mat_names))
+    n_fleets = shape[0] * shape[1] * shape[2]
+    block = max(1, chunk_size // (1 + 4 * len(parameters)))
+
+    frames = []
+    # Minimal satu blok (bisa kosong), jadi katalog kosong tetap menghasilkan kolom dan dtype yang sama
+    for start in range(0, max(n_fleets, 1), block):
+        e, t, m = np.unravel_index(np.arange(start, min(start + block, n_fleets)), shape)
+        exc = {field: col[e] for field, col in exc_cols.items()}
+        truck = {field: col[t] for field, col in truck_cols.items()}
+        mat = {field: col[m] for field, col in mat_cols.items()}
+        job = np.broadcast_to(job_efficiency_array(job_condition), e.shape)
+        if num_trucks is None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                base = calculate_match_factor_batch(exc, truck, mat, haul_distance, 1, job, reposition_time)
+                trucks_needed = np.ceil(np.round(1.0 / base['match_factor'], 9))
+        else:
+            trucks_needed = np.full(e.shape, float(num_trucks))
+        groups = {
+            'excavator': exc, 'truck': truck, 'material': mat,
+            'scenario': {
+                'haul_distance': np.full(e.shape, float(haul_distance)), 'num_trucks': trucks_needed,
+                'reposition_time': np.full(e.shape, float(reposition_time)), 'job_efficiency': job,
+            },
+        }
+        out = _sensitivity_arrays(groups, parameters, swing, 0.01)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            swing_pct = np.abs(out['productivity_high'] - out['productivity_low']) / out['productivity_base'][:, None] * 100
+        valid = np.isfinite(out['productivity_base']) & (out['productivity_base'] > 0) & np.isfinite(swing_pct).all(axis=1)
+        frame = pd.DataFrame({
+            'Excavator': exc_names[e],
+            'Truck': truck_names[t],
+            'Material': mat_names[m],
+            'Num_Trucks': trucks_needed.astype(float),
+            'Match_Factor': out['mf_base'],
+            'Productivity_BCM': out['productivity_base'],
+            'Max_Swing_Pct': np.max(swing_pct, axis=1, initial=0.0),
+            'Most_Sensitive': np.array(parameters, dtype=object)[np.argmax(np.nan_to_num(swing_pct, nan=-1.0), axis=1)],
+        })
+        for p, name in enumerate(parameters):
+            frame[f'Swing_{name}_Pct'] = swing_pct[:, p]
+        frames.append(frame[valid])
+    result = pd.concat(frames, ignore_index=True)
+    result['Num_Trucks'] = result['Num_Trucks'].astype(np.int64)
+    return result.sort_values(['Max_Swing_Pct', 'Productivity_BCM'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+# Input yang bisa dicari goal seek: nama -> (grup, field, bracket default)
+GOAL_SEEK_VARIABLES = {
+    'haul_distance': ('scenario', 'haul_distance', (0.0, 100.0)),
+    'speed_loaded': ('truck', 'speed_loaded', (0.5, 100.0)),
+    'speed_empty': ('truck', 'speed_empty', (0.5, 100.0)),
+    'reposition_time': ('scenario', 'reposition_time', (0.0, 600.0)),
+    'num_trucks': ('scenario', 'num_trucks', (0.0, 1000.0)),
+    'bucket_pass': ('truck', 'capacity', (1, 60)),
+}
+GOAL_SEEK_TARGETS = ('match_factor', 'productivity', 'productivity_tons')
+
+def goal_seek_batch(excavator_data, truck_data, material_data, haul_distance, num_trucks, variable, target,
+                    target_metric='match_factor', job_condition='Average', reposition_time=20,
+                    lower=None, upper=None, xtol=1e-9, max_iter=100, trucks=None):
+    """Solve one model input for a target MF or fleet productivity, for many scenarios at once.
+
+    variable is a key of GOAL_SEEK_VARIABLES; its value in the inputs is ignored.
+    target_metric is 'match_factor', 'productivity' (BCM/h) or 'productivity_tons'.
+    All inputs, target and the bracket [lower, upper] broadcast like
+    calculate_match_factor_batch. Every output is monotone in each of these inputs,
+    so a vectorized bisection keeps, per scenario, the bracket end that meets the
+    target (output >= target); the digger cap only adds a plateau, which moves the
+    answer to the edge of the plateau. The result is the boundary of the region
+    where the target is met, e.g. the break-even haul distance for a tonnes/hour
+    target. bucket_pass is searched over integers (the ceil in bucket pass) on a
+    hypothetical truck loaded to exactly that many passes, other truck fields as
+    given. Pass the truck catalog as trucks to turn that into a real truck: every
+    catalog capacity is evaluated (bucket pass as in BucketPassFitMatrix) and the
+    truck that meets the target with the pass count nearest the solved boundary is
+    returned (ties: largest payload), as 'truck', 'truck_capacity',
+    'truck_bucket_pass' and 'truck_achieved' (None / NaN where no catalog truck
+    meets the target).
+
+    Returns a dict of arrays: value (NaN unless solved), achieved, status
+    ('solved', 'met_everywhere', 'unreachable', 'invalid') and iterations.
+    """
+    if variable not in GOAL_SEEK_VARIABLES:
+        raise ValueError(f"Variabel goal seek tidak dikenal: {variable!r} (pilihan: {', '.join(GOAL_SEEK_VARIABLES)})")
+    if target_metric not in GOAL_SEEK_TARGETS:
+        raise ValueError(f"Target tidak dikenal: {target_metric!r} (pilihan: {', '.join(GOAL_SEEK_TARGETS)})")
+    group, field, (default_lower, default_upper) = GOAL_SEEK_VARIABLES[variable]
+    integer = variable == 'bucket_pass'
+    inputs = {
+        'excavator': dict(excavator_data), 'truck': dict(truck_data), 'material': dict(material_data),
+        'scenario': {'haul_distance': haul_distance, 'num_trucks': num_trucks, 'reposition_time': reposition_time,
+                     'job_efficiency': job_efficiency_array(job_condition)},
+    }
+    target = np.asarray(target, dtype=float)
+    lower = np.asarray(default_lower if lower is None else lower, dtype=float)
+    upper = np.asarray(default_upper if upper is None else upper, dtype=float)
+    shape = np.broadcast_shapes(
+        target.shape, lower.shape, upper.shape,
+        *(np.shape(value) for cols in inputs.values() for value in cols.values())
+    )
+    # Muatan truck per pass (ton); bucket pass = ceil(kapasitas / muatan per pass)
+    pass_payload = (np.asarray(excavator_data['bucket_capacity'], dtype=float)
+                    * np.asarray(material_data['density_loose'], dtype=float))
+
+    def pass_capacity(passes):
+        # Sedikit di bawah p x muatan agar ceil tetap p meski ada galat pembulatan float
+        return (passes - 1e-9) * pass_payload
+
+    def evaluate(x):
+        values = {name: dict(cols) for name, cols in inputs.items()}
+        if integer:
+            values['truck']['capacity'] = pass_capacity(x)
+        else:
+            values[group][field] = x
+        scenario = values['scenario']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            res = calculate_match_factor_batch(
+                values['excavator'], values['truck'], values['material'], scenario['haul_distance'],
+                scenario['num_trucks'], scenario['job_efficiency'], scenario['reposition_time']
+            )
+        return np.broadcast_to(res[target_metric], shape)
+
+    lo = np.broadcast_to(np.ceil(lower) if integer else lower, shape).copy()
+    hi = np.broadcast_to(np.floor(upper) if integer else upper, shape).copy()
+    f_lo, f_hi = evaluate(lo), evaluate(hi)
+    meets_lo, meets_hi = f_lo >= target, f_hi >= target
+    invalid = ~(np.isfinite(f_lo) & np.isfinite(f_hi))
+    active = (meets_lo != meets_hi) & ~invalid
+
+    iterations = 0
+    while iterations < max_iter:
+        if integer:
+            open_ = active & (hi - lo > 1)
+        else:
+            open_ = active & (hi - lo > xtol * (1.0 + np.abs(lo) + np.abs(hi)))
+        if not open_.any():
+            break
+        mid = np.floor((lo + hi) / 2) if integer else (lo + hi) / 2
+        meets_mid = evaluate(mid) >= target
+        move_lo = open_ & (meets_mid == meets_lo)
+        move_hi = open_ & ~move_lo
+        lo = np.where(move_lo, mid, lo)
+        hi = np.where(move_hi, mid, hi)
+        iterations += 1
+
+    # Ujung bracket yang masih memenuhi target = batas daerah feasible
+    value = np.where(active, np.where(meets_lo, lo, hi), np.nan)
+    status = np.full(shape, 'solved', dtype=object)
+    status[~active & meets_lo & meets_hi] = 'met_everywhere'
+    status[~active & ~meets_lo & ~meets_hi] = 'unreachable'
+    status[invalid] = 'invalid'
+    result = {
+        'value': value,
+        'achieved': np.where(active, evaluate(np.where(active, value, lo)), np.nan),
+        'status': status,
+        'iterations': iterations,
+    }
+    if integer and trucks is not None:
+        result.update(_catalog_bucket_pass_trucks(inputs, shape, trucks, pass_payload, value, target, target_metric))
+    return result
+
+def _catalog_bucket_pass_trucks(inputs, shape, trucks, pass_payload, passes, target, target_metric):
+    """Catalog truck meeting the target with the bucket pass nearest the goal-seek boundary, per scenario"""
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    capacity = truck_cols['capacity']
+    # Sumbu terakhir = truck katalog; input skenario di-broadcast ke shape lalu diberi sumbu baru
+    values = {name: {key: np.broadcast_to(np.asarray(value), shape)[..., None] for key, value in cols.items()}
+              for name, cols in inputs.items()}
+    values['truck']['capacity'] = capacity
+    fill_factor = values['material']['fill_factor']
+    scenario = values['scenario']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Formula sama dengan BucketPassFitMatrix / calculate_match_factor agar ceil identik
+        truck_passes = np.ceil((capacity * fill_factor) / (fill_factor * np.broadcast_to(pass_payload, shape)[..., None]))
+        res = calculate_match_factor_batch(
+            values['excavator'], values['truck'], values['material'], scenario['haul_distance'],
+            scenario['num_trucks'], scenario['job_efficiency'], scenario['reposition_time']
+        )
+    achieved = np.broadcast_to(res[target_metric], shape + capacity.shape)
+    meets = (achieved >= np.broadcast_to(target, shape)[..., None]) & np.isfinite(truck_passes)
+    # Tanpa batas (met_everywhere) semua jarak dianggap sama, jadi payload terbesar yang menang
+    distance = np.where(meets, np.nan_to_num(np.abs(truck_passes - passes[..., None]), nan=0.0), np.inf)
+    nearest = meets & (distance == distance.min(axis=-1, keepdims=True))
+    pick = np.argmax(np.where(nearest, capacity, -np.inf), axis=-1)[..., None]
+    found = meets.any(axis=-1)
+    return {
+        'truck': np.where(found, truck_names[pick[..., 0]], None),
+        'truck_capacity': np.where(found, capacity[pick[..., 0]], np.nan),
+        'truck_bucket_pass': np.where(found, np.take_along_axis(truck_passes, pick, axis=-1)[..., 0], np.nan),
+        'truck_achieved': np.where(found, np.take_along_axis(achieved, pick, axis=-1)[..., 0], np.nan),
+    }
+
+def break_even_distances(excavators, trucks, materials, truck_counts, target, target_metric='productivity_tons',
+                         job_condition='Average', reposition_time=20, speed_loaded=None, speed_empty=None,
+                         max_distance=100.0):
+    """Break-even haul distance of every excavator x truck x material x truck count fleet.
+
+    The break-even distance is the longest haul (km, up to max_distance) at which
+    the fleet still reaches target in target_metric (see goal_seek_batch). Fleets
+    that meet the target at every distance get max_distance with status
+    'met_everywhere'; fleets that never reach it and invalid catalog rows are dropped.
+    Sorted by break-even distance, longest first.
+    """
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+    if speed_loaded is not None:
+        truck_cols['speed_loaded'] = np.full(len(truck_names), float(speed_loaded))
+    if speed_empty is not None:
+        truck_cols['speed_empty'] = np.full(len(truck_names), float(speed_empty))
+    truck_counts = np.asarray(truck_counts, dtype=float)
+    e, t, m, n = (axis.ravel() for axis in np.meshgrid(
+        np.arange(len(exc_names)), np.arange(len(truck_names)), np.arange(len(mat_names)),
+        np.arange(len(truck_counts)), indexing='ij'
+    ))
+    solved = goal_seek_batch(
+        {field: col[e] for field, col in exc_cols.items()},
+        {field: col[t] for field, col in truck_cols.items()},
+        {field: col[m] for field, col in mat_cols.items()},
+        0.0, truck_counts[n], 'haul_distance', target, target_metric, job_condition, reposition_time,
+        upper=max_distance
+    )
+    distance = np.where(solved['status'] == 'met_everywhere', float(max_distance), solved['value'])
+    keep = np.isin(solved['status'], ('solved', 'met_everywhere'))
+    frame = pd.DataFrame({
+        'Excavator': exc_names[e[keep]],
+        'Truck': truck_names[t[keep]],
+        'Material': mat_names[m[keep]],
+        'Num_Trucks': truck_counts[n[keep]].astype(np.int64),
+        'Break_Even_Distance_km': distance[keep],
+        'Status': solved['status'][keep],
+    })
+    return frame.sort_values('Break_Even_Distance_km', ascending=False, kind='stable').reset_index(drop=True)
+
+class BucketPassFitMatrix:
+    """Bucket-pass fit of every excavator x truck x material, built once from the catalog.
+
+    Arrays have shape (excavators, trucks, materials): exact_pass (float32),
+    bucket_pass (int16, rounded up as in calculate_match_factor, 0 for invalid
+    catalog rows), payload_utilisation (float32, exact / rounded passes, i.e. how
+    much of the loaded buckets ends up in the truck) and loading_penalty (float32,
+    seconds per truck load spent on the unfilled part of the last pass). The truck
+    ranking per (excavator, material) is precomputed as well, so best_trucks is a
+    slice instead of a scan over the truck catalog.
+    """
+
+    def __init__(self, excavators, trucks, materials, pass_range=(3, 6)):
+        exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+        truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+        mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+        self.excavators, self.trucks, self.materials = pd.Index(exc_names), pd.Index(truck_names), pd.Index(mat_names)
+        self.pass_range = pass_range
+
+        capacity = truck_cols['capacity'][None, :, None]
+        ff = mat_cols['fill_factor'][None, None, :]
+        bucket = exc_cols['bucket_capacity'][:, None, None]
+        # Formula sama dengan calculate_match_factor agar hasil ceil identik
+        with np.errstate(invalid='ignore', divide='ignore'):
+            exact = (capacity * ff) / (ff * bucket * mat_cols['density_loose'][None, None, :])
+        valid = np.isfinite(exact) & (exact > 0)
+        exact = np.where(valid, exact, np.nan)
+        rounded = np.ceil(exact)
+        cycle_seconds = exc_cols['cycle_time'] / np.maximum(exc_cols['efficiency'], 1e-6)
+        self.truck_capacity = truck_cols['capacity'].astype(np.float32)
+        self.exact_pass = exact.astype(np.float32)
+        self.bucket_pass = np.where(valid, rounded, 0).astype(np.int16)
+        self.payload_utilisation = (exact / rounded).astype(np.float32)
+        self.loading_penalty = ((rounded - exact) * cycle_seconds[:, None, None]).astype(np.float32)
+
+        # Urutan truck: dalam rentang pass dulu, lalu utilisasi tertinggi, lalu penalti terkecil; invalid terakhir
+        in_range = (self.bucket_pass >= pass_range[0]) & (self.bucket_pass <= pass_range[1])
+        group = np.where(valid, np.where(in_range, 0, 1), 2)
+        order = np.lexsort((np.nan_to_num(self.loading_penalty, nan=np.inf),
+                            -np.nan_to_num(self.payload_utilisation, nan=-1.0), group), axis=1)
+        self.ranking = np.ascontiguousarray(order.transpose(0, 2, 1)).astype(np.int32)
+        self.valid_trucks = valid.sum(axis=1).astype(np.int32)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.truck_capacity, self.exact_pass, self.bucket_pass,
+                                              self.payload_utilisation, self.loading_penalty, self.ranking,
+                                              self.valid_trucks))
+
+    def fit(self, excavator, truck, material):
+        """Bucket-pass fit of one combination as a dict"""
+        e, t, m = self.excavators.get_loc(excavator), self.trucks.get_loc(truck), self.materials.get_loc(material)
+        return {
+            'exact_pass': float(self.exact_pass[e, t, m]),
+            'bucket_pass': int(self.bucket_pass[e, t, m]),
+            'payload_utilisation': float(self.payload_utilisation[e, t, m]),
+            'loading_penalty': float(self.loading_penalty[e, t, m]),
+        }
+
+    def best_trucks(self, excavator, material, top_n=5):
+        """Best matching trucks for an excavator and material (precomputed ranking)"""
+        e, m = self.excavators.get_loc(excavator), self.materials.get_loc(material)
+        t = self.ranking[e, m, :min(top_n, self.valid_trucks[e, m])]
+        passes = self.bucket_pass[e, t, m]
+        return pd.DataFrame({
+            'Truck': self.trucks[t],
+            'Capacity_t': self.truck_capacity[t],
+            'Exact_Pass': self.exact_pass[e, t, m],
+            'Bucket_Pass': passes,
+            'Payload_Utilisation_%': self.payload_utilisation[e, t, m] * 100,
+            'Loading_Penalty_s': self.loading_penalty[e, t, m],
+            'In_Pass_Range': (passes >= self.pass_range[0]) & (passes <= self.pass_range[1]),
+        })
+
+def catalog_hourly_costs(catalog, overrides=None, default=np.nan):
+    """Hourly cost per model as a Series: overrides, then the catalog 'hourly_cost' column, then default.
+
+    overrides is a {name: cost} mapping; default a scalar or a Series/array aligned
+    with the catalog (e.g. a cost per unit of capacity times capacity).
+    """
+    names, columns = catalog_columns(catalog, {'hourly_cost': np.nan})
+    costs = pd.Series(columns['hourly_cost'], index=pd.Index(names))
+    if overrides:
+        override = pd.Series(overrides, dtype=float).reindex(costs.index)
+        costs = override.fillna(costs)
+    default = pd.Series(np.broadcast_to(np.asarray(default, dtype=float), costs.shape), index=costs.index)
+    return costs.fillna(default)
+
+def fleet_cost_batch(excavator_cost, truck_cost, num_trucks, productivity, productivity_tons, num_loaders=1):
+    """Vectorized fleet cost: hourly cost of loaders + trucks and cost per BCM / per tonne.
+
+    Costs are per unit per hour; productivity (BCM/h) and productivity_tons (t/h)
+    are the capped fleet outputs of calculate_match_factor_batch. A fleet without
+    output gets an infinite unit cost.
+    """
+    fleet_cost = (np.asarray(num_loaders, dtype=float) * np.asarray(excavator_cost, dtype=float)
+                  + np.asarray(num_trucks, dtype=float) * np.asarray(truck_cost, dtype=float))
+    productivity = np.asarray(productivity, dtype=float)
+    productivity_tons = np.asarray(productivity_tons, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cost_per_bcm = np.where(productivity > 0, fleet_cost / productivity, np.inf)
+        cost_per_ton = np.where(productivity_tons > 0, fleet_cost / productivity_tons, np.inf)
+    return {'fleet_cost': fleet_cost, 'cost_per_bcm': cost_per_bcm, 'cost_per_ton': cost_per_ton}
+
+def add_fleet_costs(frame, excavator_costs, truck_costs):
+    """Add Fleet_Cost_per_Hour, Cost_per_BCM, Cost_per_Ton and MF_Deviation to sweep rows.
+
+    excavator_costs / truck_costs are Series indexed by model name
+    (catalog_hourly_costs); models without a cost give NaN.
+    """
+    costs = fleet_cost_batch(
+        excavator_costs.reindex(frame['Excavator'].to_numpy()).to_numpy(),
+        truck_costs.reindex(frame['Truck'].to_numpy()).to_numpy(),
+        frame['Num_Trucks'].to_numpy(),
+        frame['Total_Fleet_Productivity_BCM'].to_numpy(),
+        frame['Total_Fleet_Productivity_Tons'].to_numpy(),
+    )
+    return frame.assign(
+        Fleet_Cost_per_Hour=costs['fleet_cost'],
+        Cost_per_BCM=costs['cost_per_bcm'],
+        Cost_per_Ton=costs['cost_per_ton'],
+        MF_Deviation=np.abs(frame['Match_Factor'].to_numpy() - 1.0),
+    )
+
+def _dense_rank(values):
+    return np.unique(values, return_inverse=True)[1].astype(np.int64).ravel()
+
+# Ukuran sampel dan jumlah maksimum pivot untuk penyaringan awal pareto_front
+PARETO_PIVOT_SAMPLE = 4096
+PARETO_MAX_PIVOTS = 1024
+
+def _pareto_sorted(values):
+    """Non-dominated mask for lexicographically sorted, finite rows (all columns minimized)"""
+    n = len(values)
+    if values.shape[1] == 2:
+        # Minimum objektif kedua dari semua baris sebelumnya
+        previous = np.concatenate([[np.inf], np.minimum.accumulate(values[:-1, 1])])
+        return previous > values[:, 1]
+
+    second, third = _dense_rank(values[:, 1]), _dense_rank(values[:, 2])
+    none = n  # rank "tidak ada pendahulu"
+    best = np.full(n, none, dtype=np.int64)  # rank objektif ketiga terkecil dari pendahulu yang <= di objektif kedua
+    position = np.arange(n, dtype=np.int64)
+    size = 1
+    while size < n:
+        segment = position // (2 * size)
+        right = (position // size) % 2 == 1
+        # Dalam tiap segmen: objektif kedua naik, baris kiri lebih dulu bila seri
+        level_order = np.argsort(segment * (2 * n + 2) + second * 2 + right)
+        candidate = np.where(right, none, third)[level_order]
+        seg_sorted = segment[level_order]
+        # Minimum kumulatif per segmen: geser tiap segmen sehingga segmen baru selalu lebih kecil
+        shifted = np.minimum.accumulate(candidate - seg_sorted * (none + 1)) + seg_sorted * (none + 1)
+        is_right = right[level_order]
+        targets = level_order[is_right]
+        best[targets] = np.minimum(best[targets], shifted[is_right])
+        size *= 2
+    return best > third
+
+def pareto_front(objectives):
+    """Indices of the non-dominated rows of an (n, 2) or (n, 3) array, every column minimized.
+
+    Rows are sorted lexicographically, so any dominating row comes first, and a row
+    is dominated when an earlier row is <= in the remaining objectives (exact
+    duplicates keep the first). Two objectives need a running minimum; three use an
+    offline divide and conquer on the sorted order, vectorized per level (one sort
+    per level), i.e. O(n log^2 n) without pairwise comparisons. Large inputs are
+    first screened against the front of an evenly spaced sample through a
+    prefix-minimum table (O(n log pivots)), which removes most dominated rows
+    before the exact pass. Rows with non-finite
+    objectives are never on the front. Returns indices in sorted order.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.ndim != 2 or objectives.shape[1] not in (2, 3):
+        raise ValueError("pareto_front membutuhkan array (n, 2) atau (n, 3)")
+    order = np.flatnonzero(np.isfinite(objectives).all(axis=1))
+    order = order[np.argsort(objectives[order, 0], kind='stable')]
+    # Urutan leksikografis: kolom berikutnya hanya perlu untuk baris yang seri di kolom pertama
+    first = objectives[order, 0]
+    tied = np.zeros(len(order), dtype=bool)
+    tied[1:] = first[1:] == first[:-1]
+    tied[:-1] |= tied[1:]
+    if tied.any():
+        rows = np.flatnonzero(tied)
+        group = np.cumsum(np.concatenate([[True], first[rows[1:]] != first[rows[:-1]]]))
+        keys = [objectives[order[rows], column] for column in range(objectives.shape[1] - 1, 0, -1)]
+        order[rows] = order[rows][np.lexsort(keys + [group])]
+    values = objectives[order]
+    n = len(values)
+    if n == 0:
+        return order
+
+    kept = np.arange(n)
+    if values.shape[1] == 3 and n > PARETO_PIVOT_SAMPLE:
+        # Pivot = titik front dari sampel (sudah urut); baris yang didominasi pivot pasti bukan front
+        sample = np.unique(np.linspace(0, n - 1, PARETO_PIVOT_SAMPLE).astype(np.int64))
+        pivot_rows = sample[_pareto_sorted(values[sample])][:PARETO_MAX_PIVOTS]
+        pivots = values[pivot_rows]
+        levels = np.unique(pivots[:, 1])
+        # table[k, b] = objektif ketiga terkecil di antara k pivot pertama dengan objektif kedua <= levels[b - 1]
+        eligible = np.where(pivots[:, 1][:, None] <= levels[None, :], pivots[:, 2][:, None], np.inf)
+        table = np.full((len(pivots) + 1, len(levels) + 1), np.inf)
+        table[1:, 1:] = np.minimum.accumulate(eligible, axis=0)
+        k = np.searchsorted(pivots[:, 0], values[:, 0], side='right')
+        b = np.searchsorted(levels, values[:, 1], side='right')
+        survivors = table[k, b] > values[:, 2]
+        survivors[pivot_rows] = True
+        kept = np.flatnonzero(survivors)
+    return order[kept[_pareto_sorted(values[kept])]]
+
+PARETO_OBJECTIVES = ('Cost_per_BCM', 'Total_Fleet_Productivity_BCM', 'MF_Deviation')
+
+def cost_pareto_frontier(excavators, trucks, materials, haul_distances, truck_counts,
+                         job_conditions=('Average',), reposition_time=20, speed_loaded=None, speed_empty=None,
+                         excavator_costs=None, truck_costs=None, mf_min=None, mf_max=None, chunk_size=250_000):
+    """Non-dominated fleets of a catalog sweep: lowest cost per BCM, highest productivity, MF closest to 1.
+
+    The sweep grid is walked in blocks like sweep_equipment_catalog; each block is
+    costed with fleet_cost_batch and merged into the running Pareto front
+    (pareto_front on grid indices), so millions of configurations stay in bounded
+    memory and only the front is turned into rows. excavator_costs / truck_costs
+    default to catalog_hourly_costs of the catalog; fleets without a cost or
+    output are skipped, and mf_min / mf_max optionally restrict the MF band.
+    ValueError is raised when no excavator or no truck in the sweep has a cost,
+    since the front would always be empty. Returns the front with add_fleet_costs
+    columns sorted by cost per BCM, with attrs 'evaluated' and 'costed' scenario counts.
+    """
+    if excavator_costs is None:
+        excavator_costs = catalog_hourly_costs(excavators)
+    if truck_costs is None:
+        truck_costs = catalog_hourly_costs(trucks)
+    axes, grid_shape, evaluate = _catalog_sweep_grid(
+        excavators, trucks, materials, haul_distances, truck_counts, job_conditions,
+        reposition_time, speed_loaded, speed_empty
+    )
+    exc_cost = excavator_costs.reindex(axes[0]).to_numpy(dtype=float)
+    truck_cost = truck_costs.reindex(axes[1]).to_numpy(dtype=float)
+    for kind, argument, cost in (('excavator', 'excavator_costs', exc_cost), ('truck', 'truck_costs', truck_cost)):
+        if len(cost) and np.isnan(cost).all():
+            raise ValueError(f"Tidak ada biaya per jam untuk {kind} mana pun: isi kolom Hourly Cost di katalog "
+                             f"atau berikan {argument} (mis. catalog_hourly_costs(..., default=...))")
+
+    best_index = np.empty(0, dtype=np.int64)
+    best_objectives = np.empty((0, 3))
+    evaluated = costed = 0
+    for offset, index_axes in _sweep_blocks(grid_shape, chunk_size):
+        res = evaluate(*index_axes)
+        e, t, _, _, n, _ = index_axes
+        costs = fleet_cost_batch(exc_cost[e], truck_cost[t], axes[4][n], res['productivity'], res['productivity_tons'])
+        shape = res['match_factor'].shape
+        mf = res['match_factor'].ravel()
+        cost_per_bcm = np.broadcast_to(costs['cost_per_bcm'], shape).ravel()
+        keep = np.isfinite(cost_per_bcm)
+        if mf_min is not None:
+            keep &= mf >= mf_min
+        if mf_max is not None:
+            keep &= mf <= mf_max
+        rows = np.flatnonzero(keep)
+        evaluated += mf.size
+        costed += len(rows)
+        objectives = np.column_stack([
+            cost_per_bcm[rows], -np.broadcast_to(res['productivity'], shape).ravel()[rows], np.abs(mf[rows] - 1.0),
+        ])
+        cand_index = np.concatenate([best_index, offset + rows])
+        cand_objectives = np.concatenate([best_objectives, objectives])
+        front = pareto_front(cand_objectives)
+        best_index, best_objectives = cand_index[front], cand_objectives[front]
+
+    index = np.unravel_index(best_index, grid_shape)
+    frame = add_fleet_costs(_sweep_frame(axes, *index, evaluate(*index)), excavator_costs, truck_costs)
+    frame = frame.sort_values(['Cost_per_BCM', 'Total_Fleet_Productivity_BCM'], ascending=[True, False],
+                              kind='stable').reset_index(drop=True)
+    frame.attrs.update(evaluated=evaluated, costed=costed)
+    return frame
+
+# Komponen siklus truck untuk simulasi diskrit (menit) dan koefisien variasinya (lognormal)
+DES_COMPONENTS = ('loading', 'travel_loaded', 'dumping', 'travel_empty', 'spotting')
+DES_COMPONENT_CV = {'loading': 0.15, 'travel_loaded': 0.10, 'dumping': 0.25, 'travel_empty': 0.10, 'spotting': 0.25}
+
+def des_cycle_components(excavator_data, truck_data, material_data, haul_distance, job_condition='Average', reposition_time=20):
+    """Mean cycle components in minutes, taken from the calculate_match_factor model"""
+    res = calculate_match_factor_batch(
+        excavator_data, truck_data, material_data, haul_distance, 1, job_condition, reposition_time
+    )
+    return {
+        'loading': float(res['loading_cycle_truck']) * 60,
+        'travel_loaded': haul_distance / truck_data['speed_loaded'] * 60,
+        'dumping': 1.4,
+        'travel_empty': haul_distance / truck_data['speed_empty'] * 60,
+        'spotting': 0.7,
+    }
+
+def _lognormal_draws(rng, mean, cv, size):
+    """Lognormal samples with the given mean and coefficient of variation, as a Python list"""
+    if cv <= 0 or mean <= 0:
+        return [float(mean)] * size
+    sigma2 = np.log1p(cv * cv)
+    return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size).tolist()
+
+def simulate_shift(components, num_trucks, num_loaders=1, shift_hours=12.0, payload_tons=0.0,
+                   cv=None, seed=None, block_size=4096):
+    """Discrete-event simulation of one shift: N trucks cycling through a FIFO loader queue.
+
+    Trucks join a single queue served by num_loaders loaders; only the loading time
+    occupies a loader (as in the MF formula). Events live in a heap of (time, truck)
+    and durations are pre-drawn in blocks, so one event costs one heap replace.
+    Trucks start staggered evenly over one mean cycle. Returns per-shift totals:
+    loads, dumped loads, mean queue time per load (min), truck queue hours, trucks
+    still queued at the end of the shift, loader utilisation and tonnes per hour
+    (dumped loads x payload_tons / shift_hours). Truck queue hours include the wait
+    of trucks still queued when the shift ends; queue time per load covers only
+    loads that started within the shift.
+    """
+    cv = DES_COMPONENT_CV if cv is None else cv
+    rng = np.random.default_rng(seed)
+    horizon = shift_hours * 60.0
+    mean_cycle = sum(components[name] for name in DES_COMPONENTS)
+
+    events = [(i * mean_cycle / num_trucks, i) for i in range(num_trucks)]
+    heapq.heapify(events)
+    loaders = [0.0] * num_loaders
+    busy = queue_total = 0.0
+    loads = dumped = 0
+    k = block_size
+    while events:
+        arrival, truck = events[0]
+        if arrival >= horizon:
+            break
+        if k == block_size:
+            loading, travel_loaded, dumping, travel_empty, spotting = (
+                _lognormal_draws(rng, components[name], cv.get(name, 0.0), block_size) for name in DES_COMPONENTS
+            )
+            k = 0
+        # Loader yang paling cepat kosong melayani truck berikutnya (FIFO)
+        free_at = loaders[0]
+        start = arrival if arrival > free_at else free_at
+        if start >= horizon:
+            break
+        end = start + loading[k]
+        heapq.heapreplace(loaders, end)
+        busy += (end if end < horizon else horizon) - start
+        queue_total += start - arrival
+        loads += 1
+        dump_done = end + travel_loaded[k] + dumping[k]
+        if dump_done <= horizon:
+            dumped += 1
+        heapq.heapreplace(events, (dump_done + travel_empty[k] + spotting[k], truck))
+        k += 1
+
+    # Truck yang belum dilayani saat shift berakhir tetap antre sampai akhir shift
+    queued = [arrival for arrival, _ in events if arrival < horizon]
+    return {
+        'loads': loads,
+        'dumped_loads': dumped,
+        'queue_time_min': queue_total / loads if loads else 0.0,
+        'truck_queue_hours': (queue_total + sum(horizon - arrival for arrival in queued)) / 60.0,
+        'queued_at_end': len(queued),
+        'loader_utilisation': busy / (horizon * num_loaders),
+        'tonnes_per_hour': dumped * payload_tons / shift_hours,
+    }
+
+def _run_des_replications(components, num_trucks, num_loaders, shift_hours, payload_tons, cv, seeds):
+    """Worker: run one simulate_shift per seed (SeedSequence children)"""
+    return [
+        simulate_shift(components, num_trucks, num_loaders, shift_hours, payload_tons, cv, seed)
+        for seed in seeds
+    ]
+
+def simulate_fleet(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                   job_condition='Average', reposition_time=20, num_loaders=1, shift_hours=12.0,
+                   replications=200, cv=None, seed=42, max_workers=None, confidence=0.95):
+    """Independent shift replications of simulate_shift with confidence intervals.
+
+    Cycle components come from des_cycle_components; payload per load uses the same
+    truck and job efficiency derating as the static model. Replications are split
+    across a process pool (max_workers=1 runs inline) and seeded from one
+    SeedSequence, so results do not depend on the worker count. Returns a dict with
+    'replications' (one row per shift), 'summary' (mean, std and CI per metric) and
+    'components'.
+    """
+    components = des_cycle_components(
+        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time
+    )
+    job_efficiency = float(job_efficiency_array(job_condition))
+    payload_tons = truck_data['capacity'] * truck_data.get('efficiency', 0.92) * job_efficiency
+    seeds = np.random.SeedSequence(seed).spawn(int(replications))
+    args = (components, int(num_trucks), int(num_loaders), shift_hours, payload_tons, cv)
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or replications < 2 * workers:
+        rows = _run_des_replications(*args, seeds)
+    else:
+        chunks = [seeds[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_des_replications, *zip(*[args + (chunk,) for chunk in chunks])))
+        # Kembalikan ke urutan seed asli
+        rows = [None] * len(seeds)
+        for i, part in enumerate(parts):
+            rows[i::workers] = part
+
+    df = pd.DataFrame(rows)
+    df['bcm_per_hour'] = df['tonnes_per_hour'] / material_data['density_bank']
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    mean = df.mean()
+    std = df.std(ddof=1) if len(df) > 1 else df.mean() * 0.0
+    half_width = z * std / np.sqrt(len(df))
+    summary = pd.DataFrame({'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width})
+    return {'replications': df, 'summary': summary, 'components': components}
+
+def _mixed_fleet_rates(excavators, trucks, material_data, haul_distance, job_condition, reposition_time,
+                       speed_loaded=None, speed_empty=None):
+    """Loader x truck loading times and per-truck constants for mixed-fleet math (hours, BCM)"""
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    if speed_loaded is not None:
+        truck_cols['speed_loaded'] = np.full(len(truck_names), float(speed_loaded))
+    if speed_empty is not None:
+        truck_cols['speed_empty'] = np.full(len(truck_names), float(speed_empty))
+    res = calculate_match_factor_batch(
+        {key: col[:, None] for key, col in exc_cols.items()},
+        {key: col[None, :] for key, col in truck_cols.items()},
+        material_data, haul_distance, 1, job_condition, reposition_time
+    )
+    loading = np.array(res['loading_cycle_truck'])  # (loader, truck)
+    cycle = np.array(res['total_cycle_time'])
+    return {
+        'loaders': exc_names,
+        'trucks': truck_names,
+        'loading': loading,
+        'away': cycle[0] - loading[0],  # waktu di luar loader tidak bergantung loader
+        'payload_bcm': (res['productivity_per_truck_bcm'] * cycle)[0],
+        'digger': np.array(res['digger_productivity'][:, 0]),
+        'density_bank': float(material_data['density_bank']),
+    }
+
+def _mix_truck_constants(rates, loader_counts):
+    """Per truck type: BCM/h per truck and MF contribution per truck for a loader count vector"""
+    loader_counts = np.asarray(loader_counts, dtype=float)
+    n_loaders = loader_counts.sum()
+    # Truck dilayani pool loader: waktu muat rata-rata tertimbang jumlah loader per tipe
+    loading = loader_counts @ rates['loading'] / n_loaders
+    cycle = loading + rates['away']
+    return rates['payload_bcm'] / cycle, loading / cycle / n_loaders, loader_counts @ rates['digger']
+
+def mixed_fleet_match_factor(excavators, trucks, material_data, haul_distance, loader_counts, truck_counts,
+                             job_condition='Average', reposition_time=20, speed_loaded=None, speed_empty=None):
+    """Heterogeneous match factor for several loader types and several truck types.
+
+    loader_counts and truck_counts map catalog names to unit counts. Trucks are served
+    by the loader pool, so each truck type's loading time is the loader-count-weighted
+    mean over loader types; MF = sum_j n_j * LT_j / CT_j / total loaders, which
+    reduces to calculate_match_factor for one loader and one truck type. Fleet
+    productivity is capped at the summed digger capacity.
+    """
+    excavators = {name: excavators.loc[name] if isinstance(excavators, pd.DataFrame) else excavators[name]
+                  for name in loader_counts}
+    trucks = {name: trucks.loc[name] if isinstance(trucks, pd.DataFrame) else trucks[name]
+              for name in truck_counts}
+    excavators = {name: dict(data) for name, data in excavators.items()}
+    trucks = {name: dict(data) for name, data in trucks.items()}
+    rates = _mixed_fleet_rates(excavators, trucks, material_data, haul_distance, job_condition,
+                               reposition_time, speed_loaded, speed_empty)
+    n_trucks = np.array([truck_counts[name] for name in rates['trucks']], dtype=float)
+    truck_rate, truck_mf, loader_capacity = _mix_truck_constants(
+        rates, [loader_counts[name] for name in rates['loaders']]
+    )
+    truck_productivity = float(n_trucks @ truck_rate)
+    productivity = min(truck_productivity, float(loader_capacity))
+    match_factor = float(n_trucks @ truck_mf)
+    return {
+        'match_factor': match_factor,
+        'productivity': productivity,
+        'productivity_tons': productivity * rates['density_bank'],
+        'truck_productivity': truck_productivity,
+        'loader_productivity': float(loader_capacity),
+        'efficiency_status': str(efficiency_status_batch(match_factor)),
+    }
+
+def _loader_mixes(n_types, max_loaders):
+    """All loader count vectors with 1..max_loaders units in total"""
+    def extend(prefix, remaining):
+        if len(prefix) == n_types:
+            if sum(prefix):
+                yield tuple(prefix)
+            return
+        for count in range(remaining + 1):
+            yield from extend(prefix + [count], remaining - count)
+    return extend([], max_loaders)
+
+def search_fleet_mix(excavators, trucks, material_data, haul_distance, target_productivity,
+                     max_loaders=2, max_trucks=40, job_condition='Average', reposition_time=20,
+                     speed_loaded=None, speed_empty=None, mf_max=1.2, unit_cost=None, top_n=5):
+    """Cheapest mixed fleets (loader mix + truck mix) reaching target_productivity BCM/h.
+
+    Loader mixes (1..max_loaders units over the given excavators) are enumerated; for
+    each, truck counts are found by depth-first branch and bound. Truck types are
+    visited best cost-per-BCM first, and a branch is cut when its cost plus
+    (missing BCM/h x best remaining cost per BCM/h) cannot beat the current top_n,
+    or when the missing BCM/h cannot be reached within mf_max (MF only grows with
+    trucks) or within max_trucks. unit_cost maps model names to a cost weight (default 1 per unit, so
+    the search minimises the number of units). Ties go to the MF closest to 1.0.
+    Returns a DataFrame best first; df.attrs['nodes_explored'] counts search nodes.
+    """
+    unit_cost = unit_cost or {}
+    rates = _mixed_fleet_rates(excavators, trucks, material_data, haul_distance, job_condition,
+                               reposition_time, speed_loaded, speed_empty)
+    # Buang model dengan data kapasitas tidak lengkap (NaN) supaya batas pruning tetap valid
+    loader_ok = np.isfinite(rates['digger']) & np.isfinite(rates['loading']).all(axis=1)
+    truck_ok = np.isfinite(rates['payload_bcm']) & np.isfinite(rates['loading']).all(axis=0) & (rates['payload_bcm'] > 0)
+    rates = dict(
+        rates,
+        loaders=rates['loaders'][loader_ok], trucks=rates['trucks'][truck_ok],
+        loading=rates['loading'][np.ix_(loader_ok, truck_ok)], away=rates['away'][truck_ok],
+        payload_bcm=rates['payload_bcm'][truck_ok], digger=rates['digger'][loader_ok],
+    )
+    loader_cost = np.array([unit_cost.get(name, 1.0) for name in rates['loaders']], dtype=float)
+    truck_cost = np.array([unit_cost.get(name, 1.0) for name in rates['trucks']], dtype=float)
+
+    best = []  # max-heap lewat negasi: (-cost, -|mf-1|, seq, row)
+    nodes = 0
+    seq = 0
+
+    def threshold():
+        return -best[0][0] if len(best) >= top_n else np.inf
+
+    loader_mixes = sorted(_loader_mixes(len(rates['loaders']), max_loaders),
+                          key=lambda mix: float(np.dot(mix, loader_cost)))
+    for loader_counts in loader_mixes:
+        base_cost = float(np.dot(loader_counts, loader_cost))
+        truck_rate, truck_mf, loader_capacity = _mix_truck_constants(rates, loader_counts)
+        if loader_capacity < target_productivity or base_cost > threshold():
+            continue
+        order = np.argsort(truck_cost / truck_rate, kind='stable')
+        rate, mf_step, cost = truck_rate[order], truck_mf[order], truck_cost[order]
+        cost_per_bcm = cost / rate  # sudah terurut naik
+        # Batas sisa (suffix): MF minimum per BCM/h dan rate maksimum dari tipe idx ke belakang
+        mf_per_bcm = np.minimum.accumulate((mf_step / rate)[::-1])[::-1]
+        best_rate = np.maximum.accumulate(rate[::-1])[::-1]
+        counts = [0] * len(order)
+
+        def branch(idx, n_used, production, mf, spent):
+            nonlocal nodes, seq
+            nodes += 1
+            need = target_productivity - production
+            if need <= 1e-9:
+                seq += 1
+                key = (-spent, -abs(mf - 1.0), -seq)
+                if len(best) < top_n or key > best[0][:3]:
+                    truck_counts = {rates['trucks'][order[i]]: c for i, c in enumerate(counts) if c}
+                    row = (loader_counts, truck_counts, n_used, mf, min(production, loader_capacity), spent)
+                    if len(best) >= top_n:
+                        heapq.heapreplace(best, key + (row,))
+                    else:
+                        heapq.heappush(best, key + (row,))
+                return
+            if idx == len(order) or spent + need * cost_per_bcm[idx] > threshold():
+                return
+            if need > (max_trucks - n_used) * best_rate[idx]:
+                return
+            if mf_max is not None and mf + need * mf_per_bcm[idx] > mf_max + 1e-9:
+                return
+            most = min(max_trucks - n_used, int(np.ceil(need / rate[idx])))
+            if mf_max is not None:
+                most = min(most, int(np.floor((mf_max - mf) / mf_step[idx] + 1e-9)))
+            for c in range(max(most, 0), -1, -1):
+                counts[idx] = c
+                branch(idx + 1, n_used + c, production + c * rate[idx], mf + c * mf_step[idx], spent + c * cost[idx])
+            counts[idx] = 0
+
+        branch(0, 0, 0.0, 0.0, base_cost)
+
+    rows = [entry[3] for entry in sorted(best, key=lambda entry: (-entry[0], -entry[1], -entry[2]))]
+    df = pd.DataFrame({
+        'Loader_Mix': [' + '.join(f"{rates['loaders'][i]} x{c}" for i, c in enumerate(r[0]) if c) for r in rows],
+        'Truck_Mix': [' + '.join(f"{name} x{c}" for name, c in r[1].items()) for r in rows],
+        'Num_Loaders': [int(sum(r[0])) for r in rows],
+        'Num_Trucks': [int(r[2]) for r in rows],
+        'Match_Factor': [float(r[3]) for r in rows],
+        'Productivity_BCM': [float(r[4]) for r in rows],
+        'Productivity_Tons': [float(r[4]) * rates['density_bank'] for r in rows],
+        'Cost': [float(r[5]) for r in rows],
+    })
+    df.attrs['nodes_explored'] = nodes
+    return df
+
+class TruckAllocator:
+    """Assign a shared truck pool to many loaders to maximise total BCM/h.
+
+    Each loader i produces min(sum_j n_ij * r_ij, cap_i): r_ij is the BCM/h of one
+    truck of type j at that loader (its own excavator, haul distance and material)
+    and cap_i the digger cap from the MF model, scaled by loader availability.
+    solve() fills the pool greedily by marginal gain from a heap, then applies
+    truck moves (or, when no move helps, two-type exchanges) between loaders while
+    one raises total output; each step is scored for all loader pairs at once. For a single
+    truck type this is optimal, since each loader's output is concave in its truck
+    count. update_loader() and set_pool() re-solve incrementally: only the changed
+    loader's trucks (or the changed pool) are released and re-placed, followed by
+    the same improving moves.
+
+    loaders is a DataFrame (or list of dicts) with columns loader_id, excavator,
+    haul_distance and optionally material (name in materials) and availability
+    (0..1, default 1). truck_pool maps truck model names to unit counts.
+    """
+
+    def __init__(self, excavators, trucks, loaders, truck_pool, material_data=None, materials=None,
+                 job_condition='Average', reposition_time=20, speed_loaded=None, speed_empty=None):
+        self.excavators = excavators
+        self.materials = materials
+        self.material_data = material_data
+        self.job_condition = job_condition
+        self.reposition_time = reposition_time
+        self.loaders = pd.DataFrame(loaders).set_index('loader_id', drop=False)
+        if 'availability' not in self.loaders:
+            self.loaders['availability'] = 1.0
+        self.loaders['availability'] = self.loaders['availability'].astype(float).fillna(1.0)
+        self.truck_names = np.array(list(truck_pool), dtype=object)
+        self.pool = np.array([truck_pool[name] for name in self.truck_names], dtype=np.int64)
+        truck_table = trucks.loc[list(self.truck_names)] if isinstance(trucks, pd.DataFrame) else {
+            name: trucks[name] for name in self.truck_names
+        }
+        _, self.truck_cols = catalog_columns(truck_table, TRUCK_FIELDS)
+        if speed_loaded is not None:
+            self.truck_cols['speed_loaded'] = np.full(len(self.truck_names), float(speed_loaded))
+        if speed_empty is not None:
+            self.truck_cols['speed_empty'] = np.full(len(self.truck_names), float(speed_empty))
+        self.rate, self.mf_step, self.cap = self._loader_rates(self.loaders)
+        self.alloc = np.zeros(self.rate.shape, dtype=np.int64)
+        self.uncapped = np.zeros(len(self.loaders))
+
+    def _loader_rates(self, loaders):
+        """(rate, mf_step, cap) rows for the given loader rows"""
+        _, exc_cols = catalog_columns(self.excavators, EXCAVATOR_FIELDS)
+        exc_index = pd.Index(self.excavators.index if isinstance(self.excavators, pd.DataFrame) else list(self.excavators))
+        e = exc_index.get_indexer(loaders['excavator'])
+        if (e < 0).any():
+            raise KeyError(f"Excavator tidak ada di katalog: {', '.join(map(str, loaders['excavator'][e < 0]))}")
+        if 'material' in loaders and self.materials is not None:
+            _, mat_cols = catalog_columns(self.materials, MATERIAL_FIELDS)
+            mat_index = pd.Index(self.materials.index if isinstance(self.materials, pd.DataFrame) else list(self.materials))
+            m = mat_index.get_indexer(loaders['material'])
+            if (m < 0).any():
+                raise KeyError(f"Material tidak ada di katalog: {', '.join(map(str, loaders['material'][m < 0]))}")
+            material = {key: col[m][:, None] for key, col in mat_cols.items()}
+        else:
+            material = self.material_data
+        res = calculate_match_factor_batch(
+            {key: col[e][:, None] for key, col in exc_cols.items()},
+            {key: col[None, :] for key, col in self.truck_cols.items()},
+            material,
+            loaders['haul_distance'].to_numpy(dtype=float)[:, None],
+            1, self.job_condition, self.reposition_time
+        )
+        rate = np.nan_to_num(np.array(res['productivity_per_truck_bcm'], dtype=float))
+        mf_step = np.nan_to_num(np.array(res['loading_cycle_truck'] / res['total_cycle_time'], dtype=float))
+        cap = np.nan_to_num(np.array(res['digger_productivity'][:, 0], dtype=float))
+        cap = cap * loaders['availability'].to_numpy(dtype=float)
+        return rate, mf_step, cap
+
+    def _production(self):
+        return np.minimum(self.uncapped, self.cap)
+
+    def _assign(self, i, j, count=1):
+        self.alloc[i, j] += count
+        # Hitung ulang dari alokasi (bukan akumulasi) agar tidak ada sisa pembulatan setelah truck dilepas
+        self.uncapped[i] = self.alloc[i] @ self.rate[i]
+
+    def _fill(self):
+        """Greedy: place free trucks one at a time where the marginal BCM/h is highest"""
+        free = self.pool - self.alloc.sum(axis=0)
+        if not free.any():
+            return
+
+        def best_for(i):
+            gain = np.minimum(self.rate[i], self.cap[i] - min(self.uncapped[i], self.cap[i]))
+            gain = np.where(free > 0, gain, -np.inf)
+            j = int(np.argmax(gain))
+            return gain[j], j
+
+        heap = []
+        for i in range(len(self.cap)):
+            gain, j = best_for(i)
+            if gain > 1e-9:
+                heap.append((-gain, i, j))
+        heapq.heapify(heap)
+        while heap and free.any():
+            neg_gain, i, j = heapq.heappop(heap)
+            gain, best_j = best_for(i)
+            if best_j != j or gain < -neg_gain - 1e-9:
+                # Entri basi (stok habis atau loader sudah terisi): hitung ulang
+                if gain > 1e-9:
+                    heapq.heappush(heap, (-gain, i, best_j))
+                continue
+            self._assign(i, j)
+            free[j] -= 1
+            gain, j = best_for(i)
+            if gain > 1e-9:
+                heapq.heappush(heap, (-gain, i, j))
+
+    @staticmethod
+    def _best_pair(give, take):
+        """Best (delta, a, b, x) maximising give[a, x] + take[b, x] over loaders a != b"""
+        cols = np.arange(give.shape[1])
+        # Cukup dua kandidat teratas per kolom: bila keduanya loader yang sama, pakai runner-up salah satunya
+        g = np.argsort(-give, axis=0, kind='stable')[:2]
+        t = np.argsort(-take, axis=0, kind='stable')[:2]
+        g1, g2 = give[g[0], cols], give[g[1], cols]
+        t1, t2 = take[t[0], cols], take[t[1], cols]
+        same = g[0] == t[0]
+        second_take = g1 + t2 >= g2 + t1
+        a = np.where(same & ~second_take, g[1], g[0])
+        b = np.where(same & second_take, t[1], t[0])
+        delta = np.where(same, np.maximum(g1 + t2, g2 + t1), g1 + t1)
+        x = int(np.argmax(delta))
+        return delta[x], int(a[x]), int(b[x]), x
+
+    def _improve(self, max_moves=100_000):
+        """Apply the best single-truck move, else the best two-type exchange, while total BCM/h rises"""
+        n_types = len(self.truck_names)
+        for _ in range(max_moves):
+            if len(self.cap) < 2 or not self.alloc.any():
+                return
+            production = self._production()
+            held = self.alloc > 0
+            # Pindah satu truck tipe j dari loader a ke b: give = -(BCM/h hilang di a), take = BCM/h tambahan di b
+            loss = production[:, None] - np.minimum(self.uncapped[:, None] - self.rate, self.cap[:, None])
+            gain = np.minimum(self.rate, (self.cap - production)[:, None])
+            delta, a, b, j = self._best_pair(np.where(held, -loss, -np.inf), gain)
+            if delta > 1e-9:
+                self._assign(a, j, -1)
+                self._assign(b, j, 1)
+                continue
+            # Tukar: a melepas tipe j dan menerima tipe k, b sebaliknya; selisihnya terpisah per loader
+            swap = np.minimum(
+                self.uncapped[:, None, None] - self.rate[:, :, None] + self.rate[:, None, :], self.cap[:, None, None]
+            ) - production[:, None, None]
+            swap = np.where(held[:, :, None] & ~np.eye(n_types, dtype=bool), swap, -np.inf)
+            delta, a, b, x = self._best_pair(
+                swap.reshape(len(self.cap), -1), swap.transpose(0, 2, 1).reshape(len(self.cap), -1)
+            )
+            if not delta > 1e-9:
+                return
+            j, k = divmod(x, n_types)
+            self._assign(a, j, -1)
+            self._assign(b, j, 1)
+            self._assign(b, k, -1)
+            self._assign(a, k, 1)
+
+    def solve(self):
+        """Allocate the whole pool from scratch and return allocation_frame()"""
+        self.alloc[:] = 0
+        self.uncapped[:] = 0.0
+        self._fill()
+        self._improve()
+        return self.allocation_frame()
+
+    def update_loader(self, loader_id, haul_distance=None, availability=None):
+        """Change one loader's haul distance and/or availability and re-solve incrementally"""
+        if loader_id not in self.loaders.index:
+            raise KeyError(f"Loader tidak dikenal: {loader_id}")
+        # Validasi dulu supaya loader tidak setengah berubah bila salah satu nilai ditolak
+        if haul_distance is not None and not (np.isfinite(haul_distance) and haul_distance > 0):
+            raise ValueError(f"Jarak angkut harus > 0 km, bukan {haul_distance!r}")
+        if availability is not None and not (np.isfinite(availability) and 0 < availability <= 1):
+            raise ValueError(f"Availability harus di antara 0 (eksklusif) dan 1, bukan {availability!r}")
+        if haul_distance is not None:
+            self.loaders.loc[loader_id, 'haul_distance'] = float(haul_distance)
+        if availability is not None:
+            self.loaders.loc[loader_id, 'availability'] = float(availability)
+        i = self.loaders.index.get_loc(loader_id)
+        rate, mf_step, cap = self._loader_rates(self.loaders.iloc[[i]])
+        self.rate[i], self.mf_step[i], self.cap[i] = rate[0], mf_step[0], cap[0]
+        # Lepas truck loader ini ke pool, lalu isi ulang dan perbaiki dengan perpindahan lokal
+        self.alloc[i] = 0
+        self.uncapped[i] = 0.0
+        self._fill()
+        self._improve()
+        return self.allocation_frame()
+
+    def set_pool(self, truck, count):
+        """Change the available units of one truck model and re-solve incrementally"""
+        match = np.flatnonzero(self.truck_names == truck)
+        if not len(match):
+            raise KeyError(f"Truck tidak ada di pool: {truck} (pool: {', '.join(map(str, self.truck_names))})")
+        if int(count) != count or count < 0:
+            raise ValueError(f"Jumlah unit truck harus bilangan bulat >= 0, bukan {count!r}")
+        j = int(match[0])
+        self.pool[j] = int(count)
+        while self.alloc[:, j].sum() > self.pool[j]:
+            holders = np.flatnonzero(self.alloc[:, j])
+            production = self._production()[holders]
+            loss = production - np.minimum(self.uncapped[holders] - self.rate[holders, j], self.cap[holders])
+            self._assign(holders[int(np.argmin(loss))], j, -1)
+        self._fill()
+        self._improve()
+        return self.allocation_frame()
+
+    def allocation_frame(self):
+        """One row per loader: assigned trucks, MF and capped productivity"""
+        production = self._production()
+        df = self.loaders[['loader_id', 'excavator', 'haul_distance', 'availability']].copy()
+        for j, name in enumerate(self.truck_names):
+            df[name] = self.alloc[:, j]
+        df['num_trucks'] = self.alloc.sum(axis=1)
+        df['match_factor'] = (self.alloc * self.mf_step).sum(axis=1)
+        df['productivity'] = production
+        df['digger_productivity'] = self.cap
+        return df.reset_index(drop=True)
+
+    def total_productivity(self):
+        return float(self._production().sum())
@@ -0,0 +1,168 @@
+"""Streaming export of large result sets to Parquet, Arrow IPC or gzip CSV.
+
+Writers take an iterable of DataFrame chunks (iter_catalog_sweep,
+iter_monte_carlo_draws, ...) and write each chunk as it arrives (one Parquet row
+group / Arrow record batch per chunk), so memory stays at one chunk however many
+rows are exported. Example:
+
+    python match_factor_export.py sweep -o sweep.parquet --distance-step 0.1 --max-trucks 60
+    python match_factor_export.py monte-carlo -o draws.csv.gz --excavator R9300 --truck 793F \\
+        --material Clay --haul-distance 4 --num-trucks 12 --draws 5000000
+"""
+import argparse
+import gzip
+import itertools
+import sys
+
+import numpy as np
+
+from match_factor_engine import (
+    EQUIPMENT_CSV,
+    apply_job_efficiency,
+    iter_catalog_sweep,
+    iter_monte_carlo_draws,
+    load_equipment_tables_cached,
+)
+
+EXPORT_FORMATS = {
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('.arrow', 'application/vnd.apache.arrow.file'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+}
+
+def detect_export_format(path, default='parquet'):
+    """Export format from the file extension"""
+    lower = str(path).lower()
+    for fmt, (extension, _) in EXPORT_FORMATS.items():
+        if lower.endswith(extension):
+            return fmt
+    return default
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # opsional, hanya dibutuhkan untuk Parquet/Arrow
+    except ImportError as exc:
+        raise ImportError("Export Parquet/Arrow membutuhkan pyarrow (pip install pyarrow); "
+                          "gunakan format csv.gz tanpa pyarrow") from exc
+    return pyarrow
+
+def export_chunks(chunks, destination, fmt=None, compression='zstd', schema=None):
+    """Write DataFrame chunks to destination (path or binary file object) in constant memory.
+
+    fmt is 'parquet', 'arrow' or 'csv.gz' (default: from the path extension).
+    compression applies to Parquet and Arrow ('zstd', 'lz4' or None). All chunks
+    must have the same columns; the schema is taken from the first chunk. When
+    chunks is empty, schema (a DataFrame, usually with zero rows) supplies the
+    columns and an empty file is written; without it a ValueError is raised before
+    anything is created. Returns {'rows', 'chunks', 'format'}.
+    """
+    fmt = fmt or detect_export_format(destination)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {fmt!r} (pilihan: {', '.join(EXPORT_FORMATS)})")
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        if schema is None:
+            raise ValueError("Tidak ada data untuk diekspor; berikan schema agar file kosong tetap ditulis")
+        first = schema.iloc[:0]
+    chunks = itertools.chain([first], chunks)
+    rows = n_chunks = 0
+    writer = None
+    sink = None
+    try:
+        if fmt == 'csv.gz':
+            # gzip.open menerima path maupun file object (file object tidak ikut ditutup)
+            sink = gzip.open(destination, 'wt', newline='', encoding='utf-8')
+            for chunk in chunks:
+                chunk.to_csv(sink, index=False, header=(n_chunks == 0))
+                rows += len(chunk)
+                n_chunks += 1
+        else:
+            pa = _require_pyarrow()
+            import pyarrow.ipc
+            import pyarrow.parquet
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    # Kolom teks yang kosong/None semua terbaca bertipe null; tulis sebagai string
+                    arrow_schema = pa.schema([
+                        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                        for field in table.schema.remove_metadata()
+                    ])
+                    if fmt == 'parquet':
+                        writer = pyarrow.parquet.ParquetWriter(destination, arrow_schema, compression=compression or 'none')
+                    else:
+                        options = pyarrow.ipc.IpcWriteOptions(compression=compression)
+                        writer = pyarrow.ipc.new_file(destination, arrow_schema, options=options)
+                table = table.replace_schema_metadata(None).cast(arrow_schema)
+                writer.write_table(table)
+                rows += len(chunk)
+                n_chunks += 1
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    return {'rows': rows, 'chunks': n_chunks, 'format': fmt}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream large match factor result sets to Parquet/Arrow/gzip CSV.")
+    parser.add_argument('dataset', choices=['sweep', 'monte-carlo'])
+    parser.add_argument('-o', '--output', required=True, help="Output file (.parquet, .arrow or .csv.gz)")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), help="Default: from the output extension")
+    parser.add_argument('--compression', default='zstd', help="Parquet/Arrow compression (zstd, lz4, none)")
+    parser.add_argument('--chunksize', type=int, default=250_000, help="Rows per row group (default: 250000)")
+    parser.add_argument('--catalog', '--equipment-csv', dest='catalog', default=EQUIPMENT_CSV,
+                        help="Equipment catalog, flattened CSV or .xlsx workbook")
+    parser.add_argument('--cycle-time-csv', default=None,
+                        help="Cycle time table (default: calibrated table if present, else 'data cycle time.csv')")
+    sweep = parser.add_argument_group('sweep')
+    sweep.add_argument('--min-distance', type=float, default=0.5)
+    sweep.add_argument('--max-distance', type=float, default=15.0)
+    sweep.add_argument('--distance-step', type=float, default=0.5)
+    sweep.add_argument('--max-trucks', type=int, default=20)
+    sweep.add_argument('--job-condition', action='append', help="Repeatable (default: Average)")
+    sweep.add_argument('--mf-min', type=float)
+    sweep.add_argument('--mf-max', type=float)
+    mc = parser.add_argument_group('monte-carlo')
+    mc.add_argument('--excavator')
+    mc.add_argument('--truck')
+    mc.add_argument('--material')
+    mc.add_argument('--haul-distance', type=float, default=3.0)
+    mc.add_argument('--num-trucks', type=int, default=5)
+    mc.add_argument('--draws', type=int, default=1_000_000)
+    mc.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    excavators, trucks, materials, job_conditions = load_equipment_tables_cached(args.catalog, args.cycle_time_csv)
+    apply_job_efficiency(job_conditions)
+    # Schema = frame kosong dengan kolom dan dtype dataset, supaya grid atau filter tanpa baris tetap menulis file
+    if args.dataset == 'sweep':
+        distances = np.arange(args.min_distance, args.max_distance + args.distance_step / 2, args.distance_step)
+        chunks = iter_catalog_sweep(
+            excavators, trucks, materials, np.round(distances, 6), np.arange(1, args.max_trucks + 1),
+            job_conditions=args.job_condition or ('Average',), mf_min=args.mf_min, mf_max=args.mf_max,
+            chunk_size=args.chunksize
+        )
+        schema = next(iter_catalog_sweep(excavators.iloc[:1], trucks.iloc[:1], materials.iloc[:1], [1.0], [1]))
+    else:
+        missing = [name for name in ('excavator', 'truck', 'material') if not getattr(args, name)]
+        if missing:
+            parser.error("monte-carlo membutuhkan " + ", ".join(f"--{name}" for name in missing))
+        unknown = [f"--{name} {getattr(args, name)!r}" for name, table in
+                   (('excavator', excavators), ('truck', trucks), ('material', materials))
+                   if getattr(args, name) not in table.index]
+        if unknown:
+            parser.error("tidak ada di katalog: " + ", ".join(unknown))
+        scenario = (excavators.loc[args.excavator].to_dict(), trucks.loc[args.truck].to_dict(),
+                    materials.loc[args.material].to_dict(), args.haul_distance, args.num_trucks)
+        chunks = iter_monte_carlo_draws(*scenario, n_draws=args.draws, seed=args.seed, chunk_size=args.chunksize)
+        schema = next(iter_monte_carlo_draws(*scenario, n_draws=1))
+    compression = None if args.compression == 'none' else args.compression
+    result = export_chunks(chunks, args.output, args.format, compression, schema=schema.iloc[:0])
+    print(f"{result['rows']} baris ditulis ke {args.output} ({result['chunks']} chunk, {result['format']})",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,43 @@
+import os
+import tempfile
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from match_factor_engine import (
+    DEFAULT_UNCERTAINTY,
+    BucketPassFitMatrix,
+    JOB_EFFICIENCY,
+    apply_job_efficiency,
+    break_even_distances,
+    calculate_match_factor,
+    calculate_match_factor_batch,
+    calculate_optimal_trucks_for_mf1,
+    catalog_hourly_costs,
+    catalog_to_dicts,
+    cost_pareto_frontier,
+    efficiency_status_batch,
+    finite_source_queue,
+    fleet_cost_batch,
+    goal_seek_batch,
+    iter_catalog_sweep,
+    iter_monte_carlo_draws,
+    ScenarioMemo,
+    load_equipment_tables_cached,
+    match_factor_grid,
+    monte_carlo_match_factor,
+    scenario_key,
+    search_fleet_mix,
+    sensitivity_analysis,
+    sensitivity_catalog,
+    simulate_fleet,
+    sweep_equipment_catalog,
+)
+from dispatch_monitor import start_background_monitor
+from match_factor_export import EXPORT_FORMATS, export_chunks
 
 # Page configuration
 st.set_page_config(
@@ -75,132 +109,148 @@ st.markdown("""
 # Load data from CSV
 @st.cache_data
 def load_equipment_data():
-    # Use latin-1 encoding and skip the first row (header categories)
-    df = pd.read_csv('CONTOH DATA.csv', encoding='latin-1', header=1)
-    
-    # Extract excavator data
-    excavators = {}
-    trucks = {}
-    materials = {}
-    
-    # Muat database cycle time eksternal dan normalisasi header (hilangkan BOM, spasi)
-    try:
-        cycle_df = pd.read_csv('data cycle time.csv', encoding='utf-8-sig')
-        cycle_df.columns = (
-            cycle_df.columns
-            .astype(str)
-            .str.strip()
-            .str.replace('\ufeff', '', regex=True)
+    return load_equipment_tables_cached()
+
+# Load equipment data: tabel kolumnar untuk batch math, dict per item untuk perhitungan skalar
+EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE, JOB_TABLE = load_equipment_data()
+apply_job_efficiency(JOB_TABLE)  # Job efficiency factors dari tabel Operator_Efisiensi
+EXCAVATORS, TRUCKS, MATERIALS = (catalog_to_dicts(table) for table in (EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE))
+
+# Speed database for trucks (10-60 km/h with 1 km/h increment)
+SPEED_OPTIONS = {f"{speed} km/h": speed for speed in range(10, 61)}
+
+# Matriks kecocokan bucket pass dibangun sekali per proses dari katalog, dipakai semua sesi
+@st.cache_resource
+def get_bucket_pass_fit():
+    return BucketPassFitMatrix(EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE)
+
+def render_truck_recommender(selected_excavator, selected_truck, selected_material):
+    """Sidebar: kecocokan bucket pass truck terpilih dan truck terbaik untuk excavator ini"""
+    fit_matrix = get_bucket_pass_fit()
+    st.sidebar.subheader("🪣 Truck Terbaik untuk Excavator Ini")
+    fit = fit_matrix.fit(selected_excavator, selected_truck, selected_material)
+    if fit['bucket_pass'] > 0:
+        st.sidebar.caption(
+            f"Truck terpilih: {fit['exact_pass']:.2f} pass → {fit['bucket_pass']} pass "
+            f"(utilisasi muatan {fit['payload_utilisation']*100:.0f}%, "
+            f"+{fit['loading_penalty']:.1f} s/muatan untuk pass terakhir yang tidak penuh)"
         )
-        # Pastikan kolom-kolom kunci ada
-        required_cols = {'Digger', 'Bucket_capacity', 'Cycle_time', 'Efficiency', 'Product_type'}
-        missing = required_cols - set(cycle_df.columns)
-        # Jika ada yang hilang, tetap lanjut dengan yang tersedia (fallback dilakukan di bawah)
-        cycle_map = {}
-        if 'Digger' in cycle_df.columns:
-            for _, r in cycle_df.dropna(subset=['Digger']).iterrows():
-                name = str(r['Digger']).strip()
-                cycle_map[name] = {
-                    'bucket_capacity': float(r['Bucket_capacity']) if 'Bucket_capacity' in cycle_df.columns and pd.notna(r['Bucket_capacity']) else None,
-                    'cycle_time': float(r['Cycle_time']) if 'Cycle_time' in cycle_df.columns and pd.notna(r['Cycle_time']) else None,
-                    'efficiency': float(r['Efficiency']) if 'Efficiency' in cycle_df.columns and pd.notna(r['Efficiency']) else None,
-                    'product_type': str(r['Product_type']).strip() if 'Product_type' in cycle_df.columns and pd.notna(r['Product_type']) else None,
-                }
-        else:
-            cycle_map = {}
-    except Exception:
-        # Jika file tidak bisa dibaca, lanjut tanpa merge
-        cycle_map = {}
+    best = fit_matrix.best_trucks(selected_excavator, selected_material, top_n=5)
+    st.sidebar.dataframe(
+        best[['Truck', 'Bucket_Pass', 'Payload_Utilisation_%', 'Loading_Penalty_s']].rename(columns={
+            'Bucket_Pass': 'Pass', 'Payload_Utilisation_%': 'Utilisasi %', 'Loading_Penalty_s': 'Penalti (s)',
+        }).style.format({'Utilisasi %': '{:.0f}', 'Penalti (s)': '{:.1f}'}),
+        hide_index=True, use_container_width=True
+    )
+    st.sidebar.caption(f"Diurutkan: {fit_matrix.pass_range[0]}-{fit_matrix.pass_range[1]} pass, "
+                       f"utilisasi muatan tertinggi, penalti loading terkecil")
+
+# Memo skenario dibagi ke semua sesi (cache_resource), bukan disalin per sesi
+@st.cache_resource
+def get_scenario_memo():
+    return ScenarioMemo(maxsize=2048)
+
+# Rentang jarak sweep dashboard: grafik produktivitas vs jarak dan export grid fleet terpilih
+DISTANCE_SWEEP_KM = (0.5, 15.0)
+
+def distance_sweep(step):
+    """Titik jarak sweep dashboard (km) dengan resolusi step"""
+    return np.round(np.arange(DISTANCE_SWEEP_KM[0], DISTANCE_SWEEP_KM[1] + 1e-9, step), 6)
+
+def compute_dashboard_scenario(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                                job_condition, reposition_time):
+    """Semua angka yang dibutuhkan dashboard untuk satu skenario (dipanggil lewat memo LRU)"""
+    # Calculate match factor
+    result = calculate_match_factor(
+        excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time
+    )
     
-    # Process excavators (Backhoe and Shovel) - merge dengan data cycle_map bila tersedia
-    excavator_rows = df[df['Product'].isin(['Backhoe', 'Shovel'])].dropna(subset=['Equipment'])
-    for _, row in excavator_rows.iterrows():
-        if pd.notna(row['Equipment']) and pd.notna(row['Capacity']):
-            eq_name = str(row['Equipment']).strip()
-            cm = cycle_map.get(eq_name, {})
-            
-            # Hapus penggunaan bucket_size dan kolom 'Ukuran Bucket (m_)'
-            # bucket_size = float(row['Ukuran Bucket (m_)']) if 'Ukuran Bucket (m_)' in df.columns and pd.notna(row['Ukuran Bucket (m_)']) else None
-            
-            # Bucket capacity: prioritas dari file cycle time, fallback ke 'Capacity' dari CONTOH DATA.csv
-            bucket_capacity = float(cm['bucket_capacity']) if cm.get('bucket_capacity') is not None else float(row['Capacity'])
-            
-            # Cycle time (detik): prioritas dari file cycle time, fallback ke 'Waktu Siklus Rata-rata (detik)' atau 25 detik
-            if cm.get('cycle_time') is not None:
-                cycle_time = float(cm['cycle_time'])
-            elif 'Waktu Siklus Rata-rata (detik)' in df.columns and pd.notna(row['Waktu Siklus Rata-rata (detik)']):
-                cycle_time = float(row['Waktu Siklus Rata-rata (detik)'])
-            else:
-                cycle_time = 25.0  # default aman
-            
-            # Efficiency: prioritas dari file cycle time, fallback 0.92
-            efficiency = float(cm['efficiency']) if cm.get('efficiency') is not None else 0.92
-            
-            excavators[eq_name] = {
-                'bucket_capacity': bucket_capacity,   # m³
-                'cycle_time': cycle_time,             # detik
-                'efficiency': efficiency,             # faktor efisiensi
-                'product_type': row['Product']        # referensi dari CONTOH DATA.csv
-            }
+    # Calculate system productivity (affected by operational parameters)
+    # This should be the bottleneck productivity between excavator and truck system
+    truck_volume_bcm = truck_data['capacity'] / material_data['density_bank']
+    loading_time_hours = (truck_volume_bcm / excavator_data['bucket_capacity'] * excavator_data['cycle_time']) / 3600
+    loading_time_hours = loading_time_hours / result['job_efficiency']  # Apply job efficiency
     
-    # Process trucks (Truck and Dump Truck from your CSV data)
-    truck_rows = df[df['Product'].isin(['Truck', 'Dump Truck', 'Truck Art'])].dropna(subset=['Equipment'])
-    for _, row in truck_rows.iterrows():
-        if pd.notna(row['Equipment']) and pd.notna(row['Capacity']):
-            # Special speed settings for XDE130
-            if row['Equipment'] == 'XDE130':
-                speed_loaded = 20
-                speed_empty = 18
-            else:
-                # Default speeds for all other trucks
-                speed_loaded = 23
-                speed_empty = 21
-            
-            trucks[row['Equipment']] = {
-                'capacity': float(row['Capacity']),
-                'speed_loaded': speed_loaded,
-                'speed_empty': speed_empty,
-                'product_type': row['Product']
-            }
+    # Calculate truck cycle time
+    travel_time_loaded = haul_distance / truck_data['speed_loaded']
+    travel_time_empty = haul_distance / truck_data['speed_empty']
+    dumping_time = 2.0 / 60  # 2 minutes
+    spotting_time = 1.0 / 60  # 1 minute
+    total_truck_cycle = loading_time_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
     
-    # Process materials
-    material_rows = df.dropna(subset=['Material'])
-    for _, row in material_rows.iterrows():
-        if pd.notna(row['Material']):
-            bank_density = float(row['Bank (ton/m_)']) if pd.notna(row['Bank (ton/m_)']) else 2.0
-            loose_density = float(row['Loose (ton/m_)']) if pd.notna(row['Loose (ton/m_)']) else 1.5
-            swell_factor = float(row['Swell (Loose/Bank)']) if pd.notna(row['Swell (Loose/Bank)']) else 0.8
-            
-            materials[row['Material']] = {
-                'density_bank': bank_density,
-                'density_loose': loose_density,
-                'swell_factor': swell_factor,
-                'fill_factor': 0.9
-            }
+    # System productivity is limited by the bottleneck (gunakan formula digger sesuai permintaan)
+    excavator_prod_bcm = (
+        excavator_data['bucket_capacity']
+        * material_data['fill_factor']
+        * material_data['swell_factor']
+        * excavator_data['efficiency']
+        * result['job_efficiency']
+    ) * (3600 / excavator_data['cycle_time'])
+    excavator_prod_ton = excavator_prod_bcm * material_data['density_bank']
+    
+    # Use excavator maximum productivity for sidebar display
+    system_prod_bcm = excavator_prod_bcm  # Show digger maximum capacity
+    system_prod_ton = excavator_prod_ton  # Show digger maximum capacity in tons
+    truck_system_prod = (truck_volume_bcm * num_trucks) / total_truck_cycle
     
-    return excavators, trucks, materials
+    # System productivity is the minimum of excavator and truck system capacity
+    system_productivity_bcm = min(excavator_prod_bcm, truck_system_prod)
 
-# Load equipment data
-EXCAVATORS, TRUCKS, MATERIALS = load_equipment_data()
+    # Generate data for analysis
+    truck_range = range(1, 21)
+    distance_range = distance_sweep(0.5)
+    
+    # Match Factor vs Number of Trucks (satu panggilan batch untuk seluruh sweep)
+    truck_counts = np.fromiter(truck_range, dtype=int)
+    sweep_trucks = calculate_match_factor_batch(
+        excavator_data, truck_data, material_data, haul_distance, truck_counts, job_condition, reposition_time
+    )
+    df_trucks = pd.DataFrame({
+        'trucks': truck_counts,
+        'match_factor': sweep_trucks['match_factor'],
+        'productivity': sweep_trucks['productivity'],  # Total fleet productivity
+        'productivity_tons': sweep_trucks['productivity_tons'],  # Total fleet tons
+        'productivity_per_truck_bcm': sweep_trucks['productivity_per_truck_bcm'],  # Per truck BCM
+        'productivity_per_truck_tons': sweep_trucks['productivity_per_truck_tons'],  # Per truck tons
+        'status': efficiency_status_batch(sweep_trucks['match_factor'])
+    })
+    # Tambahkan kolom mf_diff
+    df_trucks['mf_diff'] = (df_trucks['match_factor'] - 1.0).abs()
+    
+    # Productivity vs Distance
+    sweep_distance = calculate_match_factor_batch(
+        excavator_data, truck_data, material_data, distance_range, num_trucks, job_condition, reposition_time
+    )
+    df_distance = pd.DataFrame({
+        'distance': distance_range,
+        'match_factor': sweep_distance['match_factor'],
+        'productivity': sweep_distance['productivity_tons'],  # Gunakan ton/h
+        'status': efficiency_status_batch(sweep_distance['match_factor'])
+    })
 
-# Job efficiency factors from CSV
-JOB_EFFICIENCY = {
-    'Good': 0.83,
-    'Average': 0.75,
-    'Rather Poor': 0.67,
-    'Poor': 0.58
-}
+    # PERBAIKAN: Gunakan fungsi calculate_optimal_trucks_for_mf1 untuk MF tepat 1.0
+    optimal_trucks_exact = calculate_optimal_trucks_for_mf1(
+        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time
+    )
+    
+    # Gunakan ROUNDUP (pembulatan ke atas) untuk rekomendasi
+    optimal_trucks_rounded = int(np.ceil(optimal_trucks_exact))
+    result_optimal = calculate_match_factor(
+        excavator_data, truck_data, material_data, haul_distance, optimal_trucks_rounded, job_condition, reposition_time
+    )
 
-# Speed database for trucks (10-60 km/h with 1 km/h increment)
-SPEED_OPTIONS = {f"{speed} km/h": speed for speed in range(10, 61)}
+    # Model antrian finite-source: truck optimal (utilisasi loader 90%) dan kinerja fleet tersebut
+    queue_optimal_exact = calculate_optimal_trucks_for_mf1(
+        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time, model='queue'
+    )
+    queue_optimal_rounded = int(np.ceil(queue_optimal_exact))
+    queue_optimal = {
+        key: float(values[queue_optimal_rounded - 1])
+        for key, values in finite_source_queue(
+            excavator_data, truck_data, material_data, haul_distance, queue_optimal_rounded, job_condition, reposition_time
+        ).items()
+    }
 
-# Update fungsi calculate_match_factor (sekitar baris 225-235)
-def calculate_match_factor(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition='Average', reposition_time=20):
-    """Calculate Match Factor based on equipment specifications from CSV data"""
-    
-    # Get job efficiency factor
-    job_efficiency = JOB_EFFICIENCY.get(job_condition, 0.75)
-    
     # Hitung Bucket Pass (sesuai formula yang diminta)
     vessel_truck_capacity_ton = truck_data['capacity']
     ff = material_data['fill_factor']
@@ -208,104 +258,1245 @@ def calculate_match_factor(excavator_data, truck_data, material_data, haul_dista
     density_loose = material_data['density_loose']
     bucket_pass_calc = (vessel_truck_capacity_ton * ff) / (ff * bucket_cap_m3 * density_loose)
     bucket_pass = int(np.ceil(bucket_pass_calc))  # pembulatan ke atas
-    
-    # Hitung Loading Cycle Truck (dalam jam) - sinkron dengan sidebar
-    loading_cycle_truck_hours = (
+
+    # Hitung Loading Cycle Truck (menit)
+    # Pada bagian perhitungan loading_cycle_truck_min (sekitar baris 636)
+    loading_cycle_truck_min = (
         ((excavator_data['cycle_time'] * bucket_pass) + reposition_time) / max(excavator_data['efficiency'], 1e-6)
-    ) / 3600.0  # konversi detik ke jam
+    ) / 60.0  # konversi ke menit untuk tampilan
+
+    return {
+        'result': result,
+        'system_productivity_bcm': system_productivity_bcm,
+        'df_trucks': df_trucks,
+        'df_distance': df_distance,
+        'optimal_trucks_exact': optimal_trucks_exact,
+        'optimal_trucks_rounded': optimal_trucks_rounded,
+        'result_optimal': result_optimal,
+        'queue_optimal_exact': queue_optimal_exact,
+        'queue_optimal_rounded': queue_optimal_rounded,
+        'queue_optimal': queue_optimal,
+        'bucket_pass': bucket_pass,
+        'loading_cycle_truck_min': loading_cycle_truck_min,
+    }
+
+
+def chart_theme_colors(is_dark_mode):
+    """Warna latar dan teks grafik untuk tema terang/gelap"""
+    if is_dark_mode:
+        return {'paper_bg': '#1f2937', 'plot_bg': '#374151', 'font_color': '#f8fafc', 'title_color': '#f8fafc'}
+    return {'paper_bg': '#ffffff', 'plot_bg': '#f8fafc', 'font_color': '#111111', 'title_color': '#111827'}
+
+
+# Fragment: kartu hasil utama hanya dirender ulang bersama inputnya, bukan oleh widget bagian lain
+@st.fragment
+def render_core_result(scenario, selected_excavator, selected_truck, selected_material,
+                       excavator_data, truck_data, material_data, num_trucks, job_condition):
+    """Kartu metrik utama dan spesifikasi equipment"""
+    result = scenario['result']
+    # Main content area
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric(
+            label="Match Factor",
+            value=f"{result['match_factor']:.2f}",
+            delta=f"{result['match_factor'] - 1:.2f}" if result['match_factor'] != 1 else None
+        )
+
+    # Update tampilan card 2 (sekitar baris 400-405)
+    with col2:
+        st.metric(
+            label="📊 Produktivitas Total Fleet",
+            value=f"{result['productivity']:.0f} BCM/h",
+            delta=f"{result['productivity_tons']:.0f} ton/h"
+        )
+
+        # Perbaiki caption untuk menampilkan per truck
+        st.caption(f"Per truck: {result['productivity_per_truck_bcm']:.0f} BCM/h ({result['productivity_per_truck_tons']:.0f} ton/h)")
+        st.caption(f"Jumlah truck: {num_trucks} unit")
+
+    with col3:
+        # Create abbreviated status for display
+        status_abbrev = {
+            "Under-trucked": "Under Truck",
+            "Over-trucked": "Over Truck", 
+            "Optimal": "Optimal"
+        }
+
+        st.metric(
+            label="Efficiency Status",
+            value=f"{result['status_color']} {status_abbrev.get(result['efficiency_status'], result['efficiency_status'])}"
+        )
+
+    with col4:
+        st.metric(
+            label="Job Efficiency",
+            value=f"{result['job_efficiency']*100:.0f}%"
+        )
+
+    # Equipment specifications
+    st.subheader("📊 Spesifikasi Equipment")
+
+    spec_col1, spec_col2, spec_col3 = st.columns(3)
+
+    with spec_col1:
+        st.write("**Excavator:**", selected_excavator)
+        st.write(f"• Tipe: {excavator_data['product_type']}")
+        st.write(f"• Kapasitas Bucket: {excavator_data['bucket_capacity']} m³")
+        st.write(f"• Cycle Time: {excavator_data['cycle_time']} detik")
+        st.write(f"• Kondisi Kerja: {job_condition} ({result['job_efficiency']*100:.0f}%)")
+
+    with spec_col2:
+        st.write("**Truck:**", selected_truck)
+        st.write(f"• Tipe: {truck_data['product_type']}")
+        st.write(f"• Kapasitas: {truck_data['capacity']} ton")
+        st.write(f"• Kecepatan Bermuatan: {truck_data['speed_loaded']} km/h")
+        st.write(f"• Kecepatan Kosong: {truck_data['speed_empty']} km/h")
+
+    with spec_col3:
+        st.write("**Material:**", selected_material)
+        st.write(f"• Density Bank: {material_data['density_bank']} ton/m³")
+        st.write(f"• Density Loose: {material_data['density_loose']} ton/m³")
+        st.write(f"• Swell Factor: {material_data['swell_factor']:.2f}")
+        st.write(f"• Fill Factor: {material_data['fill_factor']:.2f}")
+
+
+# Batas titik per seri: di atas ini trace memakai WebGL dan sweep didownsample sebelum dikirim ke browser
+WEBGL_MIN_POINTS = 1000
+CHART_MAX_POINTS = 4000
+
+def minmax_downsample(df, x, y, max_points=CHART_MAX_POINTS):
+    """Decimation min/max per bucket: puncak dan lembah seri tetap terlihat setelah dipangkas"""
+    n = len(df)
+    if n <= max_points:
+        return df
+    df = df.sort_values(x, kind='stable')
+    values = df[y].to_numpy(dtype=float)
+    n_buckets = max(max_points // 2, 1)
+    bucket = np.arange(n) * n_buckets // n
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    # Urutkan nilai di dalam tiap bucket; elemen pertama = min, terakhir = max
+    order = np.lexsort((values, bucket))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+    return df.iloc[keep]
+
+
+@st.cache_data(max_entries=256)
+def build_mf_trucks_figure(df_trucks, num_trucks, theme):
+    """Spec figure MF vs jumlah truck, di-cache berdasarkan hash data dan tema"""
+    paper_bg, plot_bg = theme['paper_bg'], theme['plot_bg']
+    font_color, title_color = theme['font_color'], theme['title_color']
+    df_trucks = minmax_downsample(df_trucks, 'trucks', 'match_factor')
+    fig1 = px.line(
+        df_trucks,
+        x='trucks',
+        y='match_factor',
+        title='Match Factor vs Jumlah Truck',
+        labels={'trucks': 'Jumlah Truck', 'match_factor': 'Match Factor'},
+        template='plotly_white',
+        render_mode='webgl' if len(df_trucks) > WEBGL_MIN_POINTS else 'auto'
+    )
+    fig1.update_layout(
+        height=400,
+        margin=dict(l=40, r=40, t=40, b=40),
+        paper_bgcolor=paper_bg,
+        plot_bgcolor=plot_bg,
+        font=dict(color=font_color, size=12),
+        title=dict(font=dict(color=title_color, size=14)),
+        xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color)),
+        yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color))
+    )
+    fig1.add_hline(y=1.0, line_dash="dash", line_color="green", annotation_text="Optimal")
+    fig1.add_hline(y=0.8, line_dash="dot", line_color="red", annotation_text="Under-trucked")
+    fig1.add_hline(y=1.2, line_dash="dot", line_color="yellow", annotation_text="Over-trucked")
+    # Tambahkan garis vertikal current agar sama dengan chart 2
+    fig1.add_vline(x=num_trucks, line_dash="dot", line_color="blue", annotation_text="Current")
+    return fig1
+
+
+@st.cache_data(max_entries=256)
+def build_productivity_distance_figure(df_distance, haul_distance, theme):
+    """Spec figure produktivitas vs jarak angkut, di-cache berdasarkan hash data dan tema"""
+    paper_bg, plot_bg = theme['paper_bg'], theme['plot_bg']
+    font_color, title_color = theme['font_color'], theme['title_color']
+    df_distance = minmax_downsample(df_distance, 'distance', 'productivity')
+    fig2 = px.line(
+        df_distance,
+        x='distance',
+        y='productivity',
+        title='Produktivitas vs Jarak Angkut',
+        labels={'distance': 'Jarak (km)', 'productivity': 'Produktivitas (ton/h)'},
+        template='plotly_white',
+        render_mode='webgl' if len(df_distance) > WEBGL_MIN_POINTS else 'auto'
+    )
+    fig2.update_layout(
+        height=400,
+        margin=dict(l=40, r=40, t=40, b=40),
+        paper_bgcolor=paper_bg,
+        plot_bgcolor=plot_bg,
+        font=dict(color=font_color, size=12),
+        title=dict(font=dict(color=title_color, size=14)),
+        xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color)),
+        yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color))
+    )
+    fig2.add_vline(x=haul_distance, line_dash="dot", line_color="blue", annotation_text="Current")
+    return fig2
+
+
+@st.cache_data(max_entries=256)
+def build_cycle_time_figures(df_times, theme):
+    """Spec bar dan polar chart cycle time, di-cache berdasarkan hash data dan tema"""
+    paper_bg, plot_bg = theme['paper_bg'], theme['plot_bg']
+    font_color, title_color = theme['font_color'], theme['title_color']
+    fig3 = px.bar(
+        df_times.sort_values('minutes', ascending=True),
+        x='minutes',
+        y='component',
+        orientation='h',
+        title='Durasi Per Komponen (menit)',
+        labels={'minutes': 'Menit', 'component': ''},
+        text='minutes',
+        template='plotly_white'
+    )
+    fig3.update_traces(marker_color='#6366F1', texttemplate='%{text:.1f}', textposition='outside')
+    fig3.update_layout(
+        height=380,
+        margin=dict(l=40, r=40, t=40, b=40),
+        paper_bgcolor=paper_bg,
+        plot_bgcolor=plot_bg,
+        font=dict(color=font_color, size=12),
+        title=dict(font=dict(color=title_color, size=14)),
+        xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color), gridcolor='rgba(255,255,255,0.1)'),
+        yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color), gridcolor='rgba(255,255,255,0.1)')
+    )
+
+    # Konversi data untuk polar chart
+    N = len(df_times)
+    theta = np.linspace(0.0, 2 * np.pi, N, endpoint=False)
+    radii = df_times['percent'].values
+
+    # Buat polar chart menggunakan plotly
+    fig4 = go.Figure()
+
+    # Tambahkan trace terpisah untuk setiap komponen agar legenda detail muncul
+    colors = ['#6366F1', '#22C55E', '#EAB308', '#EF4444', '#A855F7', '#8B5CF6']
+    for i, (comp, pct, color) in enumerate(zip(df_times['component'], df_times['percent'], colors)):
+        fig4.add_trace(go.Barpolar(
+            r=[pct],
+            theta=[theta[i] * 180 / np.pi],
+            width=[360/N],
+            marker=dict(color=color, line=dict(width=0)),  # Hilangkan border
+            name=comp,  # Nama detail untuk legenda
+            hovertemplate=f'<b>{comp}</b><br>Persentase: %{{r:.1f}}%<br>Waktu: {df_times.iloc[i]["minutes"]:.1f} menit<extra></extra>',
+            showlegend=True
+        ))
+
+    fig4.update_layout(
+        title='Kontribusi Waktu per Komponen (%)',
+        height=380,
+        margin=dict(l=40, r=40, t=40, b=40),
+        paper_bgcolor=paper_bg,
+        plot_bgcolor=plot_bg,
+        font=dict(color=font_color, size=12),
+        title_font=dict(color=title_color, size=14),
+        showlegend=True,
+        legend=dict(
+            orientation='v',
+            yanchor='middle',
+            y=0.5,
+            xanchor='left',
+            x=1.05,
+            font=dict(color=font_color, size=10),
+            bgcolor='rgba(0,0,0,0)',  # Transparent background
+            bordercolor='rgba(0,0,0,0)',  # No border
+            borderwidth=0,  # No border width
+            itemsizing='constant',  # Ukuran item legenda konsisten
+            itemwidth=30  # Lebar area warna di legenda
+        ),
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max(radii) * 1.1],
+                tickfont=dict(color=font_color, size=10),
+                gridcolor='rgba(128,128,128,0.3)',
+                ticksuffix='%'
+            ),
+            angularaxis=dict(
+                tickfont=dict(color=font_color, size=10),
+                gridcolor='rgba(128,128,128,0.3)',
+                linecolor='rgba(128,128,128,0.5)',
+                tickmode='array',
+                tickvals=theta * 180 / np.pi,
+                ticktext=df_times['component']
+            ),
+            bgcolor=plot_bg
+        )
+    )
+    return fig3, fig4
+
+
+# Fragment: grafik sweep terisolasi dari interaksi widget di bagian lain
+@st.fragment
+def render_sweep_charts(scenario, num_trucks, haul_distance, theme):
+    """Grafik MF vs jumlah truck dan produktivitas vs jarak angkut"""
+    fig1 = build_mf_trucks_figure(scenario['df_trucks'], num_trucks, theme)
+    fig2 = build_productivity_distance_figure(scenario['df_distance'], haul_distance, theme)
+    fig_col1, fig_col2 = st.columns(2)
+    for fig_col, fig in ((fig_col1, fig1), (fig_col2, fig2)):
+        with fig_col:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+
+# Grid heatmap: 0.1-30 km (langkah 0.05 km) x 1-200 truck
+HEATMAP_DISTANCES = np.round(np.arange(0.1, 30.0 + 0.025, 0.05), 2)
+HEATMAP_TRUCKS = np.arange(1, 201)
+
+@st.cache_data(max_entries=64)
+def build_mf_heatmap_figure(excavator_data, truck_data, material_data, job_condition, reposition_time, metric, theme):
+    """Heatmap MF / produktivitas atas jarak angkut x jumlah truck dengan kontur MF=1.0 dan 1.2"""
+    grid = match_factor_grid(
+        excavator_data, truck_data, material_data, HEATMAP_DISTANCES, HEATMAP_TRUCKS, job_condition, reposition_time
+    )
+    match_factor = np.round(grid['match_factor'], 3)
+    if metric == 'Match Factor':
+        z, colorbar_title, colorscale = match_factor, 'MF', 'RdYlGn'
+    else:
+        z, colorbar_title, colorscale = np.round(grid['productivity'], 1), 'BCM/h', 'Viridis'
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=z, x=HEATMAP_TRUCKS, y=HEATMAP_DISTANCES,
+        colorscale=colorscale,
+        colorbar=dict(title=colorbar_title),
+        hovertemplate='Truck: %{x}<br>Jarak: %{y:.2f} km<br>' + colorbar_title + ': %{z}<extra></extra>'
+    ))
+    # Pita optimal: garis kontur MF=1.0 dan MF=1.2
+    fig.add_trace(go.Contour(
+        z=match_factor, x=HEATMAP_TRUCKS, y=HEATMAP_DISTANCES,
+        contours=dict(start=1.0, end=1.2, size=0.2, coloring='lines', showlabels=True,
+                      labelfont=dict(color=theme['font_color'])),
+        line=dict(width=2, color='white' if metric != 'Match Factor' else 'black'),
+        showscale=False, hoverinfo='skip', name='MF 1.0 / 1.2'
+    ))
+    fig.update_layout(
+        title=f'{metric} vs Jarak Angkut x Jumlah Truck',
+        height=520,
+        margin=dict(l=40, r=40, t=40, b=40),
+        paper_bgcolor=theme['paper_bg'],
+        plot_bgcolor=theme['plot_bg'],
+        font=dict(color=theme['font_color'], size=12),
+        title_font=dict(color=theme['title_color'], size=14),
+        xaxis=dict(title='Jumlah Truck'),
+        yaxis=dict(title='Jarak (km)')
+    )
+    return fig
+
+
+# Fragment: ganti metrik heatmap tanpa rerun seluruh halaman
+@st.fragment
+def render_mf_heatmap(excavator_data, truck_data, material_data, job_condition, reposition_time, theme):
+    """Permukaan MF / produktivitas 2-D untuk membaca pita optimal di semua jarak sekaligus"""
+    with st.expander("🗺️ Heatmap Match Factor (Jarak x Jumlah Truck)"):
+        metric = st.radio(
+            "Tampilkan:", ["Match Factor", "Produktivitas Fleet (BCM/h)"], horizontal=True, key="heatmap_metric"
+        )
+        # Grid 600 x 200 hanya dihitung dan dikirim ke browser setelah diaktifkan
+        if not st.toggle("Tampilkan heatmap", value=False, key="heatmap_enabled"):
+            return
+        fig = build_mf_heatmap_figure(
+            excavator_data, truck_data, material_data, job_condition, reposition_time, metric, theme
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Garis kontur menandai MF = 1.0 dan MF = 1.2; area di antaranya adalah pita fleet optimal.")
+
+
+# Fragment: pilihan tema kartu hanya menjalankan ulang kolom kanan ini
+@st.fragment
+def render_detail_cards(scenario, selected_excavator, selected_truck, selected_material,
+                        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time):
+    """Kolom kanan: kartu detail digger dan hauler"""
+    result = scenario['result']
+    system_productivity_bcm = scenario['system_productivity_bcm']
+    bucket_pass = scenario['bucket_pass']
+    loading_cycle_truck_min = scenario['loading_cycle_truck_min']
+    # Tambahkan pemilihan tema di sidebar kanan
+    theme_choice = st.selectbox(
+        "Pilih Tema",
+        ["Dark", "Light"],
+        key="right_theme_select"
+    )
+
+    # Definisikan CSS berdasarkan pilihan tema
+    if theme_choice == "Dark":
+        theme_css = """
+        <style>
+        .stApp {
+            background-color: #000000;
+            color: #ffffff;
+        }
+        // ... tambahkan styling dark lainnya ...
+        </style>
+        """
+    else:
+        theme_css = """
+        <style>
+        .stApp {
+            background-color: #f8fafc;
+            color: #111827;
+        }
+        // ... tambahkan styling light lainnya ...
+        </style>
+        """
+
+    st.markdown(theme_css, unsafe_allow_html=True)
+
+    st.markdown("### 📋 Detail Specs")
+
+    # Pastikan system_productivity_bcm didefinisikan sebelumnya; jika tidak, hitung ulang di sini
+    # Contoh: system_productivity_bcm = min(excavator_theoretical_prod, truck_system_prod)  # Dari perhitungan sebelumnya
+
+    system_prod_bcm = system_productivity_bcm  # Asumsikan sudah didefinisikan; jika error, definisikan ulang
+    system_prod_ton = system_prod_bcm * material_data['density_bank']
+
+
+    # Calculate cycle times in minutes
+    # Calculate cycle times in minutes (sinkronkan dengan calculate_match_factor)
+    reposition_time_min = reposition_time / 60  # Konversi dari detik
+    loading_time_min = result['loading_time'] * 60  # Hilangkan pembagian job_efficiency jika sudah dihitung di fungsi
+    travel_time_loaded = (haul_distance / truck_data['speed_loaded']) * 60
+    travel_time_empty = (haul_distance / truck_data['speed_empty']) * 60
+    dumping_time = result.get('dumping_time', 1.4)  # Ambil dari result jika ada, fallback hardcoded
+    maneuver_time = result.get('spotting_time', 0.7)  # Sinkronkan nama
+    total_cycle_time_min = loading_time_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time + reposition_time_min
+
+    # Calculate productivities (gunakan nilai dari result untuk sinkronisasi)
+    if 'excavator_prod_bcm' in result:
+        excavator_theoretical_prod_bcm = result['excavator_prod_bcm']
+    else:
+        # Hitung ulang jika tidak ada, sinkron dengan calculate_match_factor
+        excavator_theoretical_prod_bcm = (excavator_data['bucket_capacity'] * 3600 / excavator_data['cycle_time']) * excavator_data['efficiency'] * result['job_efficiency']
+
+    # Di bagian Machine Hauler Section (sekitar baris 650-670)
+    # Ganti perhitungan di sidebar hauler (sekitar baris 628)
+    # SEBELUM (SALAH):
+    # truck_prod_ton_per_unit = (truck_data['capacity'] * 60)/ total_cycle_time_min * truck_data.get('efficiency', 0.92) * result['job_efficiency']
+
+    # SESUDAH (BENAR):
+    truck_efficiency = truck_data.get('efficiency', 0.92)
+    # Di bagian sidebar hauler (sekitar baris 632-634)
+    # SEBELUM (TIDAK KONSISTEN):
+    # truck_prod_ton_per_unit = (truck_data['capacity'] * truck_efficiency * result['job_efficiency']) / (total_cycle_time_min / 60)
+    # truck_prod_bcm_per_unit = truck_prod_ton_per_unit / material_data['density_bank']
+
+    # SESUDAH (KONSISTEN):
+    # Gunakan nilai dari result untuk konsistensi
+    truck_prod_ton_per_unit = result['productivity_per_truck_tons']
+    truck_prod_bcm_per_unit = result['productivity_per_truck_bcm']
+
+    # Total fleet productivity juga gunakan dari result
+    truck_prod_ton = result['productivity_tons']
+    truck_prod_bcm = result['productivity']
+
+    # Atau alternatif: gunakan system_productivity_bcm dan konversi ke ton
+    # truck_prod_bcm = system_productivity_bcm  # Sama dengan digger
+    # truck_prod_ton = truck_prod_bcm * material_data['density_bank']
+
+    # Use system productivity for display (same as col2)
+    system_prod_bcm = system_productivity_bcm  # Use the calculated system productivity
+    system_prod_ton = system_prod_bcm * material_data['density_bank']
+
+    # Pastikan total_cycle_time_min menggunakan loading_cycle_truck_min
+    total_cycle_time_min = loading_cycle_truck_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time
+
+    # Update bagian loading_time_min untuk konsistensi (sekitar baris 782)
+    loading_time_min = loading_cycle_truck_min  # Gunakan nilai yang sama
+    st.image("svg/035-crane truck.svg", width=80)  # Sudah ada, pastikan sesuai
+    st.markdown(f"**{selected_excavator[:15]}...**" if len(selected_excavator) > 15 else f"**{selected_excavator}**")
+
+    st.markdown(
+        f"""
+        <div class="detail-card-digger">
+            <table style="width:100%; border-collapse:collapse;">
+                <thead>
+                    <tr>
+                        <th style="text-align:left; padding:4px 6px;">Description</th>
+                        <th style="text-align:left; padding:4px 6px;">Value</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    <tr><td style="padding:4px 6px;">Bucket</td><td style="padding:4px 6px;">{excavator_data['bucket_capacity']} m³</td></tr>
+                    <tr><td style="padding:4px 6px;">Material</td><td style="padding:4px 6px;">{selected_material[:12]}...</td></tr>
+                    <tr><td style="padding:4px 6px;">Density Bcm</td><td style="padding:4px 6px;">{material_data['density_bank']:.2f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Density Lcm</td><td style="padding:4px 6px;">{material_data['density_loose']:.2f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Swell Factor</td><td style="padding:4px 6px;">{material_data['swell_factor']:.2f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Fill Factor</td><td style="padding:4px 6px;">{material_data['fill_factor']:.2f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Bucket Pass</td><td style="padding:4px 6px;">{bucket_pass} pass</td></tr>
+                    <tr><td style="padding:4px 6px;">Cycle Time</td><td style="padding:4px 6px;">{excavator_data['cycle_time']:.0f}s</td></tr>
+                    <tr><td style="padding:4px 6px;">Operator Eff</td><td style="padding:4px 6px;">{excavator_data['efficiency']*100:.0f}%</td></tr>
+                    <tr><td style="padding:4px 6px;">Job Condition</td><td style="padding:4px 6px;">{job_condition}</td></tr>
+                    <tr><td style="padding:4px 6px;">Reposition Time</td><td style="padding:4px 6px;">{reposition_time:.0f} s</td></tr>
+                    <tr><td style="padding:4px 6px;">Productivity (bcm/h)</td><td style="padding:4px 6px;">{system_prod_bcm:.0f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Productivity (ton/h)</td><td style="padding:4px 6px;">{system_prod_ton:.0f}</td></tr>
+                </tbody>
+            </table>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # Machine Hauler Section
+    st.image('mining-truck.svg', width=80)
+    st.markdown(f"**{selected_truck[:15]}...**" if len(selected_truck) > 15 else f"**{selected_truck}**")
+
+    st.markdown(
+        f"""
+        <div class="detail-card-hauler">
+            <table style="width:100%; border-collapse:collapse;">
+                <thead>
+                    <tr>
+                        <th style="text-align:left; padding:4px 6px;">Description</th>
+                        <th style="text-align:left; padding:4px 6px;">Value</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    <tr><td style="padding:4px 6px;">Model</td><td style="padding:4px 6px;">{selected_truck}</td></tr>
+                    <tr><td style="padding:4px 6px;">Capacity</td><td style="padding:4px 6px;">{truck_data['capacity']} ton</td></tr>
+                    <tr><td style="padding:4px 6px;">Distance</td><td style="padding:4px 6px;">{haul_distance} km</td></tr>
+                    <tr><td style="padding:4px 6px;">Speed Full</td><td style="padding:4px 6px;">{truck_data['speed_loaded']} km/h</td></tr>
+                    <tr><td style="padding:4px 6px;">Travel 1</td><td style="padding:4px 6px;">{travel_time_loaded:.1f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Speed Empty</td><td style="padding:4px 6px;">{truck_data['speed_empty']} km/h</td></tr>
+                    <tr><td style="padding:4px 6px;">Travel 2</td><td style="padding:4px 6px;">{travel_time_empty:.1f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Maneuver</td><td style="padding:4px 6px;">{maneuver_time:.1f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Dumping</td><td style="padding:4px 6px;">{dumping_time:.1f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Loading Cycle Truck</td><td style="padding:4px 6px;">{loading_cycle_truck_min:.1f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Ritase</td><td style="padding:4px 6px;">{60/total_cycle_time_min:.1f} trip/h</td></tr>
+                    <tr><td style="padding:4px 6px;">Cycle Time</td><td style="padding:4px 6px;">{total_cycle_time_min:.0f} min</td></tr>
+                    <tr><td style="padding:4px 6px;">Operator Eff</td><td style="padding:4px 6px;">92%</td></tr>
+                    <tr><td style="padding:4px 6px;">Job Condition</td><td style="padding:4px 6px;">{job_condition}</td></tr>
+                    <tr><td style="padding:4px 6px;">Productivity (bcm/h)</td><td style="padding:4px 6px;">{truck_prod_bcm_per_unit:.0f}</td></tr>
+                    <tr><td style="padding:4px 6px;">Productivity (ton/h)</td><td style="padding:4px 6px;">{truck_prod_ton_per_unit:.0f}</td></tr>
+                </tbody>
+            </table>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+# Fragment: ganti model rekomendasi tanpa rerun seluruh halaman
+@st.fragment
+def render_recommendation(scenario):
+    """Rekomendasi jumlah truck untuk MF=1.0 (rasio MF) atau utilisasi loader 90% (antrian)"""
+    optimal_trucks_exact = scenario['optimal_trucks_exact']
+    optimal_trucks_rounded = scenario['optimal_trucks_rounded']
+    result_optimal = scenario['result_optimal']
+    # Tambahkan sub judul
+    st.subheader("🎯 Rekomendasi Optimal")
+    model = st.radio(
+        "Model:", ["Rasio MF (statis)", "Antrian finite-source"], horizontal=True, key="recommendation_model"
+    )
+
+    if model == "Antrian finite-source":
+        queue_optimal = scenario['queue_optimal']
+        st.success(f"🎯 **Jumlah truck optimal (utilisasi loader 90%):** {scenario['queue_optimal_rounded']} unit")
+        st.info(f"📊 **Detail perhitungan:**")
+        st.info(f"   • Nilai eksak: {scenario['queue_optimal_exact']:.2f} truck")
+        st.info(f"   • Utilisasi loader: {queue_optimal['loader_utilisation']*100:.1f}%")
+        st.info(f"   • Rata-rata antri per muatan: {queue_optimal['mean_wait']:.1f} menit")
+        st.info(f"   • MF (rasio) dengan {scenario['queue_optimal_rounded']} truck: {queue_optimal['match_factor']:.2f}")
+        st.success(f"📈 **Produktivitas efektif fleet:** {queue_optimal['productivity_tons']:.0f} ton/h = {queue_optimal['productivity']:.0f} bcm/h")
+        return
+
+    # Tampilkan rekomendasi dengan roundup
+    st.success(f"🎯 **Jumlah truck optimal (MF=1.0):** {optimal_trucks_rounded} unit")
+    st.info(f"📊 **Detail perhitungan:**")
+    st.info(f"   • Nilai eksak: {optimal_trucks_exact:.2f} truck")
+    st.info(f"   • Setelah roundup: {optimal_trucks_rounded} truck")
+    st.info(f"   • MF aktual dengan {optimal_trucks_rounded} truck: {result_optimal['match_factor']:.2f}")
     
-    # Travel times (convert to hours)
-    travel_time_loaded = haul_distance / truck_data['speed_loaded']  # hours
-    travel_time_empty = haul_distance / truck_data['speed_empty']    # hours
+    # Produktivitas per truck dengan jumlah optimal
+    st.success(f"📈 **Produktivitas per truck:** {result_optimal['productivity_per_truck_tons']:.0f} ton/h = {result_optimal['productivity_per_truck_bcm']:.0f} bcm/h")
+    st.success(f"📈 **Produktivitas total fleet:** {result_optimal['productivity_tons']:.0f} ton/h = {result_optimal['productivity']:.0f} bcm/h")
     
-    # Total cycle time (hours)
-    dumping_time = 1.4 / 60  # menit ke jam
-    spotting_time = 0.7 / 60  # menit ke jam
-    total_cycle_time = loading_cycle_truck_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
+    # Hapus baris produktivitas total fleet
+
+
+@st.cache_data(max_entries=64)
+def run_monte_carlo(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                    reposition_time, n_draws, uncertainty, seed):
+    return monte_carlo_match_factor(
+        excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+        reposition_time, n_draws=n_draws, uncertainty=uncertainty, seed=seed
+    )
+
+
+# Fragment: pengaturan dan hasil simulasi tidak memicu rerun seluruh halaman
+@st.fragment
+def render_monte_carlo(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time):
+    """Simulasi Monte Carlo MF dan produktivitas untuk fleet terpilih"""
+    with st.expander("🎲 Simulasi Monte Carlo (Ketidakpastian Input)"):
+        mc_col1, mc_col2 = st.columns(2)
+        with mc_col1:
+            n_draws = st.select_slider("Jumlah sampel:", options=[10**4, 10**5, 10**6, 10**7], value=10**5,
+                                       format_func=lambda n: f"{n:,}")
+            seed = st.number_input("Seed:", min_value=0, value=42, step=1)
+        uncertainty = {}
+        with mc_col2:
+            for name, (dist, spread) in DEFAULT_UNCERTAINTY.items():
+                pct = st.slider(f"{name} ({dist}, ±%)", 0, 100, int(round(spread * 100)), key=f"mc_{name}")
+                uncertainty[name] = (dist, pct / 100)
+        if st.button("▶️ Jalankan Simulasi"):
+            mc = run_monte_carlo(
+                excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                reposition_time, int(n_draws), uncertainty, int(seed)
+            )
+            summary = mc['summary']
+            res_col1, res_col2, res_col3 = st.columns(3)
+            res_col1.metric("MF P50", f"{summary.loc['match_factor', 'P50']:.2f}",
+                            help=f"P10-P90: {summary.loc['match_factor', 'P10']:.2f} - {summary.loc['match_factor', 'P90']:.2f}")
+            res_col2.metric("Produktivitas P50", f"{summary.loc['productivity', 'P50']:.0f} BCM/h",
+                            help=f"P10-P90: {summary.loc['productivity', 'P10']:.0f} - {summary.loc['productivity', 'P90']:.0f} BCM/h")
+            res_col3.metric("P(Loader Bottleneck)", f"{mc['p_loader_bottleneck']*100:.1f}%")
+            st.dataframe(summary.rename(index={
+                'match_factor': 'Match Factor',
+                'productivity': 'Produktivitas Fleet (BCM/h)',
+                'productivity_tons': 'Produktivitas Fleet (ton/h)',
+            }).style.format('{:.2f}'), use_container_width=True)
+            st.caption(f"{mc['n_draws']:,} sampel, seed {int(seed)}")
+
+
+SENSITIVITY_LABELS = {
+    'haul_distance': 'Jarak angkut',
+    'speed_loaded': 'Kecepatan isi',
+    'speed_empty': 'Kecepatan kosong',
+    'cycle_time': 'Cycle time excavator',
+    'bucket_capacity': 'Kapasitas bucket',
+    'excavator_efficiency': 'Efisiensi excavator',
+    'truck_capacity': 'Kapasitas truck',
+    'truck_efficiency': 'Efisiensi truck',
+    'fill_factor': 'Fill factor',
+    'swell_factor': 'Swell factor',
+    'density_loose': 'Densitas loose',
+    'density_bank': 'Densitas bank',
+    'reposition_time': 'Waktu reposisi',
+    'job_efficiency': 'Efisiensi kerja',
+    'num_trucks': 'Jumlah truck',
+}
+
+
+@st.cache_data(max_entries=64)
+def build_tornado_figure(sensitivity, metric, base, swing_pct, theme):
+    """Tornado chart: output pada input -swing/+swing, diurutkan dari rentang terbesar"""
+    low, high = sensitivity[f'{metric}_low'], sensitivity[f'{metric}_high']
+    order = (high - low).abs().sort_values().index
+    labels = [SENSITIVITY_LABELS.get(name, name) for name in order]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(y=labels, x=(low[order] - base).values, base=base, orientation='h',
+                         name=f'Input -{swing_pct:.0f}%', marker_color='#EF4444'))
+    fig.add_trace(go.Bar(y=labels, x=(high[order] - base).values, base=base, orientation='h',
+                         name=f'Input +{swing_pct:.0f}%', marker_color='#22C55E'))
+    fig.add_vline(x=base, line_dash="dot", line_color=theme['font_color'])
+    fig.update_layout(
+        barmode='overlay',
+        height=520,
+        title='Tornado Match Factor' if metric == 'mf' else 'Tornado Produktivitas Fleet (BCM/h)',
+        margin=dict(l=40, r=40, t=50, b=40),
+        paper_bgcolor=theme['paper_bg'],
+        plot_bgcolor=theme['plot_bg'],
+        font=dict(color=theme['font_color'], size=12),
+        title_font=dict(color=theme['title_color'], size=14),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+    )
+    return fig
+
+
+@st.cache_data(max_entries=8)
+def run_sensitivity_catalog(job_condition, reposition_time, speed_loaded, speed_empty, haul_distance, swing):
+    return sensitivity_catalog(
+        EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE, haul_distance, job_condition=job_condition,
+        reposition_time=reposition_time, speed_loaded=speed_loaded, speed_empty=speed_empty, swing=swing
+    )
+
+
+# Fragment: slider swing dan batch katalog tidak memicu rerun seluruh halaman
+@st.fragment
+def render_sensitivity(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                       reposition_time, theme):
+    """Tornado chart dan elastisitas MF/produktivitas terhadap setiap input"""
+    with st.expander("🌪️ Analisis Sensitivitas (Tornado)"):
+        sens_col1, sens_col2 = st.columns(2)
+        swing_pct = sens_col1.slider("Perubahan input (±%):", 1, 50, 10, key="sens_swing")
+        metric = sens_col2.radio("Output:", ["Match Factor", "Produktivitas Fleet (BCM/h)"], horizontal=True,
+                                 key="sens_metric")
+        # Tornado dihitung ulang tiap rerun hanya bila diaktifkan
+        if st.toggle("Hitung sensitivitas", value=False, key="sens_enabled"):
+            sensitivity = sensitivity_analysis(
+                excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                reposition_time, swing=swing_pct / 100
+            )
+            metric_key = 'mf' if metric == "Match Factor" else 'productivity'
+            base = sensitivity.attrs['match_factor' if metric_key == 'mf' else 'productivity']
+            st.plotly_chart(build_tornado_figure(sensitivity, metric_key, base, swing_pct, theme),
+                            use_container_width=True)
+            st.dataframe(sensitivity.rename(index=SENSITIVITY_LABELS).rename(columns={
+                'base_value': 'Nilai Dasar',
+                'mf_low': f'MF (-{swing_pct}%)',
+                'mf_high': f'MF (+{swing_pct}%)',
+                'mf_elasticity': 'Elastisitas MF',
+                'productivity_low': f'Produktivitas (-{swing_pct}%)',
+                'productivity_high': f'Produktivitas (+{swing_pct}%)',
+                'productivity_elasticity': 'Elastisitas Produktivitas',
+            }).style.format('{:.3f}'), use_container_width=True)
+            st.caption("Elastisitas = % perubahan output per 1% perubahan input (selisih pusat ±1%). "
+                       "Bucket pass dibulatkan ke atas, sehingga kapasitas bucket/truck bisa berubah bertingkat.")
+
+        if st.button("▶️ Ranking Fleet Paling Robust (Seluruh Katalog)"):
+            df_robust = run_sensitivity_catalog(
+                job_condition, reposition_time, truck_data['speed_loaded'], truck_data['speed_empty'],
+                haul_distance, swing_pct / 100
+            )
+            st.caption(f"{len(df_robust):,} fleet pada jarak {haul_distance} km, jumlah truck = optimum MF ≥ 1; "
+                       f"diurutkan dari swing produktivitas maksimum terkecil")
+            st.dataframe(df_robust.head(200), use_container_width=True)
+
+
+GOAL_SEEK_LABELS = {
+    'haul_distance': ('Jarak angkut', 'km'),
+    'speed_loaded': ('Kecepatan isi', 'km/h'),
+    'speed_empty': ('Kecepatan kosong', 'km/h'),
+    'reposition_time': ('Waktu reposisi', 'detik'),
+    'num_trucks': ('Jumlah truck', 'unit'),
+    'bucket_pass': ('Bucket pass (pilihan truck)', 'pass'),
+}
+GOAL_SEEK_TARGET_LABELS = {
+    'match_factor': 'Match Factor',
+    'productivity': 'Produktivitas Fleet (BCM/h)',
+    'productivity_tons': 'Produktivitas Fleet (ton/h)',
+}
+
+
+@st.cache_data(max_entries=8)
+def run_break_even_distances(job_condition, reposition_time, speed_loaded, speed_empty, max_trucks, target,
+                             target_metric):
+    return break_even_distances(
+        EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE, np.arange(1, max_trucks + 1), target, target_metric,
+        job_condition=job_condition, reposition_time=reposition_time, speed_loaded=speed_loaded,
+        speed_empty=speed_empty
+    )
+
+
+# Fragment: input goal seek tidak memicu rerun seluruh halaman
+@st.fragment
+def render_goal_seek(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                     reposition_time):
+    """Cari nilai satu input yang menghasilkan target MF atau produktivitas"""
+    with st.expander("🎯 Goal Seek (Target MF / Produksi)"):
+        gs_col1, gs_col2, gs_col3 = st.columns(3)
+        variable = gs_col1.selectbox("Cari nilai:", list(GOAL_SEEK_LABELS),
+                                     format_func=lambda name: GOAL_SEEK_LABELS[name][0], key="gs_variable")
+        target_metric = gs_col2.selectbox("Target:", list(GOAL_SEEK_TARGET_LABELS),
+                                          format_func=GOAL_SEEK_TARGET_LABELS.get, key="gs_metric")
+        if target_metric == 'match_factor':
+            default_target = 1.0
+        else:
+            # Default: 10% di atas produksi skenario saat ini
+            current = calculate_match_factor(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                                             job_condition, reposition_time)
+            default_target = float(round(current[target_metric] * 1.1))
+        target = gs_col3.number_input("Nilai target:", min_value=0.0, value=default_target,
+                                      step=0.05 if target_metric == 'match_factor' else 50.0, key=f"gs_target_{target_metric}")
+        # Pencarian akar dijalankan hanya bila diaktifkan, tidak setiap rerun
+        if st.toggle("Hitung goal seek", value=False, key="gs_enabled"):
+            solved = goal_seek_batch(
+                excavator_data, truck_data, material_data, haul_distance, num_trucks, variable, target,
+                target_metric, job_condition, reposition_time,
+                trucks=TRUCK_TABLE if variable == 'bucket_pass' else None
+            )
+            label, unit = GOAL_SEEK_LABELS[variable]
+            status = solved['status'].item()
+            if status == 'solved':
+                res_col1, res_col2 = st.columns(2)
+                res_col1.metric(label, f"{solved['value'].item():.2f} {unit}")
+                res_col2.metric(f"{GOAL_SEEK_TARGET_LABELS[target_metric]} tercapai", f"{solved['achieved'].item():.2f}")
+            elif status == 'met_everywhere':
+                st.info("Target sudah tercapai di seluruh rentang pencarian input ini.")
+            elif status == 'unreachable':
+                st.warning("Target tidak bisa dicapai dengan mengubah input ini saja (mis. melebihi kapasitas digger).")
+            else:
+                st.error("Data equipment/material tidak valid untuk goal seek.")
+            if variable == 'bucket_pass' and status in ('solved', 'met_everywhere'):
+                if solved['truck'].item() is None:
+                    st.caption("Tidak ada truck di katalog yang memenuhi target dengan excavator dan material ini.")
+                else:
+                    st.caption(f"Truck katalog terdekat yang memenuhi target: {solved['truck'].item()} "
+                               f"({solved['truck_capacity'].item():.0f} ton, {solved['truck_bucket_pass'].item():.0f} pass, "
+                               f"{GOAL_SEEK_TARGET_LABELS[target_metric]} {solved['truck_achieved'].item():.2f}).")
+            st.caption("Input lain tetap sesuai sidebar; hasil adalah batas daerah di mana target masih terpenuhi.")
+
+        st.markdown("**Jarak break-even seluruh katalog**")
+        be_col1, be_col2 = st.columns(2)
+        be_target = be_col1.number_input("Target produksi (ton/h):", min_value=1.0, value=1500.0, step=50.0)
+        be_max_trucks = be_col2.number_input("Jumlah truck maksimum:", min_value=1, max_value=100, value=20,
+                                             key="be_max_trucks")
+        if st.button("▶️ Hitung Jarak Break-Even"):
+            df_be = run_break_even_distances(
+                job_condition, reposition_time, truck_data['speed_loaded'], truck_data['speed_empty'],
+                int(be_max_trucks), float(be_target), 'productivity_tons'
+            )
+            st.caption(f"{len(df_be):,} fleet mencapai {be_target:,.0f} ton/h; jarak angkut terjauh yang masih "
+                       f"memenuhi target (maks. 100 km)")
+            st.dataframe(df_be.head(200), use_container_width=True)
+
+
+@st.cache_data(max_entries=16)
+def run_cost_frontier(selected_material, haul_distance, max_trucks, job_condition, reposition_time, speed_loaded,
+                      speed_empty, excavator_rate, truck_rate, mf_band):
+    # Biaya katalog dipakai bila ada; model tanpa biaya memakai tarif per kapasitas
+    excavator_costs = catalog_hourly_costs(EXCAVATOR_TABLE, default=EXCAVATOR_TABLE['bucket_capacity'] * excavator_rate)
+    truck_costs = catalog_hourly_costs(TRUCK_TABLE, default=TRUCK_TABLE['capacity'] * truck_rate)
+    return cost_pareto_frontier(
+        EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE.loc[[selected_material]], [haul_distance],
+        np.arange(1, max_trucks + 1), job_conditions=[job_condition], reposition_time=reposition_time,
+        speed_loaded=speed_loaded, speed_empty=speed_empty, excavator_costs=excavator_costs,
+        truck_costs=truck_costs, mf_min=mf_band[0], mf_max=mf_band[1]
+    )
+
+
+@st.cache_data(max_entries=64)
+def build_cost_frontier_figure(frontier, current, theme):
+    """Scatter frontier Pareto: biaya per BCM vs produktivitas, warna = deviasi MF"""
+    fig = px.scatter(
+        frontier, x='Cost_per_BCM', y='Total_Fleet_Productivity_BCM', color='MF_Deviation',
+        hover_data=['Excavator', 'Truck', 'Num_Trucks', 'Match_Factor'],
+        color_continuous_scale='Viridis_r',
+        labels={'Cost_per_BCM': 'Biaya per BCM', 'Total_Fleet_Productivity_BCM': 'Produktivitas Fleet (BCM/h)',
+                'MF_Deviation': '|MF - 1|'},
+        title='Pareto Frontier: Biaya per BCM vs Produktivitas'
+    )
+    if current is not None:
+        fig.add_trace(go.Scatter(x=[current[0]], y=[current[1]], mode='markers', name='Skenario saat ini',
+                                 marker=dict(symbol='star', size=16, color='#EF4444')))
+    fig.update_layout(
+        height=480,
+        margin=dict(l=40, r=40, t=50, b=40),
+        paper_bgcolor=theme['paper_bg'],
+        plot_bgcolor=theme['plot_bg'],
+        font=dict(color=theme['font_color'], size=12),
+        title_font=dict(color=theme['title_color'], size=14),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+    )
+    return fig
+
+
+# Fragment: tarif biaya dan frontier tidak memicu rerun seluruh halaman
+@st.fragment
+def render_cost_frontier(selected_excavator, selected_truck, selected_material, scenario, haul_distance, num_trucks,
+                         job_condition, reposition_time, speed_loaded, speed_empty, theme):
+    """Biaya per BCM/ton skenario terpilih dan Pareto frontier seluruh katalog"""
+    with st.expander("💰 Biaya per BCM & Pareto Frontier"):
+        cost_col1, cost_col2, cost_col3 = st.columns(3)
+        excavator_rate = cost_col1.number_input("Tarif excavator (biaya/jam per m³ bucket):", min_value=0.0,
+                                                value=25.0, step=1.0)
+        truck_rate = cost_col2.number_input("Tarif truck (biaya/jam per ton payload):", min_value=0.0,
+                                            value=1.5, step=0.1)
+        max_trucks = cost_col3.number_input("Jumlah truck maksimum:", min_value=1, max_value=200, value=40,
+                                            key="cost_max_trucks")
+        only_optimal = st.checkbox("Hanya MF 1.0-1.2", value=False)
+        with_cost = int(EXCAVATOR_TABLE['hourly_cost'].notna().sum() + TRUCK_TABLE['hourly_cost'].notna().sum())
+        st.caption(f"{with_cost} model punya biaya per jam di katalog; model lain memakai tarif per kapasitas di atas.")
+
+        excavator_cost = catalog_hourly_costs(
+            EXCAVATOR_TABLE.loc[[selected_excavator]],
+            default=EXCAVATOR_TABLE.loc[[selected_excavator], 'bucket_capacity'] * excavator_rate
+        ).iloc[0]
+        truck_cost = catalog_hourly_costs(
+            TRUCK_TABLE.loc[[selected_truck]], default=TRUCK_TABLE.loc[[selected_truck], 'capacity'] * truck_rate
+        ).iloc[0]
+        result = scenario['result']
+        costs = fleet_cost_batch(excavator_cost, truck_cost, num_trucks, result['productivity'],
+                                 result['productivity_tons'])
+        res_col1, res_col2, res_col3 = st.columns(3)
+        res_col1.metric("Biaya Fleet / Jam", f"{float(costs['fleet_cost']):,.0f}")
+        res_col2.metric("Biaya per BCM", f"{float(costs['cost_per_bcm']):,.2f}")
+        res_col3.metric("Biaya per Ton", f"{float(costs['cost_per_ton']):,.2f}")
+
+        # Sweep seluruh katalog + frontier hanya dihitung setelah diaktifkan
+        if not st.toggle("Tampilkan Pareto frontier", value=False, key="frontier_enabled"):
+            return
+        frontier = run_cost_frontier(
+            selected_material, haul_distance, int(max_trucks), job_condition, reposition_time, speed_loaded,
+            speed_empty, excavator_rate, truck_rate, (1.0, 1.2) if only_optimal else (None, None)
+        )
+        if frontier.empty:
+            st.warning("Tidak ada fleet dengan biaya dan produktivitas yang valid.")
+            return
+        current = (float(costs['cost_per_bcm']), float(result['productivity']))
+        st.plotly_chart(build_cost_frontier_figure(frontier, current, theme), use_container_width=True)
+        st.caption(f"{len(frontier)} fleet non-dominated dari {frontier.attrs['evaluated']:,} konfigurasi "
+                   f"(material {selected_material}, jarak {haul_distance} km): tidak ada fleet lain yang lebih murah "
+                   f"per BCM, lebih produktif, dan MF lebih dekat ke 1 sekaligus.")
+        st.dataframe(frontier[['Excavator', 'Truck', 'Num_Trucks', 'Match_Factor', 'Total_Fleet_Productivity_BCM',
+                               'Fleet_Cost_per_Hour', 'Cost_per_BCM', 'Cost_per_Ton']],
+                     use_container_width=True)
+
+
+@st.cache_data(max_entries=64)
+def run_queue_simulation(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                         reposition_time, num_loaders, shift_hours, replications, seed):
+    # Inline (tanpa process pool): ratusan shift tetap selesai < 1 detik di server dashboard
+    return simulate_fleet(
+        excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time,
+        num_loaders=num_loaders, shift_hours=shift_hours, replications=replications, seed=seed, max_workers=1
+    )
+
+
+# Fragment: simulasi antrian dijalankan ulang sendiri, tidak seluruh halaman
+@st.fragment
+def render_queue_simulation(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time):
+    """Simulasi diskrit antrian truck di loader: waktu antri, utilisasi loader, ton/jam"""
+    with st.expander("🚚 Simulasi Antrian Loader (Discrete-Event)"):
+        des_col1, des_col2, des_col3 = st.columns(3)
+        num_loaders = des_col1.number_input("Jumlah loader:", min_value=1, max_value=20, value=1)
+        shift_hours = des_col2.number_input("Durasi shift (jam):", min_value=1.0, max_value=24.0, value=12.0, step=0.5)
+        replications = des_col3.number_input("Replikasi:", min_value=10, max_value=2000, value=200, step=10)
+        if st.button("▶️ Jalankan Simulasi Antrian"):
+            des = run_queue_simulation(
+                excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                reposition_time, int(num_loaders), float(shift_hours), int(replications), 42
+            )
+            summary = des['summary']
+            res_col1, res_col2, res_col3 = st.columns(3)
+            res_col1.metric("Waktu Antri / Muatan", f"{summary.loc['queue_time_min', 'mean']:.1f} min",
+                            help=f"CI 95%: {summary.loc['queue_time_min', 'ci_low']:.2f} - {summary.loc['queue_time_min', 'ci_high']:.2f} min")
+            res_col2.metric("Utilisasi Loader", f"{summary.loc['loader_utilisation', 'mean']*100:.1f}%",
+                            help=f"CI 95%: {summary.loc['loader_utilisation', 'ci_low']*100:.1f}% - {summary.loc['loader_utilisation', 'ci_high']*100:.1f}%")
+            res_col3.metric("Produksi Aktual", f"{summary.loc['tonnes_per_hour', 'mean']:.0f} ton/h",
+                            help=f"CI 95%: {summary.loc['tonnes_per_hour', 'ci_low']:.0f} - {summary.loc['tonnes_per_hour', 'ci_high']:.0f} ton/h")
+            st.dataframe(summary.style.format('{:.3f}'), use_container_width=True)
+            st.caption(f"{int(replications)} replikasi shift independen, interval kepercayaan 95%")
+
+
+# Fragment: pencarian kombinasi fleet campuran berjalan sendiri, tidak seluruh halaman
+@st.fragment
+def render_mixed_fleet(selected_excavator, selected_truck, material_data, haul_distance, job_condition,
+                       reposition_time, speed_loaded, speed_empty):
+    """Cari kombinasi loader + truck campuran termurah untuk target produksi"""
+    with st.expander("🧩 Mixed Fleet: Cari Kombinasi Loader + Truck"):
+        mix_col1, mix_col2 = st.columns(2)
+        with mix_col1:
+            mix_loaders = st.multiselect("Tipe loader:", list(EXCAVATORS.keys()), default=[selected_excavator])
+            max_loaders = st.number_input("Jumlah loader maksimum:", min_value=1, max_value=6, value=2)
+            target = st.number_input("Target produksi (BCM/h):", min_value=1.0, value=500.0, step=50.0)
+        with mix_col2:
+            mix_trucks = st.multiselect("Tipe truck:", list(TRUCKS.keys()), default=[selected_truck])
+            max_trucks = st.number_input("Jumlah truck maksimum:", min_value=1, max_value=200, value=40)
+            mix_top_n = st.number_input("Top-N kombinasi:", min_value=1, max_value=50, value=5)
+        if st.button("▶️ Cari Kombinasi Fleet") and mix_loaders and mix_trucks:
+            df_mix = search_fleet_mix(
+                EXCAVATOR_TABLE.loc[mix_loaders], TRUCK_TABLE.loc[mix_trucks], material_data, haul_distance, target,
+                max_loaders=int(max_loaders), max_trucks=int(max_trucks), job_condition=job_condition,
+                reposition_time=reposition_time, speed_loaded=speed_loaded, speed_empty=speed_empty,
+                top_n=int(mix_top_n)
+            )
+            if df_mix.empty:
+                st.warning("Tidak ada kombinasi yang mencapai target dengan MF ≤ 1.2 dan batas unit yang dipilih.")
+            else:
+                st.dataframe(df_mix, use_container_width=True)
+            st.caption(f"{df_mix.attrs['nodes_explored']:,} node dievaluasi (branch and bound)")
+
+
+# Fragment: slider/tombol sweep katalog tidak memicu rerun seluruh halaman
+@st.fragment
+def render_catalog_sweep(job_condition, reposition_time, speed_loaded, speed_empty):
+    """Sweep seluruh katalog: semua kombinasi excavator x truck x material"""
+    with st.expander("🔍 Sweep Seluruh Katalog (MF Optimal 1.0-1.2)"):
+        sweep_col1, sweep_col2 = st.columns(2)
+        with sweep_col1:
+            sweep_distances = st.slider("Rentang Jarak Angkut (km):", 0.5, 15.0, (0.5, 15.0), step=0.5)
+            sweep_max_trucks = st.number_input("Jumlah truck maksimum:", min_value=1, max_value=200, value=20)
+        with sweep_col2:
+            sweep_conditions = st.multiselect("Kondisi Kerja:", list(JOB_EFFICIENCY.keys()), default=[job_condition])
+            sweep_top_n = st.number_input("Top-N fleet:", min_value=1, max_value=1000, value=50)
+        if st.button("▶️ Jalankan Sweep Katalog") and sweep_conditions:
+            df_sweep = sweep_equipment_catalog(
+                EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE,
+                np.arange(sweep_distances[0], sweep_distances[1] + 0.25, 0.5),
+                np.arange(1, int(sweep_max_trucks) + 1),
+                job_conditions=sweep_conditions,
+                reposition_time=reposition_time,
+                speed_loaded=speed_loaded,
+                speed_empty=speed_empty,
+                top_n=int(sweep_top_n)
+            )
+            st.caption(f"{len(df_sweep)} fleet feasible teratas berdasarkan produktivitas (BCM/h)")
+            st.dataframe(df_sweep, use_container_width=True)
+
 
-    # Match Factor calculation - FORMULA BARU
-    match_factor = (num_trucks * loading_cycle_truck_hours) / total_cycle_time
+# Satu monitor per sumber feed untuk semua sesi; dashboard membaca snapshot di memori.
+# Kunci cache hanya (file, port): jendela diubah lewat set_window, bukan dengan bind ulang port yang sama.
+# Gagal start (mis. port dipakai) tidak di-cache, jadi toggle berikutnya mencoba lagi.
+@st.cache_resource
+def get_live_monitor(feed_path, port):
+    return start_background_monitor(feed_path or None, port or None)
+
+@st.fragment(run_every=2)
+def render_live_snapshot(monitor):
+    """Tabel MF live per loader, diperbarui tiap 2 detik"""
+    if monitor.error is not None:
+        st.error(f"Feed monitor berhenti: {monitor.error}")
+    snapshot = monitor.snapshot()
+    stats = monitor.stats()
+    if snapshot.empty:
+        st.info("Belum ada event load dari feed.")
+        return
+    minute_columns = [col for col in snapshot.columns if col.endswith('_time')]
+    snapshot[minute_columns] = snapshot[minute_columns] * 60  # jam ke menit
+    st.dataframe(snapshot.round(2), use_container_width=True)
+    st.caption(f"{stats['accepted']:,} event diterima, {stats['rejected']:,} ditolak; waktu dalam menit, "
+               f"rata-rata dalam jendela {monitor.window_seconds / 60:.0f} menit terakhir")
+
+
+# Fragment: pengaturan monitor live tidak memicu rerun seluruh halaman
+@st.fragment
+def render_live_monitor(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time):
+    """Match factor live per loader dari feed event dispatch (arrive/load/dump)"""
+    with st.expander("📡 Monitor Match Factor Live"):
+        live_col1, live_col2, live_col3 = st.columns(3)
+        feed_path = live_col1.text_input("File log event:", value="", help="Baris JSON atau CSV: ts,event,truck,loader")
+        port = live_col2.number_input("Port TCP lokal (0 = nonaktif):", min_value=0, max_value=65535, value=0)
+        window_minutes = live_col3.number_input("Jendela (menit):", min_value=5, max_value=720, value=60, step=5)
+        if not st.toggle("Aktifkan monitor", value=False):
+            return
+        if not feed_path and not port:
+            st.warning("Isi file log atau port feed terlebih dahulu.")
+            return
+        try:
+            monitor = get_live_monitor(feed_path.strip(), int(port))
+        except OSError as exc:
+            st.error(f"Monitor gagal dimulai: {exc}")
+            return
+        monitor.set_window(float(window_minutes) * 60.0)
+        # Rencana = skenario sidebar saat ini, untuk kolom deviasi MF
+        monitor.set_plan(excavator_data, truck_data, material_data, haul_distance, num_trucks,
+                         job_condition, reposition_time)
+        render_live_snapshot(monitor)
+
+
+# Fragment: tabel katalog tidak ikut dirender ulang oleh interaksi di bagian lain
+@st.fragment
+def render_database_tabs():
+    """Tabel katalog equipment"""
+    col1, col2 = st.columns([1,35])  # Kolom untuk ikon dan teks, sesuaikan rasio jika perlu
+    with col1:
+        st.image('data-mining.svg', width=35)
+    with col2:
+        st.subheader("Ringkasan Equipment Database")
+    tab1, tab2, tab3 = st.tabs(["Excavators", "Trucks", "Materials"])
     
-    # Productivity calculation - PERBAIKAN
-    truck_efficiency = truck_data.get('efficiency', 0.92)  # Tambahkan truck efficiency
-    truck_productivity_tons_per_hour = (truck_data['capacity'] * truck_efficiency * job_efficiency) / total_cycle_time
-    truck_productivity_bcm_per_hour = truck_productivity_tons_per_hour / material_data['density_bank']
-    # Produktivitas total fleet (num_trucks * produktivitas per truck)
-    total_fleet_productivity_tons = num_trucks * truck_productivity_tons_per_hour
-    total_fleet_productivity_bcm = num_trucks * truck_productivity_bcm_per_hour
+    with tab1:
+        st.dataframe(EXCAVATOR_TABLE, use_container_width=True)
     
-    # Hitung produktivitas digger maksimal (sama dengan yang ditampilkan di sidebar)
-    digger_max_productivity_bcm = (
-        excavator_data['bucket_capacity']
-        * material_data['fill_factor']
-        * material_data['swell_factor']
-        * excavator_data['efficiency']
-        * job_efficiency
-    ) * (3600 / excavator_data['cycle_time'])
-    digger_max_productivity_tons = digger_max_productivity_bcm * material_data['density_bank']
+    with tab2:
+        st.dataframe(TRUCK_TABLE, use_container_width=True)
     
-    # Batasi produktivitas total fleet agar tidak melebihi kemampuan digger
-    if total_fleet_productivity_bcm > digger_max_productivity_bcm:
-        total_fleet_productivity_bcm = digger_max_productivity_bcm
-        total_fleet_productivity_tons = digger_max_productivity_tons
-    # Jika kurang, gunakan formula sebenarnya (tidak perlu else karena sudah dihitung di atas)
-    if 1.0 <= match_factor <= 1.2:
-        efficiency_status = "Optimal"
-        status_color = "🟢"
-    elif match_factor < 1.0:
-        efficiency_status = "Under-truck"
-        status_color = "🔴"
+    with tab3:
+        st.dataframe(MATERIAL_TABLE, use_container_width=True)
+
+
+# Dataset export besar dari dashboard (grid lebih besar lewat match_factor_export.py)
+EXPORT_DATASETS = ("Grid jarak × truck (fleet terpilih)", "Sweep seluruh katalog", "Sampel Monte Carlo")
+
+# File export sesi ditulis ke direktori khusus yang dibersihkan setiap kali export baru dibuat:
+# file lebih tua dari batas umur dihapus, lalu file tertua sampai total ukuran di bawah batas
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'match_factor_exports')
+EXPORT_MAX_AGE_SECONDS = 3600
+EXPORT_MAX_TOTAL_BYTES = 2 * 1024 ** 3
+
+def purge_export_dir(directory=EXPORT_DIR, max_age=EXPORT_MAX_AGE_SECONDS, max_total_bytes=EXPORT_MAX_TOTAL_BYTES,
+                     now=None):
+    """Hapus file export basi dari directory; kembalikan jumlah file yang dihapus"""
+    now = time.time() if now is None else now
+    try:
+        entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                         for entry in os.scandir(directory) if entry.is_file())
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:  # tertua dulu
+        if now - mtime <= max_age and total <= max_total_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # sudah dihapus sesi lain
+        total -= size
+        removed += 1
+    return removed
+
+def analysis_export_frame(df_trucks, selected_excavator, selected_truck, selected_material, haul_distance, job_condition):
+    """Tabel analisis 1..N truck untuk skenario aktif (format export lama)"""
+    return pd.DataFrame({
+        'Excavator': selected_excavator,
+        'Truck': selected_truck,
+        'Material': selected_material,
+        'Haul_Distance_km': haul_distance,
+        'Job_Condition': job_condition,
+        'Num_Trucks': df_trucks['trucks'],
+        'Match_Factor': df_trucks['match_factor'],
+        'Total_Fleet_Productivity_BCM': df_trucks['productivity'],
+        'Total_Fleet_Productivity_Tons': df_trucks['productivity_tons'],
+        'Per_Truck_Productivity_BCM': df_trucks['productivity_per_truck_bcm'],
+        'Per_Truck_Productivity_Tons': df_trucks['productivity_per_truck_tons'],
+        'Efficiency_Status': df_trucks['status'],
+        'MF_Difference_from_Optimal': df_trucks['mf_diff'],
+    })
+
+def write_large_export(dataset, fmt, selected_excavator, selected_truck, selected_material, excavator_data,
+                       truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time,
+                       distance_step, max_trucks, n_draws):
+    """Tulis dataset besar ke file sementara per row group; hanya satu chunk di memori.
+
+    Kecepatan truck dari sidebar (truck_data) dipakai di semua dataset, sama seperti angka di layar.
+    """
+    if dataset == EXPORT_DATASETS[2]:
+        chunks = iter_monte_carlo_draws(
+            excavator_data, truck_data, material_data, haul_distance, num_trucks,
+            job_condition, reposition_time, n_draws=n_draws
+        )
     else:
-        efficiency_status = "Over-truck"
-        status_color = "🟡"
-    
-    return {
-        'match_factor': match_factor,
-        'productivity': total_fleet_productivity_bcm,  # Total fleet BCM/h
-        'productivity_tons': total_fleet_productivity_tons,  # Total fleet ton/h
-        'productivity_per_truck_bcm': truck_productivity_bcm_per_hour,  # Per truck BCM/h
-        'productivity_per_truck_tons': truck_productivity_tons_per_hour,  # Per truck ton/h
-        'efficiency_status': efficiency_status,
-        'status_color': status_color,
-        'loading_time': loading_cycle_truck_hours,  # Ganti nama untuk konsistensi
-        'loading_cycle_truck': loading_cycle_truck_hours,  # Tambah key baru
-        'total_cycle_time': total_cycle_time,
-        'job_efficiency': job_efficiency
-    }
+        if dataset == EXPORT_DATASETS[0]:
+            tables = (EXCAVATOR_TABLE.loc[[selected_excavator]], TRUCK_TABLE.loc[[selected_truck]],
+                      MATERIAL_TABLE.loc[[selected_material]])
+        else:
+            tables = (EXCAVATOR_TABLE, TRUCK_TABLE, MATERIAL_TABLE)
+        chunks = iter_catalog_sweep(
+            *tables, distance_sweep(distance_step), np.arange(1, max_trucks + 1),
+            job_conditions=(job_condition,), reposition_time=reposition_time,
+            speed_loaded=truck_data['speed_loaded'], speed_empty=truck_data['speed_empty']
+        )
+    extension, mime = EXPORT_FORMATS[fmt]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    purge_export_dir()
+    fd, path = tempfile.mkstemp(prefix='match_factor_export_', suffix=extension, dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        result = export_chunks(chunks, path, fmt)
+    except Exception:
+        os.remove(path)
+        raise
+    return {'path': path, 'mime': mime, 'extension': extension, 'rows': result['rows'],
+            'size': os.path.getsize(path)}
 
-# Tambahkan fungsi untuk menghitung jumlah truck optimal yang menghasilkan MF=1.0
-def calculate_optimal_trucks_for_mf1(excavator_data, truck_data, material_data, haul_distance, job_condition='Average', reposition_time=20):
-    """Calculate optimal number of trucks for Match Factor = 1.0"""
-    
-    # Get job efficiency factor
-    job_efficiency = JOB_EFFICIENCY.get(job_condition, 0.75)
-    
-    # Hitung Bucket Pass
-    vessel_truck_capacity_ton = truck_data['capacity']
-    ff = material_data['fill_factor']
-    bucket_cap_m3 = excavator_data['bucket_capacity']
-    density_loose = material_data['density_loose']
-    bucket_pass_calc = (vessel_truck_capacity_ton * ff) / (ff * bucket_cap_m3 * density_loose)
-    bucket_pass = int(np.ceil(bucket_pass_calc))
-    
-    # Hitung Loading Cycle Truck (dalam jam)
-    loading_cycle_truck_hours = (
-        ((excavator_data['cycle_time'] * bucket_pass) + reposition_time) / max(excavator_data['efficiency'], 1e-6)
-    ) / 3600.0
+
+# Fragment: export disiapkan dan diunduh tanpa rerun seluruh halaman
+@st.fragment
+def render_export(df_trucks, selected_excavator, selected_truck, selected_material, excavator_data, truck_data,
+                  material_data, haul_distance, num_trucks, job_condition, reposition_time):
+    """Export data analisis (CSV langsung) dan dataset besar (Parquet/Arrow/CSV gzip)"""
+    st.subheader("💾 Export Data")
+
+    # Tabel kecil: file langsung tersedia, klik download tidak memicu rerun
+    export_df = analysis_export_frame(df_trucks, selected_excavator, selected_truck, selected_material,
+                                      haul_distance, job_condition)
+    st.download_button(
+        label="📥 Download Analysis Data (CSV)",
+        data=export_df.to_csv(index=False),
+        file_name=f"match_factor_analysis_{selected_excavator.replace(' ', '_')}_{selected_truck.replace(' ', '_')}.csv",
+        mime="text/csv",
+        on_click="ignore",
+    )
+
+    with st.expander("📦 Export Dataset Besar (Parquet / Arrow / CSV gzip)"):
+        exp_col1, exp_col2, exp_col3 = st.columns(3)
+        dataset = exp_col1.selectbox("Dataset:", EXPORT_DATASETS)
+        fmt = exp_col2.selectbox("Format:", list(EXPORT_FORMATS))
+        if dataset == EXPORT_DATASETS[2]:
+            n_draws = exp_col3.select_slider("Jumlah sampel:", options=[10**5, 10**6, 10**7], value=10**6,
+                                             format_func=lambda n: f"{n:,}", key="export_draws")
+            distance_step, max_trucks = 0.5, 20
+        else:
+            n_draws = 0
+            distance_step = exp_col3.select_slider("Resolusi jarak (km):", options=[0.01, 0.05, 0.1, 0.5], value=0.5)
+            max_trucks = exp_col3.number_input("Jumlah truck maksimum:", min_value=1, max_value=200, value=20,
+                                               key="export_max_trucks")
+        if st.button("⚙️ Siapkan File Export"):
+            previous = st.session_state.pop('large_export', None)
+            if previous and os.path.exists(previous['path']):
+                os.remove(previous['path'])
+            with st.spinner("Menulis file export..."):
+                st.session_state['large_export'] = write_large_export(
+                    dataset, fmt, selected_excavator, selected_truck, selected_material, excavator_data,
+                    truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time,
+                    distance_step, int(max_trucks), int(n_draws)
+                )
+        export = st.session_state.get('large_export')
+        if export and os.path.exists(export['path']):
+            with open(export['path'], 'rb') as fh:
+                st.download_button(
+                    label=f"📄 Download {export['rows']:,} baris ({export['size'] / 1e6:.1f} MB)",
+                    data=fh,
+                    file_name=f"match_factor_export{export['extension']}",
+                    mime=export['mime'],
+                    on_click="ignore",
+                )
+            st.caption("File ditulis per row group ke disk; untuk puluhan juta baris gunakan "
+                       "`python match_factor_export.py`.")
+        elif export:
+            st.caption(f"File export sudah dibersihkan (batas {EXPORT_MAX_AGE_SECONDS // 60} menit); siapkan ulang.")
+
+
+# Fragment: grafik breakdown cycle time terisolasi dari interaksi di bagian lain
+@st.fragment
+def render_cycle_time_breakdown(scenario, truck_data, haul_distance, reposition_time, theme):
+    """Breakdown komponen cycle time (bar dan polar chart)"""
+    loading_cycle_truck_min = scenario['loading_cycle_truck_min']
+
+    st.markdown("### ⏱️ Cycle Time Breakdown")
     
-    # Travel times (convert to hours)
-    travel_time_loaded = haul_distance / truck_data['speed_loaded']
-    travel_time_empty = haul_distance / truck_data['speed_empty']
+    # Gunakan variabel dari sidebar untuk konsistensi
+    # Asumsikan travel_time_loaded, travel_time_empty sudah didefinisikan dalam menit di sidebar
+    # Jika tidak, definisikan ulang:
+    travel_time_loaded = (haul_distance / truck_data['speed_loaded']) * 60  # menit, sama seperti card
+    travel_time_empty = (haul_distance / truck_data['speed_empty']) * 60    # menit
+    dumping_time = 1.4  # menit, sinkron dengan calculate_match_factor
+    maneuver_time = 0.7  # menit (spotting/maneuver), sinkron
+    loading_time_min = loading_cycle_truck_min  
+    reposition_time_min = reposition_time / 60  # tambahkan ini
     
-    # Total cycle time (hours)
-    dumping_time = 1.4 / 60
-    spotting_time = 0.7 / 60
-    total_cycle_time = loading_cycle_truck_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
+    total_cycle_time_min = loading_time_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time + reposition_time_min
     
-    # Untuk MF = 1.0: num_trucks = total_cycle_time / loading_cycle_truck_hours
-    optimal_trucks = total_cycle_time / loading_cycle_truck_hours
+    df_times = pd.DataFrame({
+        'component': [
+            'Loading Time',
+            'Travel Time (Loaded)',
+            'Dumping Time',
+            'Travel Time (Empty)',
+            'Maneuver/Spotting',
+            'Reposition Time'  # tambahkan ini
+        ],
+        'minutes': [
+            loading_time_min,
+            travel_time_loaded,
+            dumping_time,
+            travel_time_empty,
+            maneuver_time,
+            reposition_time_min
+        ]
+    })
+    df_times['percent'] = (df_times['minutes'] / total_cycle_time_min) * 100
     
-    return optimal_trucks
+    fig3, fig4 = build_cycle_time_figures(df_times, theme)
+    bottom_col1, bottom_col2 = st.columns(2)
+    with bottom_col1:
+        st.plotly_chart(fig3, use_container_width=True)
+    with bottom_col2:
+        st.plotly_chart(fig4, use_container_width=True)
+
 
 def main():
     st.title("⚡ Match Factor Calculator")
@@ -388,6 +1579,8 @@ def main():
         step=1
     )
     
+    render_truck_recommender(selected_excavator, selected_truck, selected_material)
+
     # Get selected equipment data
     excavator_data = EXCAVATORS[selected_excavator]
     truck_data = TRUCKS[selected_truck].copy()  # Make a copy to modify speeds
@@ -397,610 +1590,65 @@ def main():
     truck_data['speed_loaded'] = SPEED_OPTIONS[selected_speed_loaded]
     truck_data['speed_empty'] = SPEED_OPTIONS[selected_speed_empty]
     
-    # Calculate match factor
-    result = calculate_match_factor(
+    # Hitung skenario lewat memo LRU bersama (hasil dipakai ulang antar rerun dan antar sesi)
+    memo = get_scenario_memo()
+    key = scenario_key(
+        selected_excavator, selected_truck, selected_material,
+        truck_data['speed_loaded'], truck_data['speed_empty'],
+        haul_distance, num_trucks, job_condition, reposition_time,
+    )
+    scenario = memo.get_or_compute(key, lambda: compute_dashboard_scenario(
         excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time
+    ))
+
+    memo_stats = memo.stats()
+    st.sidebar.caption(
+        f"Cache skenario: {memo_stats['hits']} hit / {memo_stats['misses']} miss "
+        f"({memo_stats['hit_rate']*100:.0f}%), {memo_stats['size']}/{memo_stats['maxsize']} entri"
     )
     
-    # Calculate system productivity (affected by operational parameters)
-    # This should be the bottleneck productivity between excavator and truck system
-    truck_volume_bcm = truck_data['capacity'] / material_data['density_bank']
-    loading_time_hours = (truck_volume_bcm / excavator_data['bucket_capacity'] * excavator_data['cycle_time']) / 3600
-    loading_time_hours = loading_time_hours / result['job_efficiency']  # Apply job efficiency
-    
-    # Calculate truck cycle time
-    travel_time_loaded = haul_distance / truck_data['speed_loaded']
-    travel_time_empty = haul_distance / truck_data['speed_empty']
-    dumping_time = 2.0 / 60  # 2 minutes
-    spotting_time = 1.0 / 60  # 1 minute
-    total_truck_cycle = loading_time_hours + travel_time_loaded + dumping_time + travel_time_empty + spotting_time
-    
-    # System productivity is limited by the bottleneck (gunakan formula digger sesuai permintaan)
-    excavator_prod_bcm = (
-        excavator_data['bucket_capacity']
-        * material_data['fill_factor']
-        * material_data['swell_factor']
-        * excavator_data['efficiency']
-        * result['job_efficiency']
-    ) * (3600 / excavator_data['cycle_time'])
-    excavator_prod_ton = excavator_prod_bcm * material_data['density_bank']
-    
-    # Use excavator maximum productivity for sidebar display
-    system_prod_bcm = excavator_prod_bcm  # Show digger maximum capacity
-    system_prod_ton = excavator_prod_ton  # Show digger maximum capacity in tons
-    truck_system_prod = (truck_volume_bcm * num_trucks) / total_truck_cycle
-    
-    # System productivity is the minimum of excavator and truck system capacity
-    system_productivity_bcm = min(excavator_prod_bcm, truck_system_prod)
-    
+    # Tema grafik ikut parameter input di sidebar (berlaku untuk semua grafik)
+    theme = chart_theme_colors(st.sidebar.selectbox("Theme", ["Light", "Dark"], index=0) == "Dark")
+
     # Create main layout with right sidebar
     main_col, right_sidebar_col = st.columns([3.5, 1])
-    
+
     with main_col:
-        # Main content area
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                label="Match Factor",
-                value=f"{result['match_factor']:.2f}",
-                delta=f"{result['match_factor'] - 1:.2f}" if result['match_factor'] != 1 else None
-            )
-        
-        # Update tampilan card 2 (sekitar baris 400-405)
-        with col2:
-            st.metric(
-                label="📊 Produktivitas Total Fleet",
-                value=f"{result['productivity']:.0f} BCM/h",
-                delta=f"{result['productivity_tons']:.0f} ton/h"
-            )
-            
-            # Perbaiki caption untuk menampilkan per truck
-            st.caption(f"Per truck: {result['productivity_per_truck_bcm']:.0f} BCM/h ({result['productivity_per_truck_tons']:.0f} ton/h)")
-            st.caption(f"Jumlah truck: {num_trucks} unit")
-        
-        with col3:
-            # Create abbreviated status for display
-            status_abbrev = {
-                "Under-trucked": "Under Truck",
-                "Over-trucked": "Over Truck", 
-                "Optimal": "Optimal"
-            }
-            
-            st.metric(
-                label="Efficiency Status",
-                value=f"{result['status_color']} {status_abbrev.get(result['efficiency_status'], result['efficiency_status'])}"
-            )
-        
-        with col4:
-            st.metric(
-                label="Job Efficiency",
-                value=f"{result['job_efficiency']*100:.0f}%"
-            )
-        
-        # Equipment specifications
-        st.subheader("📊 Spesifikasi Equipment")
-        
-        spec_col1, spec_col2, spec_col3 = st.columns(3)
-        
-        with spec_col1:
-            st.write("**Excavator:**", selected_excavator)
-            st.write(f"• Tipe: {excavator_data['product_type']}")
-            st.write(f"• Kapasitas Bucket: {excavator_data['bucket_capacity']} m³")
-            st.write(f"• Cycle Time: {excavator_data['cycle_time']} detik")
-            st.write(f"• Kondisi Kerja: {job_condition} ({result['job_efficiency']*100:.0f}%)")
-        
-        with spec_col2:
-            st.write("**Truck:**", selected_truck)
-            st.write(f"• Tipe: {truck_data['product_type']}")
-            st.write(f"• Kapasitas: {truck_data['capacity']} ton")
-            st.write(f"• Kecepatan Bermuatan: {truck_data['speed_loaded']} km/h")
-            st.write(f"• Kecepatan Kosong: {truck_data['speed_empty']} km/h")
-        
-        with spec_col3:
-            st.write("**Material:**", selected_material)
-            st.write(f"• Density Bank: {material_data['density_bank']} ton/m³")
-            st.write(f"• Density Loose: {material_data['density_loose']} ton/m³")
-            st.write(f"• Swell Factor: {material_data['swell_factor']:.2f}")
-            st.write(f"• Fill Factor: {material_data['fill_factor']:.2f}")
-        
-        # Analysis section
+        render_core_result(
+            scenario, selected_excavator, selected_truck, selected_material,
+            excavator_data, truck_data, material_data, num_trucks, job_condition
+        )
         st.subheader("📈 Analisis Grafik")
-        
-        # Generate data for analysis
-        truck_range = range(1, 21)
-        distance_range = np.arange(0.5, 15.5, 0.5)
-        
-        # Match Factor vs Number of Trucks
-        mf_data = []
-        for i, trucks in enumerate(truck_range):
-            result_temp = calculate_match_factor(
-                excavator_data, truck_data, material_data, haul_distance, trucks, job_condition, reposition_time
-            )
-            mf_data.append({
-                'trucks': trucks,
-                'match_factor': result_temp['match_factor'],
-                'productivity': result_temp['productivity'],  # Total fleet productivity
-                'productivity_tons': result_temp['productivity_tons'],  # Total fleet tons
-                'productivity_per_truck_bcm': result_temp['productivity_per_truck_bcm'],  # Per truck BCM
-                'productivity_per_truck_tons': result_temp['productivity_per_truck_tons'],  # Per truck tons
-                'status': result_temp['efficiency_status']
-            })
-        
-        df_trucks = pd.DataFrame(mf_data)
-        # Tambahkan kolom mf_diff
-        df_trucks['mf_diff'] = (df_trucks['match_factor'] - 1.0).abs()
-        
-        # Productivity vs Distance
-        prod_data = []
-        for distance in distance_range:
-            result_temp = calculate_match_factor(
-                excavator_data, truck_data, material_data, distance, num_trucks, job_condition
-            )
-            # Ubah ke ton/h untuk kesesuaian dengan label chart
-            productivity_ton = result_temp['productivity'] * material_data['density_bank']
-            prod_data.append({
-                'distance': distance,
-                'match_factor': result_temp['match_factor'],
-                'productivity': productivity_ton,  # Gunakan ton/h
-                'status': result_temp['efficiency_status']
-            })
-        
-        df_distance = pd.DataFrame(prod_data)
-        
-        # Create plots with theme-aware styling
-        fig_col1, fig_col2 = st.columns(2)
-        
-        # Detect theme (you can use session state or user preference)
-        is_dark_mode = st.sidebar.selectbox("Theme", ["Light", "Dark"], index=0) == "Dark"
-        
-        # Set theme-based colors
-        if is_dark_mode:
-            paper_bg = '#1f2937'
-            plot_bg = '#374151'
-            font_color = '#f8fafc'
-            title_color = '#f8fafc'
-        else:
-            paper_bg = '#ffffff'
-            plot_bg = '#f8fafc'
-            font_color = '#111111'
-            title_color = '#111827'
-        
-        with fig_col1:
-            fig1 = px.line(
-                df_trucks,
-                x='trucks',
-                y='match_factor',
-                title='Match Factor vs Jumlah Truck',
-                labels={'trucks': 'Jumlah Truck', 'match_factor': 'Match Factor'},
-                template='plotly_white'
-            )
-            fig1.update_layout(
-                height=400,
-                margin=dict(l=40, r=40, t=40, b=40),
-                paper_bgcolor=paper_bg,
-                plot_bgcolor=plot_bg,
-                font=dict(color=font_color, size=12),
-                title=dict(font=dict(color=title_color, size=14)),
-                xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color)),
-                yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color))
-            )
-            fig1.add_hline(y=1.0, line_dash="dash", line_color="green", annotation_text="Optimal")
-            fig1.add_hline(y=0.8, line_dash="dot", line_color="red", annotation_text="Under-trucked")
-            fig1.add_hline(y=1.2, line_dash="dot", line_color="yellow", annotation_text="Over-trucked")
-            # Tambahkan garis vertikal current agar sama dengan chart 2
-            fig1.add_vline(x=num_trucks, line_dash="dot", line_color="blue", annotation_text="Current")
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig1, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with fig_col2:
-            fig2 = px.line(
-                df_distance,
-                x='distance',
-                y='productivity',
-                title='Produktivitas vs Jarak Angkut',
-                labels={'distance': 'Jarak (km)', 'productivity': 'Produktivitas (ton/h)'},
-                template='plotly_white'
-            )
-            fig2.update_layout(
-                height=400,
-                margin=dict(l=40, r=40, t=40, b=40),
-                paper_bgcolor=paper_bg,
-                plot_bgcolor=plot_bg,
-                font=dict(color=font_color, size=12),
-                title=dict(font=dict(color=title_color, size=14)),
-                xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color)),
-                yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color))
-            )
-            fig2.add_vline(x=haul_distance, line_dash="dot", line_color="blue", annotation_text="Current")
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.plotly_chart(fig2, use_container_width=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+        render_sweep_charts(scenario, num_trucks, haul_distance, theme)
+        render_mf_heatmap(excavator_data, truck_data, material_data, job_condition, reposition_time, theme)
 
-        # Right sidebar - pindahkan ke luar with main_col
-        with right_sidebar_col:
-            # Tambahkan pemilihan tema di sidebar kanan
-            theme_choice = st.selectbox(
-                "Pilih Tema",
-                ["Dark", "Light"],
-                key="right_theme_select"
-            )
-        
-            # Definisikan CSS berdasarkan pilihan tema
-            if theme_choice == "Dark":
-                theme_css = """
-                <style>
-                .stApp {
-                    background-color: #000000;
-                    color: #ffffff;
-                }
-                // ... tambahkan styling dark lainnya ...
-                </style>
-                """
-            else:
-                theme_css = """
-                <style>
-                .stApp {
-                    background-color: #f8fafc;
-                    color: #111827;
-                }
-                // ... tambahkan styling light lainnya ...
-                </style>
-                """
-        
-            st.markdown(theme_css, unsafe_allow_html=True)
-        
-            st.markdown("### 📋 Detail Specs")
-        
-            # Pastikan system_productivity_bcm didefinisikan sebelumnya; jika tidak, hitung ulang di sini
-            # Contoh: system_productivity_bcm = min(excavator_theoretical_prod, truck_system_prod)  # Dari perhitungan sebelumnya
-            
-            system_prod_bcm = system_productivity_bcm  # Asumsikan sudah didefinisikan; jika error, definisikan ulang
-            system_prod_ton = system_prod_bcm * material_data['density_bank']
-
-            
-            # Calculate cycle times in minutes
-            # Calculate cycle times in minutes (sinkronkan dengan calculate_match_factor)
-            reposition_time_min = reposition_time / 60  # Konversi dari detik
-            loading_time_min = result['loading_time'] * 60  # Hilangkan pembagian job_efficiency jika sudah dihitung di fungsi
-            travel_time_loaded = (haul_distance / truck_data['speed_loaded']) * 60
-            travel_time_empty = (haul_distance / truck_data['speed_empty']) * 60
-            dumping_time = result.get('dumping_time', 1.4)  # Ambil dari result jika ada, fallback hardcoded
-            maneuver_time = result.get('spotting_time', 0.7)  # Sinkronkan nama
-            total_cycle_time_min = loading_time_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time + reposition_time_min
-            
-            # Calculate productivities (gunakan nilai dari result untuk sinkronisasi)
-            if 'excavator_prod_bcm' in result:
-                excavator_theoretical_prod_bcm = result['excavator_prod_bcm']
-            else:
-                # Hitung ulang jika tidak ada, sinkron dengan calculate_match_factor
-                excavator_theoretical_prod_bcm = (excavator_data['bucket_capacity'] * 3600 / excavator_data['cycle_time']) * excavator_data['efficiency'] * result['job_efficiency']
-            
-            # Di bagian Machine Hauler Section (sekitar baris 650-670)
-            # Ganti perhitungan di sidebar hauler (sekitar baris 628)
-            # SEBELUM (SALAH):
-            # truck_prod_ton_per_unit = (truck_data['capacity'] * 60)/ total_cycle_time_min * truck_data.get('efficiency', 0.92) * result['job_efficiency']
-            
-            # SESUDAH (BENAR):
-            truck_efficiency = truck_data.get('efficiency', 0.92)
-            # Di bagian sidebar hauler (sekitar baris 632-634)
-            # SEBELUM (TIDAK KONSISTEN):
-            # truck_prod_ton_per_unit = (truck_data['capacity'] * truck_efficiency * result['job_efficiency']) / (total_cycle_time_min / 60)
-            # truck_prod_bcm_per_unit = truck_prod_ton_per_unit / material_data['density_bank']
-            
-            # SESUDAH (KONSISTEN):
-            # Gunakan nilai dari result untuk konsistensi
-            truck_prod_ton_per_unit = result['productivity_per_truck_tons']
-            truck_prod_bcm_per_unit = result['productivity_per_truck_bcm']
-            
-            # Total fleet productivity juga gunakan dari result
-            truck_prod_ton = result['productivity_tons']
-            truck_prod_bcm = result['productivity']
-            
-            # Atau alternatif: gunakan system_productivity_bcm dan konversi ke ton
-            # truck_prod_bcm = system_productivity_bcm  # Sama dengan digger
-            # truck_prod_ton = truck_prod_bcm * material_data['density_bank']
-            
-            # Use system productivity for display (same as col2)
-            system_prod_bcm = system_productivity_bcm  # Use the calculated system productivity
-            system_prod_ton = system_prod_bcm * material_data['density_bank']
-            
-            # Hitung Bucket Pass (sesuai formula yang diminta)
-            vessel_truck_capacity_ton = truck_data['capacity']
-            ff = material_data['fill_factor']
-            bucket_cap_m3 = excavator_data['bucket_capacity']
-            density_loose = material_data['density_loose']
-            bucket_pass_calc = (vessel_truck_capacity_ton * ff) / (ff * bucket_cap_m3 * density_loose)
-            bucket_pass = int(np.ceil(bucket_pass_calc))  # pembulatan ke atas
-            
-            # Hitung Loading Cycle Truck (menit)
-            # Pada bagian perhitungan loading_cycle_truck_min (sekitar baris 636)
-            loading_cycle_truck_min = (
-                ((excavator_data['cycle_time'] * bucket_pass) + reposition_time) / max(excavator_data['efficiency'], 1e-6)
-            ) / 60.0  # konversi ke menit untuk tampilan
-            
-            # Pastikan total_cycle_time_min menggunakan loading_cycle_truck_min
-            total_cycle_time_min = loading_cycle_truck_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time
-            
-            # Update bagian loading_time_min untuk konsistensi (sekitar baris 782)
-            loading_time_min = loading_cycle_truck_min  # Gunakan nilai yang sama
-            st.image("svg/035-crane truck.svg", width=80)  # Sudah ada, pastikan sesuai
-            st.markdown(f"**{selected_excavator[:15]}...**" if len(selected_excavator) > 15 else f"**{selected_excavator}**")
-            
-            st.markdown(
-                f"""
-                <div class="detail-card-digger">
-                    <table style="width:100%; border-collapse:collapse;">
-                        <thead>
-                            <tr>
-                                <th style="text-align:left; padding:4px 6px;">Description</th>
-                                <th style="text-align:left; padding:4px 6px;">Value</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            <tr><td style="padding:4px 6px;">Bucket</td><td style="padding:4px 6px;">{excavator_data['bucket_capacity']} m³</td></tr>
-                            <tr><td style="padding:4px 6px;">Material</td><td style="padding:4px 6px;">{selected_material[:12]}...</td></tr>
-                            <tr><td style="padding:4px 6px;">Density Bcm</td><td style="padding:4px 6px;">{material_data['density_bank']:.2f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Density Lcm</td><td style="padding:4px 6px;">{material_data['density_loose']:.2f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Swell Factor</td><td style="padding:4px 6px;">{material_data['swell_factor']:.2f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Fill Factor</td><td style="padding:4px 6px;">{material_data['fill_factor']:.2f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Bucket Pass</td><td style="padding:4px 6px;">{bucket_pass} pass</td></tr>
-                            <tr><td style="padding:4px 6px;">Cycle Time</td><td style="padding:4px 6px;">{excavator_data['cycle_time']:.0f}s</td></tr>
-                            <tr><td style="padding:4px 6px;">Operator Eff</td><td style="padding:4px 6px;">{excavator_data['efficiency']*100:.0f}%</td></tr>
-                            <tr><td style="padding:4px 6px;">Job Condition</td><td style="padding:4px 6px;">{job_condition}</td></tr>
-                            <tr><td style="padding:4px 6px;">Reposition Time</td><td style="padding:4px 6px;">{reposition_time:.0f} s</td></tr>
-                            <tr><td style="padding:4px 6px;">Productivity (bcm/h)</td><td style="padding:4px 6px;">{system_prod_bcm:.0f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Productivity (ton/h)</td><td style="padding:4px 6px;">{system_prod_ton:.0f}</td></tr>
-                        </tbody>
-                    </table>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-            
-            # Machine Hauler Section
-            st.image('mining-truck.svg', width=80)
-            st.markdown(f"**{selected_truck[:15]}...**" if len(selected_truck) > 15 else f"**{selected_truck}**")
-            
-            st.markdown(
-                f"""
-                <div class="detail-card-hauler">
-                    <table style="width:100%; border-collapse:collapse;">
-                        <thead>
-                            <tr>
-                                <th style="text-align:left; padding:4px 6px;">Description</th>
-                                <th style="text-align:left; padding:4px 6px;">Value</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            <tr><td style="padding:4px 6px;">Model</td><td style="padding:4px 6px;">{selected_truck}</td></tr>
-                            <tr><td style="padding:4px 6px;">Capacity</td><td style="padding:4px 6px;">{truck_data['capacity']} ton</td></tr>
-                            <tr><td style="padding:4px 6px;">Distance</td><td style="padding:4px 6px;">{haul_distance} km</td></tr>
-                            <tr><td style="padding:4px 6px;">Speed Full</td><td style="padding:4px 6px;">{truck_data['speed_loaded']} km/h</td></tr>
-                            <tr><td style="padding:4px 6px;">Travel 1</td><td style="padding:4px 6px;">{travel_time_loaded:.1f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Speed Empty</td><td style="padding:4px 6px;">{truck_data['speed_empty']} km/h</td></tr>
-                            <tr><td style="padding:4px 6px;">Travel 2</td><td style="padding:4px 6px;">{travel_time_empty:.1f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Maneuver</td><td style="padding:4px 6px;">{maneuver_time:.1f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Dumping</td><td style="padding:4px 6px;">{dumping_time:.1f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Loading Cycle Truck</td><td style="padding:4px 6px;">{loading_cycle_truck_min:.1f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Ritase</td><td style="padding:4px 6px;">{60/total_cycle_time_min:.1f} trip/h</td></tr>
-                            <tr><td style="padding:4px 6px;">Cycle Time</td><td style="padding:4px 6px;">{total_cycle_time_min:.0f} min</td></tr>
-                            <tr><td style="padding:4px 6px;">Operator Eff</td><td style="padding:4px 6px;">92%</td></tr>
-                            <tr><td style="padding:4px 6px;">Job Condition</td><td style="padding:4px 6px;">{job_condition}</td></tr>
-                            <tr><td style="padding:4px 6px;">Productivity (bcm/h)</td><td style="padding:4px 6px;">{truck_prod_bcm_per_unit:.0f}</td></tr>
-                            <tr><td style="padding:4px 6px;">Productivity (ton/h)</td><td style="padding:4px 6px;">{truck_prod_ton_per_unit:.0f}</td></tr>
-                        </tbody>
-                    </table>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    with right_sidebar_col:
+        render_detail_cards(
+            scenario, selected_excavator, selected_truck, selected_material,
+            excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time
+        )
 
-    # Section: Rekomendasi Optimasi + Database + Export (PASTIKAN INI MASIH DI DALAM with main_col:)
-    # Perbaiki rekomendasi optimasi (sekitar baris 740-745)
-    
-    # Tambahkan sub judul
-    st.subheader("🎯 Rekomendasi Optimal")
-    
-    # PERBAIKAN: Gunakan fungsi calculate_optimal_trucks_for_mf1 untuk MF tepat 1.0
-    optimal_trucks_exact = calculate_optimal_trucks_for_mf1(
-        excavator_data, truck_data, material_data, haul_distance, job_condition, reposition_time
+    render_recommendation(scenario)
+    render_monte_carlo(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time)
+    render_sensitivity(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                       reposition_time, theme)
+    render_goal_seek(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition,
+                     reposition_time)
+    render_cost_frontier(
+        selected_excavator, selected_truck, selected_material, scenario, haul_distance, num_trucks, job_condition,
+        reposition_time, truck_data['speed_loaded'], truck_data['speed_empty'], theme
     )
-    
-    # Gunakan ROUNDUP (pembulatan ke atas) untuk rekomendasi
-    optimal_trucks_rounded = int(np.ceil(optimal_trucks_exact))
-    result_optimal = calculate_match_factor(
-        excavator_data, truck_data, material_data, haul_distance, optimal_trucks_rounded, job_condition, reposition_time
+    render_queue_simulation(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time)
+    render_mixed_fleet(
+        selected_excavator, selected_truck, material_data, haul_distance, job_condition,
+        reposition_time, truck_data['speed_loaded'], truck_data['speed_empty']
     )
-    
-    # Tampilkan rekomendasi dengan roundup
-    st.success(f"🎯 **Jumlah truck optimal (MF=1.0):** {optimal_trucks_rounded} unit")
-    st.info(f"📊 **Detail perhitungan:**")
-    st.info(f"   • Nilai eksak: {optimal_trucks_exact:.2f} truck")
-    st.info(f"   • Setelah roundup: {optimal_trucks_rounded} truck")
-    st.info(f"   • MF aktual dengan {optimal_trucks_rounded} truck: {result_optimal['match_factor']:.2f}")
-    
-    # Produktivitas per truck dengan jumlah optimal
-    st.success(f"📈 **Produktivitas per truck:** {result_optimal['productivity_per_truck_tons']:.0f} ton/h = {result_optimal['productivity_per_truck_bcm']:.0f} bcm/h")
-    st.success(f"📈 **Produktivitas total fleet:** {result_optimal['productivity_tons']:.0f} ton/h = {result_optimal['productivity']:.0f} bcm/h")
-    
-    # Hapus baris produktivitas total fleet
- 
-    col1, col2 = st.columns([1,35])  # Kolom untuk ikon dan teks, sesuaikan rasio jika perlu
-    with col1:
-        st.image('data-mining.svg', width=35)
-    with col2:
-        st.subheader("Ringkasan Equipment Database")
-    tab1, tab2, tab3 = st.tabs(["Excavators", "Trucks", "Materials"])
-    
-    with tab1:
-        exc_df = pd.DataFrame.from_dict(EXCAVATORS, orient='index')
-        st.dataframe(exc_df, use_container_width=True)
-    
-    with tab2:
-        truck_df = pd.DataFrame.from_dict(TRUCKS, orient='index')
-        st.dataframe(truck_df, use_container_width=True)
-    
-    with tab3:
-        mat_df = pd.DataFrame.from_dict(MATERIALS, orient='index')
-        st.dataframe(mat_df, use_container_width=True)
-    
-    st.subheader("💾 Export Data")
-    
-    if st.button("📥 Download Analysis Data (CSV)"):
-        export_data = {
-            'Excavator': [selected_excavator] * len(df_trucks),
-            'Truck': [selected_truck] * len(df_trucks),
-            'Material': [selected_material] * len(df_trucks),
-            'Haul_Distance_km': [haul_distance] * len(df_trucks),
-            'Job_Condition': [job_condition] * len(df_trucks),
-            'Num_Trucks': df_trucks['trucks'],
-            'Match_Factor': df_trucks['match_factor'],
-            'Total_Fleet_Productivity_BCM': df_trucks['productivity'],
-            'Total_Fleet_Productivity_Tons': df_trucks['productivity_tons'],
-            'Per_Truck_Productivity_BCM': df_trucks['productivity_per_truck_bcm'],
-            'Per_Truck_Productivity_Tons': df_trucks['productivity_per_truck_tons'],
-            'Efficiency_Status': df_trucks['status'],
-            'MF_Difference_from_Optimal': df_trucks['mf_diff']
-        }
-        
-        export_df = pd.DataFrame(export_data)
-        csv = export_df.to_csv(index=False)
-        
-        st.download_button(
-            label="📄 Download CSV",
-            data=csv,
-            file_name=f"match_factor_analysis_{selected_excavator.replace(' ', '_')}_{selected_truck.replace(' ', '_')}.csv",
-            mime="text/csv"
-        )
-
-    # Cycle Time Breakdown
-    st.markdown("### ⏱️ Cycle Time Breakdown")
-    
-    # Gunakan variabel dari sidebar untuk konsistensi
-    # Asumsikan travel_time_loaded, travel_time_empty sudah didefinisikan dalam menit di sidebar
-    # Jika tidak, definisikan ulang:
-    travel_time_loaded = (haul_distance / truck_data['speed_loaded']) * 60  # menit, sama seperti card
-    travel_time_empty = (haul_distance / truck_data['speed_empty']) * 60    # menit
-    dumping_time = 1.4  # menit, sinkron dengan calculate_match_factor
-    maneuver_time = 0.7  # menit (spotting/maneuver), sinkron
-    loading_time_min = loading_cycle_truck_min  
-    reposition_time_min = reposition_time / 60  # tambahkan ini
-    
-    total_cycle_time_min = loading_time_min + travel_time_loaded + dumping_time + travel_time_empty + maneuver_time + reposition_time_min
-    
-    df_times = pd.DataFrame({
-        'component': [
-            'Loading Time',
-            'Travel Time (Loaded)',
-            'Dumping Time',
-            'Travel Time (Empty)',
-            'Maneuver/Spotting',
-            'Reposition Time'  # tambahkan ini
-        ],
-        'minutes': [
-            loading_time_min,
-            travel_time_loaded,
-            dumping_time,
-            travel_time_empty,
-            maneuver_time,
-            reposition_time_min
-        ]
-    })
-    df_times['percent'] = (df_times['minutes'] / total_cycle_time_min) * 100
-    
-    bottom_col1, bottom_col2 = st.columns(2)
-    
-    with bottom_col1:
-        fig3 = px.bar(
-            df_times.sort_values('minutes', ascending=True),
-            x='minutes',
-            y='component',
-            orientation='h',
-            title='Durasi Per Komponen (menit)',
-            labels={'minutes': 'Menit', 'component': ''},
-            text='minutes',
-            template='plotly_white'
-        )
-        fig3.update_traces(marker_color='#6366F1', texttemplate='%{text:.1f}', textposition='outside')
-        fig3.update_layout(
-            height=380,
-            margin=dict(l=40, r=40, t=40, b=40),
-            paper_bgcolor=paper_bg,
-            plot_bgcolor=plot_bg,
-            font=dict(color=font_color, size=12),
-            title=dict(font=dict(color=title_color, size=14)),
-            xaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color), gridcolor='rgba(255,255,255,0.1)'),
-            yaxis=dict(title_font=dict(color=title_color), tickfont=dict(color=font_color), gridcolor='rgba(255,255,255,0.1)')
-        )
-        st.plotly_chart(fig3, use_container_width=True)
-    
-    with bottom_col2:
-            # Konversi data untuk polar chart
-            N = len(df_times)
-            theta = np.linspace(0.0, 2 * np.pi, N, endpoint=False)
-            radii = df_times['percent'].values
-            
-            # Buat polar chart menggunakan plotly
-            fig4 = go.Figure()
-            
-            # Tambahkan trace terpisah untuk setiap komponen agar legenda detail muncul
-            colors = ['#6366F1', '#22C55E', '#EAB308', '#EF4444', '#A855F7', '#8B5CF6']
-            for i, (comp, pct, color) in enumerate(zip(df_times['component'], df_times['percent'], colors)):
-                fig4.add_trace(go.Barpolar(
-                    r=[pct],
-                    theta=[theta[i] * 180 / np.pi],
-                    width=[360/N],
-                    marker=dict(color=color, line=dict(width=0)),  # Hilangkan border
-                    name=comp,  # Nama detail untuk legenda
-                    hovertemplate=f'<b>{comp}</b><br>Persentase: %{{r:.1f}}%<br>Waktu: {df_times.iloc[i]["minutes"]:.1f} menit<extra></extra>',
-                    showlegend=True
-                ))
-            
-            fig4.update_layout(
-                title='Kontribusi Waktu per Komponen (%)',
-                height=380,
-                margin=dict(l=40, r=40, t=40, b=40),
-                paper_bgcolor=paper_bg,
-                plot_bgcolor=plot_bg,
-                font=dict(color=font_color, size=12),
-                title_font=dict(color=title_color, size=14),
-                showlegend=True,
-                legend=dict(
-                    orientation='v',
-                    yanchor='middle',
-                    y=0.5,
-                    xanchor='left',
-                    x=1.05,
-                    font=dict(color=font_color, size=10),
-                    bgcolor='rgba(0,0,0,0)',  # Transparent background
-                    bordercolor='rgba(0,0,0,0)',  # No border
-                    borderwidth=0,  # No border width
-                    itemsizing='constant',  # Ukuran item legenda konsisten
-                    itemwidth=30  # Lebar area warna di legenda
-                ),
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, max(radii) * 1.1],
-                        tickfont=dict(color=font_color, size=10),
-                        gridcolor='rgba(128,128,128,0.3)',
-                        ticksuffix='%'
-                    ),
-                    angularaxis=dict(
-                        tickfont=dict(color=font_color, size=10),
-                        gridcolor='rgba(128,128,128,0.3)',
-                        linecolor='rgba(128,128,128,0.5)',
-                        tickmode='array',
-                        tickvals=theta * 180 / np.pi,
-                        ticktext=df_times['component']
-                    ),
-                    bgcolor=plot_bg
-                )
-            )
-            
-            st.plotly_chart(fig4, use_container_width=True)
+    render_catalog_sweep(job_condition, reposition_time, truck_data['speed_loaded'], truck_data['speed_empty'])
+    render_live_monitor(excavator_data, truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time)
+    render_database_tabs()
+    render_export(scenario['df_trucks'], selected_excavator, selected_truck, selected_material, excavator_data,
+                  truck_data, material_data, haul_distance, num_trucks, job_condition, reposition_time)
+    render_cycle_time_breakdown(scenario, truck_data, haul_distance, reposition_time, theme)
 
 # Di akhir file, hanya:
 if __name__ == "__main__":
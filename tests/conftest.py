@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from match_factor_engine import CYCLE_TIME_CSV, EQUIPMENT_CSV, apply_job_efficiency, load_equipment_tables
+
+
+@pytest.fixture(scope='session')
+def catalog():
+    """Shipped catalog parsed without the NPZ cache: (excavators, trucks, materials, job_conditions)"""
+    tables = load_equipment_tables(EQUIPMENT_CSV, CYCLE_TIME_CSV)
+    apply_job_efficiency(tables[3])
+    return tables
@@ -0,0 +1,118 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from match_factor_engine import TruckAllocator
+
+
+def _random_allocator(catalog, rng, n_loaders, n_types, max_units):
+    excavators, trucks, materials, _ = catalog
+    loaders = [
+        {'loader_id': f'L{i}', 'excavator': rng.choice(excavators.index),
+         'haul_distance': float(rng.uniform(0.5, 8.0)), 'availability': float(rng.uniform(0.6, 1.0))}
+        for i in range(n_loaders)
+    ]
+    names = rng.choice(trucks.index, n_types, replace=False)
+    pool = {name: int(rng.integers(1, max_units + 1)) for name in names}
+    return TruckAllocator(excavators, trucks, loaders, pool, material_data=materials.iloc[0])
+
+
+def _brute_force_total(allocator):
+    """Optimum by enumerating every split of every truck type over the loaders"""
+    n_loaders, n_types = allocator.rate.shape
+    per_type = [
+        [c for c in itertools.product(range(allocator.pool[j] + 1), repeat=n_loaders) if sum(c) <= allocator.pool[j]]
+        for j in range(n_types)
+    ]
+    best = 0.0
+    for combo in itertools.product(*per_type):
+        alloc = np.array(combo).T
+        best = max(best, np.minimum((alloc * allocator.rate).sum(axis=1), allocator.cap).sum())
+    return best
+
+
+def _fresh(allocator, catalog):
+    excavators, trucks, materials, _ = catalog
+    fresh = TruckAllocator(excavators, trucks, allocator.loaders, dict(zip(allocator.truck_names, allocator.pool)),
+                           material_data=materials.iloc[0])
+    fresh.solve()
+    return fresh
+
+
+def _check_feasible(allocator):
+    assert (allocator.alloc >= 0).all()
+    assert (allocator.alloc.sum(axis=0) <= allocator.pool).all()
+    np.testing.assert_allclose(allocator.uncapped, (allocator.alloc * allocator.rate).sum(axis=1))
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_single_type_allocation_is_optimal(catalog, seed):
+    allocator = _random_allocator(catalog, np.random.default_rng(seed), n_loaders=4, n_types=1, max_units=10)
+    allocator.solve()
+    _check_feasible(allocator)
+    assert allocator.total_productivity() == pytest.approx(_brute_force_total(allocator), rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_mixed_pool_allocation_is_near_optimal(catalog, seed):
+    allocator = _random_allocator(catalog, np.random.default_rng(100 + seed), n_loaders=3, n_types=2, max_units=5)
+    allocator.solve()
+    _check_feasible(allocator)
+    optimum = _brute_force_total(allocator)
+    assert optimum * 0.97 <= allocator.total_productivity() <= optimum * (1 + 1e-9)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_incremental_resolve_matches_fresh_solve(catalog, seed):
+    rng = np.random.default_rng(200 + seed)
+    single = _random_allocator(catalog, rng, n_loaders=6, n_types=1, max_units=30)
+    mixed = _random_allocator(catalog, rng, n_loaders=6, n_types=3, max_units=15)
+    for allocator in (single, mixed):
+        allocator.solve()
+        allocator.update_loader('L1', haul_distance=float(rng.uniform(0.5, 8.0)), availability=0.7)
+        allocator.set_pool(allocator.truck_names[0], int(rng.integers(0, 20)))
+        allocator.update_loader('L4', haul_distance=float(rng.uniform(0.5, 8.0)))
+        _check_feasible(allocator)
+    # Satu tipe truck: greedy + perpindahan optimal, jadi hasil inkremental sama persis
+    assert single.total_productivity() == pytest.approx(_fresh(single, catalog).total_productivity(), rel=1e-9)
+    # Pool campuran: keduanya optimum lokal dari heuristik yang sama
+    assert mixed.total_productivity() == pytest.approx(_fresh(mixed, catalog).total_productivity(), rel=0.01)
+
+
+def test_set_pool_shrink_releases_trucks(catalog):
+    allocator = _random_allocator(catalog, np.random.default_rng(5), n_loaders=5, n_types=2, max_units=20)
+    allocator.solve()
+    name = allocator.truck_names[1]
+    allocator.set_pool(name, 1)
+    _check_feasible(allocator)
+    assert allocator.alloc[:, 1].sum() <= 1
+
+
+def test_invalid_updates_are_rejected(catalog):
+    allocator = _random_allocator(catalog, np.random.default_rng(6), n_loaders=3, n_types=2, max_units=5)
+    allocator.solve()
+    with pytest.raises(KeyError, match='pool'):
+        allocator.set_pool('Bukan Truck', 3)
+    with pytest.raises(ValueError):
+        allocator.set_pool(allocator.truck_names[0], -1)
+    with pytest.raises(ValueError):
+        allocator.set_pool(allocator.truck_names[0], 2.5)
+    with pytest.raises(KeyError, match='Loader'):
+        allocator.update_loader('PIT-X', haul_distance=2.0)
+    assert list(allocator.loaders.index) == ['L0', 'L1', 'L2']
+
+
+@pytest.mark.parametrize('update', [
+    {'haul_distance': -1.0}, {'haul_distance': 0.0}, {'haul_distance': float('nan')},
+    {'availability': -0.2}, {'availability': 0.0}, {'availability': float('nan')}, {'availability': 1.5},
+    {'haul_distance': 3.0, 'availability': 0.0},
+])
+def test_update_loader_rejects_invalid_values(catalog, update):
+    allocator = _random_allocator(catalog, np.random.default_rng(7), n_loaders=3, n_types=2, max_units=5)
+    allocator.solve()
+    before = allocator.allocation_frame()
+    with pytest.raises(ValueError):
+        allocator.update_loader('L1', **update)
+    pd.testing.assert_frame_equal(allocator.allocation_frame(), before)
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import match_factor_engine
+from match_factor_engine import CYCLE_TIME_CSV, EQUIPMENT_CSV, load_equipment_tables, load_equipment_tables_cached
+
+
+@pytest.fixture
+def sources(tmp_path):
+    equipment = tmp_path / 'catalog.csv'
+    cycle_time = tmp_path / 'cycle.csv'
+    shutil.copy(EQUIPMENT_CSV, equipment)
+    shutil.copy(CYCLE_TIME_CSV, cycle_time)
+    return str(equipment), str(cycle_time), str(tmp_path / 'catalog.npz')
+
+
+def _assert_same_tables(left, right):
+    for a, b in zip(left, right):
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_categorical=False)
+
+
+def test_cache_round_trip_matches_parse(sources):
+    equipment, cycle_time, cache = sources
+    first = load_equipment_tables_cached(equipment, cycle_time, cache)
+    assert os.path.exists(cache)
+    _assert_same_tables(load_equipment_tables_cached(equipment, cycle_time, cache), first)
+    _assert_same_tables(first, load_equipment_tables(equipment, cycle_time))
+
+
+def test_cache_invalidated_when_source_changes(sources):
+    equipment, cycle_time, cache = sources
+    before = load_equipment_tables_cached(equipment, cycle_time, cache)[1]
+    with open(equipment, encoding='latin-1') as f:
+        text = f.read()
+    with open(equipment, 'w', encoding='latin-1', newline='') as f:
+        f.write(text.replace('HD785-7,Truck,91', 'HD785-7,Truck,93', 1))
+    after = load_equipment_tables_cached(equipment, cycle_time, cache)[1]
+    assert before.loc['HD785-7', 'capacity'] == 91
+    assert after.loc['HD785-7', 'capacity'] == 93
+
+
+def test_touched_but_identical_source_reuses_cache(sources, monkeypatch):
+    equipment, cycle_time, cache = sources
+    expected = load_equipment_tables_cached(equipment, cycle_time, cache)
+    stat = os.stat(equipment)
+    os.utime(equipment, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("catalog re-parsed although content is unchanged")
+
+    monkeypatch.setattr(match_factor_engine, 'load_equipment_tables', no_parse)
+    _assert_same_tables(load_equipment_tables_cached(equipment, cycle_time, cache), expected)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('plotly')
+
+from streamlit_match_factor import (
+    CHART_MAX_POINTS, WEBGL_MIN_POINTS, build_productivity_distance_figure, minmax_downsample,
+)
+
+THEME = {'paper_bg': '#ffffff', 'plot_bg': '#ffffff', 'font_color': '#000000', 'title_color': '#000000'}
+
+
+def _bucket_extrema(values, n_buckets):
+    n = len(values)
+    bucket = np.arange(n) * n_buckets // n
+    return [(values[bucket == b].min(), values[bucket == b].max()) for b in range(n_buckets)]
+
+
+@pytest.mark.parametrize('n', [CHART_MAX_POINTS + 1, 6_001, 50_000])
+def test_minmax_downsample_keeps_extrema(n):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0.0, 30.0, n))
+    y = rng.normal(size=n)
+    y[rng.integers(n)] = 25.0  # spike tunggal harus tetap terlihat
+    y[rng.integers(n)] = -25.0
+    df = pd.DataFrame({'x': x, 'y': y}).sample(frac=1.0, random_state=0)
+
+    out = minmax_downsample(df, 'x', 'y')
+
+    assert len(out) <= CHART_MAX_POINTS + 2
+    assert out['y'].max() == y.max() and out['y'].min() == y.min()
+    assert out['x'].iloc[0] == x[0] and out['x'].iloc[-1] == x[-1]
+    assert out['x'].is_monotonic_increasing
+    # Setiap bucket menyumbang min dan max-nya sendiri
+    values = df.sort_values('x', kind='stable')['y'].to_numpy()
+    expected = {v for pair in _bucket_extrema(values, CHART_MAX_POINTS // 2) for v in pair}
+    assert expected <= set(out['y'].to_numpy())
+
+
+def test_minmax_downsample_leaves_small_series_untouched():
+    df = pd.DataFrame({'x': np.arange(20), 'y': np.arange(20.0)[::-1]})
+    assert minmax_downsample(df, 'x', 'y') is df
+
+
+@pytest.mark.parametrize('n, trace_type', [(30, 'scatter'), (WEBGL_MIN_POINTS + 1, 'scattergl'),
+                                           (25_000, 'scattergl')])
+def test_distance_figure_switches_to_webgl_and_decimates_long_series(n, trace_type):
+    distance = np.linspace(0.5, 15.0, n)
+    df = pd.DataFrame({'distance': distance, 'productivity': np.sin(distance) * 100.0 + 500.0})
+    trace = build_productivity_distance_figure(df, 4.5, THEME).data[0]
+    assert trace.type == trace_type
+    # Seri pendek dikirim utuh; seri panjang dipangkas ke batas titik
+    assert len(trace.x) == n if n <= CHART_MAX_POINTS else len(trace.x) <= CHART_MAX_POINTS + 2
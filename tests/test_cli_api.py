@@ -0,0 +1,122 @@
+import http.client
+import json
+import socket
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import match_factor_cli
+from match_factor_engine import CYCLE_TIME_CSV, EQUIPMENT_CSV, calculate_match_factor, score_scenarios
+
+SCENARIOS = pd.DataFrame({
+    'excavator': ['R9300', 'R9300', 'PC 2000', 'Tidak Ada'],
+    'truck': ['HD785-7', 'Cat 785C', 'HD785-7', 'HD785-7'],
+    'material': ['Clay', 'Clay', 'Clay', 'Clay'],
+    'haul_distance': [4.5, 2.0, 7.5, 3.0],
+    'num_trucks': [10, 6, 12, 5],
+    'job_condition': ['Average', 'Good', 'Poor', 'Average'],
+})
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_cli_round_trip(tmp_path, catalog, extension):
+    source, target = tmp_path / f'in.{extension}', tmp_path / f'out.{extension}'
+    if extension == 'csv':
+        SCENARIOS.to_csv(source, index=False)
+    else:
+        SCENARIOS.to_json(source, orient='records', lines=True)
+    argv = [str(source), '-o', str(target), '--chunksize', '2', '--catalog', EQUIPMENT_CSV,
+            '--cycle-time-csv', CYCLE_TIME_CSV]
+    assert match_factor_cli.main(argv) == 0
+    scored = pd.read_csv(target) if extension == 'csv' else pd.read_json(target, lines=True)
+    expected = score_scenarios(SCENARIOS, *catalog[:3])
+    assert list(scored.columns) == list(expected.columns)
+    np.testing.assert_allclose(scored['match_factor'], expected['match_factor'], rtol=1e-9, equal_nan=True)
+    assert scored['efficiency_status'].tolist() == expected['efficiency_status'].tolist()
+
+
+@pytest.fixture(scope='module')
+def api_server():
+    pytest.importorskip('starlette')
+    pytest.importorskip('uvicorn')
+    from match_factor_api import start_local_server
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = start_local_server('127.0.0.1', port, EQUIPMENT_CSV, CYCLE_TIME_CSV)
+    assert server.started
+    yield port
+    server.should_exit = True
+
+
+def _post(port, path, payload):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('POST', path, json.dumps(payload), {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_api_single_and_batch_round_trip(api_server, catalog):
+    excavators, trucks, materials, _ = catalog
+    record = SCENARIOS.iloc[0].to_dict()
+    status, body = _post(api_server, '/match-factor', record)
+    assert status == 200
+    expected = calculate_match_factor(
+        excavators.loc['R9300'].to_dict(), trucks.loc['HD785-7'].to_dict(), materials.loc['Clay'].to_dict(), 4.5, 10
+    )
+    assert body['match_factor'] == pytest.approx(expected['match_factor'], rel=1e-12)
+
+    status, body = _post(api_server, '/match-factor/batch', SCENARIOS.to_dict(orient='list'))
+    assert status == 200
+    assert body['n'] == len(SCENARIOS) and body['unknown'] == 1
+    expected = score_scenarios(SCENARIOS, excavators, trucks, materials)['match_factor'].to_numpy()
+    got = np.array([np.nan if v is None else v for v in body['columns']['match_factor']])
+    np.testing.assert_allclose(got, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_api_rejects_bad_requests(api_server):
+    status, _ = _post(api_server, '/match-factor', dict(SCENARIOS.iloc[3].to_dict()))
+    assert status == 404
+    status, body = _post(api_server, '/match-factor/batch', {'excavator': ['R9300']})
+    assert status == 400 and 'error' in body
+
+
+def _post_raw(port, path, body, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.putrequest('POST', path)
+        for key, value in headers.items():
+            conn.putheader(key, value)
+        conn.endheaders()
+        if body:
+            conn.send(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_api_rejects_oversized_batch_before_parsing(api_server, monkeypatch):
+    import match_factor_api
+
+    # Content-Length di atas batas: 413 tanpa menunggu (atau membaca) body sama sekali
+    status, body = _post_raw(api_server, '/match-factor/batch', b'',
+                             {'Content-Type': 'application/json',
+                              'Content-Length': str(match_factor_api.MAX_BATCH_BYTES + 1)})
+    assert status == 413 and 'error' in body
+    # Body chunked tanpa Content-Length dihitung saat dibaca
+    monkeypatch.setattr(match_factor_api, 'MAX_BATCH_BYTES', 64)
+    payload = json.dumps(SCENARIOS.to_dict(orient='list')).encode()
+    chunked = b''.join(b'%x\r\n%s\r\n' % (len(part), part) for part in (payload[:50], payload[50:])) + b'0\r\n\r\n'
+    status, _ = _post_raw(api_server, '/match-factor/batch', chunked,
+                          {'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'})
+    assert status == 413
+    monkeypatch.undo()
+    # Jumlah skenario dicek sebelum frame dibangun
+    monkeypatch.setattr(match_factor_api, 'MAX_BATCH_SCENARIOS', len(SCENARIOS) - 1)
+    status, body = _post(api_server, '/match-factor/batch', SCENARIOS.to_dict(orient='list'))
+    assert status == 413 and str(len(SCENARIOS) - 1) in body['error']
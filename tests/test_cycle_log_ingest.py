@@ -0,0 +1,104 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cycle_log_ingest import (
+    FIELD_OWNER,
+    LOG_FIELDS,
+    ingest_cycle_logs,
+    load_log_state,
+    write_calibrated_cycle_time,
+)
+from match_factor_engine import CYCLE_TIME_CSV, EQUIPMENT_CSV, load_equipment_tables
+
+
+def _write_log(path, seed, n=400):
+    rng = np.random.default_rng(seed)
+    diggers = rng.choice(['R9300', 'Kom. PC200 C', 'Digger Baru'], n, p=[0.6, 0.05, 0.35])
+    log = pd.DataFrame({
+        'Excavator': diggers,
+        'Truck': rng.choice(['HD785-7', 'Cat 785C'], n),
+        'Swing_Cycle': rng.normal(np.where(diggers == 'R9300', 31.0, 18.0), 2.0).round(2),
+        'Eff': rng.uniform(0.7, 0.95, n).round(3),
+        'Loaded_Speed': rng.normal(24.0, 3.0, n).round(1),
+        'Empty_Speed': rng.normal(33.0, 3.0, n).round(1),
+    })
+    # Record rusak: nilai kosong, negatif dan nama kosong dilewati
+    log['Swing_Cycle'] = log['Swing_Cycle'].astype(object)
+    log.loc[:4, 'Swing_Cycle'] = [np.nan, -3.0, 0.0, 'x', 25.0]
+    log.loc[5, 'Excavator'] = ''
+    log.to_csv(path, index=False)
+    return log
+
+
+def _hist(state):
+    return {field: state['hist'][field].copy() for field in LOG_FIELDS}
+
+
+def _by_model(state):
+    """Histograms keyed by (field, model); row order depends on ingestion order"""
+    return {(field, name): state['hist'][field][i].tolist()
+            for field, owner in FIELD_OWNER.items() for i, name in enumerate(state['models'][owner])}
+
+
+def test_chunked_ingestion_matches_single_chunk(tmp_path):
+    log = _write_log(tmp_path / 'day1.csv', seed=1)
+    whole, _ = ingest_cycle_logs([tmp_path / 'day1.csv'], str(tmp_path / 'whole.npz'), chunksize=10**6)
+    chunked, _ = ingest_cycle_logs([tmp_path / 'day1.csv'], str(tmp_path / 'chunked.npz'), chunksize=7)
+    assert _by_model(chunked) == _by_model(whole)
+
+    cycle = pd.to_numeric(log['Swing_Cycle'], errors='coerce')
+    valid = (cycle > 0) & (log['Excavator'] != '')
+    assert whole['hist']['cycle_time'].sum() == valid.sum()
+    assert whole['hist']['speed_loaded'].sum() == len(log)
+    assert sorted(whole['models']['digger']) == ['Digger Baru', 'Kom. PC200 C', 'R9300']
+    # State tersimpan memuat histogram yang sama
+    assert _by_model(load_log_state(str(tmp_path / 'chunked.npz'))) == _by_model(whole)
+
+
+def test_duplicate_files_are_skipped_by_content_hash(tmp_path):
+    state_path = str(tmp_path / 'state.npz')
+    _write_log(tmp_path / 'day1.csv', seed=1)
+    _write_log(tmp_path / 'day2.csv', seed=2)
+    shutil.copy(tmp_path / 'day1.csv', tmp_path / 'day1_copy.csv')
+
+    first, ingested = ingest_cycle_logs([tmp_path / 'day1.csv'], state_path)
+    assert ingested == [tmp_path / 'day1.csv']
+    before = _hist(first)
+    again, ingested = ingest_cycle_logs([tmp_path / 'day1.csv', tmp_path / 'day1_copy.csv'], state_path)
+    assert ingested == [] and len(again['files']) == 1
+    for field in LOG_FIELDS:
+        np.testing.assert_array_equal(again['hist'][field], before[field])
+
+    # File baru digabung ke histogram lama: sama dengan kedua file diproses sekaligus
+    merged, ingested = ingest_cycle_logs([tmp_path / 'day2.csv'], state_path)
+    assert ingested == [tmp_path / 'day2.csv'] and len(merged['files']) == 2
+    both, _ = ingest_cycle_logs([tmp_path / 'day1.csv', tmp_path / 'day2.csv'], str(tmp_path / 'both.npz'))
+    assert _by_model(merged) == _by_model(both)
+
+
+def test_calibrated_table_uses_medians_with_enough_samples(tmp_path):
+    log = _write_log(tmp_path / 'day1.csv', seed=3)
+    state, _ = ingest_cycle_logs([tmp_path / 'day1.csv'], str(tmp_path / 'state.npz'))
+    output = tmp_path / 'calibrated.csv'
+    table = write_calibrated_cycle_time(state, str(output), CYCLE_TIME_CSV, min_samples=50,
+                                        truck_output_path=str(tmp_path / 'trucks.csv'))
+
+    base = pd.read_csv(CYCLE_TIME_CSV, encoding='utf-8-sig').set_index('Digger')
+    cycle = pd.to_numeric(log['Swing_Cycle'], errors='coerce')
+    r9300 = cycle[(log['Excavator'] == 'R9300') & (cycle > 0)]
+    width = LOG_FIELDS['cycle_time'][2]
+    assert table.loc['R9300', 'Cycle_time_n'] == len(r9300) >= 50
+    assert table.loc['R9300', 'Cycle_time'] == pytest.approx(r9300.median(), abs=width)
+    # PC200 di bawah min_samples dan digger tanpa log tetap memakai nilai dasar
+    assert 0 < table.loc['Kom. PC200 C', 'Cycle_time_n'] < 50
+    assert table.loc['Kom. PC200 C', 'Cycle_time'] == base.loc['Kom. PC200 C', 'Cycle_time']
+    assert table.loc['Kom. PC300-7', 'Cycle_time'] == base.loc['Kom. PC300-7', 'Cycle_time']
+    assert table.attrs['unmatched'] == ['Digger Baru']
+    assert sorted(pd.read_csv(tmp_path / 'trucks.csv')['Truck']) == ['Cat 785C', 'HD785-7']
+
+    # Loader katalog membaca tabel terkalibrasi seperti tabel dasar
+    excavators = load_equipment_tables(EQUIPMENT_CSV, str(output))[0]
+    assert excavators.loc['R9300', 'cycle_time'] == pytest.approx(table.loc['R9300', 'Cycle_time'])
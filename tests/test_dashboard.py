@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_match_factor.py')
+
+
+@pytest.fixture(scope='module')
+def app():
+    at = AppTest.from_file(APP, default_timeout=180)
+    at.run()
+    return at
+
+
+def test_dashboard_renders_without_exceptions(app):
+    assert not app.exception
+    assert [m.label for m in app.metric][:1] == ['Match Factor']
+
+
+def test_sidebar_change_reruns_cleanly(app):
+    app.sidebar.slider[0].set_value(6.0).run()
+    assert not app.exception
+
+
+def _chart_trace_types(app):
+    return [trace.get('type') for chart in app.get('plotly_chart') for trace in json.loads(chart.proto.spec)['data']]
+
+
+def test_heatmap_is_computed_only_when_enabled(app):
+    assert 'heatmap' not in _chart_trace_types(app)
+    next(t for t in app.toggle if t.label == "Tampilkan heatmap").set_value(True).run()
+    assert not app.exception
+    assert 'heatmap' in _chart_trace_types(app)
+
+
+def _chart_titles(app):
+    return [json.loads(chart.proto.spec)['layout'].get('title', {}).get('text') for chart in app.get('plotly_chart')]
+
+
+def test_sensitivity_is_computed_only_when_enabled(app):
+    assert 'Tornado Match Factor' not in _chart_titles(app)
+    next(t for t in app.toggle if t.label == "Hitung sensitivitas").set_value(True).run()
+    assert not app.exception
+    assert 'Tornado Match Factor' in _chart_titles(app)
+
+
+def test_goal_seek_is_computed_only_when_enabled(app):
+    assert not any(m.label.endswith(' tercapai') for m in app.metric)
+    next(t for t in app.toggle if t.label == "Hitung goal seek").set_value(True).run()
+    assert not app.exception
+    assert any(m.label == 'Match Factor tercapai' for m in app.metric)
+
+
+def test_cost_frontier_is_computed_only_when_enabled(app):
+    title = 'Pareto Frontier: Biaya per BCM vs Produktivitas'
+    assert title not in _chart_titles(app)
+    assert any(m.label == 'Biaya per BCM' for m in app.metric)
+    next(t for t in app.toggle if t.label == "Tampilkan Pareto frontier").set_value(True).run()
+    assert not app.exception
+    assert title in _chart_titles(app)
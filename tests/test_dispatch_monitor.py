@@ -0,0 +1,110 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from dispatch_monitor import LiveMatchFactorMonitor, start_background_monitor, tail_file
+
+
+def _cycle_lines(n_cycles, loader='EX-01', trucks=('DT-1', 'DT-2', 'DT-3')):
+    lines, ts = [], 1_717_200_000.0
+    for _ in range(n_cycles):
+        for truck in trucks:
+            lines.append(json.dumps({'ts': ts, 'event': 'arrive', 'truck': truck, 'loader': loader}))
+            ts += 150.0
+            lines.append(json.dumps({'ts': ts, 'event': 'load', 'truck': truck, 'loader': loader}))
+            ts += 30.0
+            lines.append(f"{ts},dump,{truck}")
+    return lines
+
+
+async def _tail_until(path, monitor, expected, read_size):
+    stop = asyncio.Event()
+    task = asyncio.create_task(tail_file(path, monitor, from_start=True, poll_interval=0.01, stop=stop,
+                                         read_size=read_size))
+    for _ in range(500):
+        if monitor.stats()['accepted'] + monitor.stats()['rejected'] >= expected:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await task
+
+
+def test_tail_file_reads_in_bounded_chunks(tmp_path):
+    lines = _cycle_lines(20)
+    path = tmp_path / 'dispatch.log'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    chunked = LiveMatchFactorMonitor()
+    asyncio.run(_tail_until(path, chunked, len(lines), read_size=97))  # potong di tengah baris
+    whole = LiveMatchFactorMonitor()
+    whole.process_lines(lines)
+
+    assert chunked.stats() == whole.stats()
+    assert chunked.stats()['accepted'] == len(lines) and chunked.stats()['rejected'] == 0
+    assert chunked.snapshot().equals(whole.snapshot())
+
+
+def test_tail_file_drops_overlong_line(tmp_path):
+    lines = _cycle_lines(2)
+    path = tmp_path / 'dispatch.log'
+    path.write_text('\n'.join(lines[:3] + ['x' * 5000] + lines[3:]) + '\n', encoding='utf-8')
+
+    monitor = LiveMatchFactorMonitor()
+    asyncio.run(_tail_until(path, monitor, len(lines) + 1, read_size=256))
+
+    assert monitor.stats()['accepted'] == len(lines)
+    assert monitor.stats()['rejected'] == 1
+
+
+def test_accepted_and_rejected_are_counted_separately():
+    monitor = LiveMatchFactorMonitor()
+    monitor.process_lines(['1,arrive,DT-1,EX-01', '2,load,DT-1', 'garbage', '3,load,DT-1,EX-01', ''])
+    stats = monitor.stats()
+    assert (stats['accepted'], stats['rejected']) == (2, 2)
+
+
+def test_set_window_shrinks_in_place():
+    monitor = LiveMatchFactorMonitor(window_seconds=24 * 3600.0)
+    monitor.process_lines(_cycle_lines(40))
+    loads = monitor.snapshot().loc['EX-01', 'loads']
+    monitor.set_window(900.0)
+    assert monitor.window_seconds == 900.0
+    assert monitor.snapshot().loc['EX-01', 'loads'] < loads
+
+
+def test_background_monitor_reports_bind_failure():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        sock.listen()
+        port = sock.getsockname()[1]
+        with pytest.raises(OSError):
+            start_background_monitor(port=port)
+
+
+def test_snapshot_values_for_known_feed(catalog):
+    # Tiap truck: 150 s loading, 30 s haul + dump, 360 s kembali -> siklus 540 s tanpa antre
+    monitor = LiveMatchFactorMonitor(window_seconds=24 * 3600.0)
+    monitor.process_lines(_cycle_lines(10))
+    row = monitor.snapshot().loc['EX-01']
+    assert (row['active_trucks'], row['loads']) == (3, 30)
+    assert row['loading_time'] == pytest.approx(150.0 / 3600.0)
+    assert row['queue_time'] == 0.0
+    assert row['haul_loaded_time'] == pytest.approx(30.0 / 3600.0)
+    assert row['haul_empty_time'] == pytest.approx(360.0 / 3600.0)
+    assert row['cycle_time'] == pytest.approx(540.0 / 3600.0)
+    assert row['match_factor'] == pytest.approx(3 * 150.0 / 540.0)
+
+    excavators, trucks, materials, _ = catalog
+    plan = monitor.set_plan(excavators.loc['R9300'].to_dict(), trucks.loc['HD785-7'].to_dict(),
+                            materials.loc['Clay'].to_dict(), 4.5, 10)
+    row = monitor.snapshot().loc['EX-01']
+    assert row['plan_match_factor'] == plan['match_factor']
+    assert row['mf_deviation'] == pytest.approx(3 * 150.0 / 540.0 - plan['match_factor'])
+
+    # Jendela 1 jam: hanya load dengan ts >= event terakhir - 3600 s yang tersisa
+    monitor.set_window(3600.0)
+    row = monitor.snapshot().loc['EX-01']
+    assert (row['loads'], row['loads_per_hour']) == (20, 20.0)
+    assert row['match_factor'] == pytest.approx(3 * 150.0 / 540.0)
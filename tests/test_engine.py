@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from match_factor_engine import (
+    BucketPassFitMatrix,
+    calculate_match_factor,
+    calculate_match_factor_batch,
+    catalog_columns,
+    catalog_to_dicts,
+    EXCAVATOR_FIELDS,
+    MATERIAL_FIELDS,
+    TRUCK_FIELDS,
+    finite_source_queue,
+    goal_seek_batch,
+    run_parallel_sweep,
+    sensitivity_catalog,
+    sweep_equipment_catalog,
+)
+
+BATCH_KEYS = ('match_factor', 'productivity', 'productivity_tons', 'productivity_per_truck_bcm',
+              'productivity_per_truck_tons', 'loading_time', 'total_cycle_time', 'job_efficiency')
+
+
+@pytest.mark.parametrize('haul_distance, num_trucks, job_condition, reposition_time', [
+    (0.5, 1, 'Average', 20),
+    (4.5, 10, 'Good', 0),
+    (12.0, 35, 'Poor', 45),
+])
+def test_batch_matches_scalar_across_catalog(catalog, haul_distance, num_trucks, job_condition, reposition_time):
+    excavators, trucks, materials, _ = catalog
+    exc_names, exc_cols = catalog_columns(excavators, EXCAVATOR_FIELDS)
+    truck_names, truck_cols = catalog_columns(trucks, TRUCK_FIELDS)
+    mat_names, mat_cols = catalog_columns(materials, MATERIAL_FIELDS)
+    batch = calculate_match_factor_batch(
+        {k: v[:, None, None] for k, v in exc_cols.items()},
+        {k: v[None, :, None] for k, v in truck_cols.items()},
+        {k: v[None, None, :] for k, v in mat_cols.items()},
+        haul_distance, num_trucks, job_condition, reposition_time
+    )
+    exc_dicts, truck_dicts, mat_dicts = (catalog_to_dicts(table) for table in (excavators, trucks, materials))
+    expected = {key: np.empty(batch['match_factor'].shape) for key in BATCH_KEYS}
+    for e, exc in enumerate(exc_names):
+        for t, truck in enumerate(truck_names):
+            for m, material in enumerate(mat_names):
+                scalar = calculate_match_factor(
+                    exc_dicts[exc], truck_dicts[truck], mat_dicts[material],
+                    haul_distance, num_trucks, job_condition, reposition_time
+                )
+                for key in BATCH_KEYS:
+                    expected[key][e, t, m] = scalar[key]
+    for key in BATCH_KEYS:
+        np.testing.assert_allclose(batch[key], expected[key], rtol=1e-12, equal_nan=True, err_msg=key)
+
+
+def test_finite_source_queue_matches_closed_form(catalog):
+    excavators, trucks, materials, _ = catalog
+    exc, truck, mat = (excavators.loc['R9300'].to_dict(), trucks.loc['HD785-7'].to_dict(),
+                       materials.loc['Clay'].to_dict())
+    queue = finite_source_queue(exc, truck, mat, 4.5, 6)
+    base = calculate_match_factor(exc, truck, mat, 4.5, 1)
+    service = base['loading_time']
+    ratio = service / (base['total_cycle_time'] - service)
+    for n in range(1, 7):
+        # M/M/1//N: p0 = 1 / sum_k N!/(N-k)! r^k
+        terms = [np.prod(np.arange(n - k + 1, n + 1)) * ratio ** k for k in range(n + 1)]
+        p0 = 1.0 / sum(terms)
+        assert queue['loader_utilisation'][n - 1] == pytest.approx(1.0 - p0, rel=1e-12)
+        assert queue['throughput'][n - 1] == pytest.approx((1.0 - p0) / service, rel=1e-12)
+
+
+def test_sensitivity_catalog_empty_catalog_keeps_columns(catalog):
+    excavators, trucks, materials, _ = catalog
+    full = sensitivity_catalog(excavators.iloc[:1], trucks.iloc[:2], materials.iloc[:1], haul_distance=3.0)
+    empty = sensitivity_catalog(excavators.iloc[:0], trucks, materials, haul_distance=3.0)
+    assert empty.empty
+    assert list(empty.columns) == list(full.columns)
+    numeric = full.select_dtypes('number').columns
+    assert empty[numeric].dtypes.equals(full[numeric].dtypes)
+
+
+def test_bucket_pass_goal_seek_returns_catalog_truck(catalog):
+    excavators, trucks, materials, _ = catalog
+    fit = BucketPassFitMatrix(excavators, trucks, materials)
+    excavator, material = 'R9300', materials.index[0]
+    excavator_data = catalog_to_dicts(excavators)[excavator]
+    material_data = catalog_to_dicts(materials)[material]
+    truck_data = catalog_to_dicts(trucks)['HD785-7']
+    solved = goal_seek_batch(excavator_data, truck_data, material_data, np.array([1.0, 3.0, 6.0]), 8,
+                             'bucket_pass', 1.0, trucks=trucks)
+    for i, name in enumerate(solved['truck']):
+        if name is None:
+            continue
+        assert solved['truck_bucket_pass'][i] == fit.fit(excavator, name, material)['bucket_pass']
+        assert solved['truck_capacity'][i] == trucks.loc[name, 'capacity']
+        real = calculate_match_factor(excavator_data, dict(truck_data, capacity=trucks.loc[name, 'capacity']),
+                                      material_data, [1.0, 3.0, 6.0][i], 8)
+        assert real['match_factor'] >= 1.0
+        assert real['match_factor'] == pytest.approx(solved['truck_achieved'][i], rel=1e-12)
+    assert any(name is not None for name in solved['truck'])
+
+
+SWEEP_COLUMNS = {'Match_Factor': 'match_factor', 'Total_Fleet_Productivity_BCM': 'productivity',
+                 'Total_Fleet_Productivity_Tons': 'productivity_tons',
+                 'Per_Truck_Productivity_BCM': 'productivity_per_truck_bcm'}
+
+
+def test_sweep_matches_scalar_and_ranks_top_n(catalog):
+    excavators, trucks, materials, _ = catalog
+    args = (excavators.iloc[:4], trucks.iloc[:5], materials.iloc[:2], [1.5, 6.0], [3, 8, 20], ('Average', 'Poor'))
+    full = sweep_equipment_catalog(*args, mf_min=0.0, mf_max=np.inf, top_n=10**6, chunk_size=7)
+    assert len(full) == 4 * 5 * 2 * 2 * 3 * 2
+
+    exc_dicts, truck_dicts, mat_dicts = (catalog_to_dicts(table) for table in args[:3])
+    for row in full.itertuples(index=False):
+        scalar = calculate_match_factor(exc_dicts[row.Excavator], truck_dicts[row.Truck], mat_dicts[row.Material],
+                                        row.Haul_Distance_km, row.Num_Trucks, row.Job_Condition)
+        for column, key in SWEEP_COLUMNS.items():
+            assert getattr(row, column) == pytest.approx(scalar[key], rel=1e-12), column
+    assert full['Total_Fleet_Productivity_BCM'].is_monotonic_decreasing
+
+    # Top-N per blok kecil = N teratas dari ranking penuh yang lolos filter MF
+    top = sweep_equipment_catalog(*args, top_n=5, chunk_size=7)
+    feasible = full[full['Match_Factor'].between(1.0, 1.2)]
+    assert len(top) == min(5, len(feasible)) > 0
+    pd.testing.assert_frame_equal(top, feasible.head(5).reset_index(drop=True))
+
+
+def test_parallel_sweep_is_independent_of_workers_and_resumes(catalog, tmp_path):
+    excavators, trucks, materials, _ = catalog
+    args = (excavators.iloc[:3], trucks.iloc[:4], materials.iloc[:2], [2.0, 7.5], [4, 9, 15], [20.0, 26.0], [18.0],
+            [10, 30])
+    kwargs = dict(job_conditions=('Good', 'Poor'), shard_size=61, mf_min=0.6, mf_max=1.4)
+    serial = run_parallel_sweep(*args, checkpoint_dir=str(tmp_path / 'serial'), max_workers=1, **kwargs)
+    pooled = run_parallel_sweep(*args, checkpoint_dir=str(tmp_path / 'pooled'), max_workers=3, **kwargs)
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(serial, pooled)
+
+    row = serial.iloc[len(serial) // 2]
+    truck = dict(catalog_to_dicts(trucks)[row['Truck']], speed_loaded=row['Speed_Loaded_kmh'],
+                 speed_empty=row['Speed_Empty_kmh'])
+    scalar = calculate_match_factor(catalog_to_dicts(excavators)[row['Excavator']], truck,
+                                    catalog_to_dicts(materials)[row['Material']], row['Haul_Distance_km'],
+                                    row['Num_Trucks'], row['Job_Condition'], row['Reposition_Time_s'])
+    assert row['Match_Factor'] == pytest.approx(scalar['match_factor'], rel=1e-12)
+
+    # Resume: shard yang hilang dihitung ulang, grid lain di folder yang sama ditolak
+    (tmp_path / 'pooled' / 'shard_000001.npz').unlink()
+    pd.testing.assert_frame_equal(
+        run_parallel_sweep(*args, checkpoint_dir=str(tmp_path / 'pooled'), max_workers=2, **kwargs), serial)
+    with pytest.raises(ValueError):
+        run_parallel_sweep(*args[:3], [3.0], *args[4:], checkpoint_dir=str(tmp_path / 'pooled'), **kwargs)
@@ -0,0 +1,92 @@
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+import match_factor_export
+from match_factor_engine import iter_catalog_sweep
+from match_factor_export import export_chunks
+
+
+def _read(path, fmt):
+    if fmt == 'csv.gz':
+        with gzip.open(path, 'rt') as fh:
+            return pd.read_csv(fh)
+    pa = pytest.importorskip('pyarrow')
+    if fmt == 'parquet':
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(path).to_pandas()
+    import pyarrow.ipc
+    with pa.memory_map(str(path)) as source:
+        return pyarrow.ipc.open_file(source).read_all().to_pandas()
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow', 'csv.gz'])
+def test_filtered_out_sweep_writes_empty_file_with_columns(catalog, tmp_path, fmt):
+    if fmt != 'csv.gz':
+        pytest.importorskip('pyarrow')
+    excavators, trucks, materials, _ = catalog
+    chunks = iter_catalog_sweep(excavators.iloc[:3], trucks.iloc[:3], materials.iloc[:1], [1.0, 2.0], [1, 2],
+                                mf_min=1e6, chunk_size=4)
+    path = tmp_path / f'empty.{fmt}'
+    result = export_chunks(chunks, path, fmt)
+
+    full = next(iter_catalog_sweep(excavators.iloc[:1], trucks.iloc[:1], materials.iloc[:1], [1.0], [1]))
+    frame = _read(path, fmt)
+    assert result['rows'] == 0 and len(frame) == 0
+    assert list(frame.columns) == list(full.columns)
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'csv.gz'])
+def test_no_chunks_uses_schema_or_raises(tmp_path, fmt):
+    if fmt != 'csv.gz':
+        pytest.importorskip('pyarrow')
+    path = tmp_path / f'none.{fmt}'
+    with pytest.raises(ValueError):
+        export_chunks(iter(()), path, fmt)
+    assert not path.exists()
+
+    schema = pd.DataFrame({'draw': pd.Series(dtype='int64'), 'match_factor': pd.Series(dtype='float32')})
+    export_chunks(iter(()), path, fmt, schema=schema)
+    assert list(_read(path, fmt).columns) == ['draw', 'match_factor']
+
+
+def test_purge_export_dir_by_age_and_size(tmp_path):
+    pytest.importorskip('streamlit')
+    from streamlit_match_factor import purge_export_dir
+
+    now = 1_000_000.0
+    for name, age, size in [('old', 7200, 10), ('mid', 600, 40), ('new', 60, 40)]:
+        path = tmp_path / name
+        path.write_bytes(b'x' * size)
+        os.utime(path, (now - age, now - age))
+
+    assert purge_export_dir(str(tmp_path), max_age=3600, max_total_bytes=100, now=now) == 1
+    assert sorted(os.listdir(tmp_path)) == ['mid', 'new']
+    assert purge_export_dir(str(tmp_path), max_age=3600, max_total_bytes=50, now=now) == 1
+    assert os.listdir(tmp_path) == ['new']
+    assert purge_export_dir(str(tmp_path / 'missing')) == 0
+
+
+@pytest.mark.parametrize('extra', [['--mf-min', '1e6'], ['--min-distance', '5', '--max-distance', '1']])
+def test_cli_sweep_without_rows_writes_empty_file(tmp_path, extra):
+    path = tmp_path / 'sweep.csv.gz'
+    assert match_factor_export.main(['sweep', '-o', str(path), '--max-trucks', '2'] + extra) == 0
+    frame = _read(path, 'csv.gz')
+    assert len(frame) == 0 and 'Match_Factor' in frame.columns
+
+
+def test_cli_monte_carlo_rejects_unknown_equipment(tmp_path, capsys):
+    path = tmp_path / 'draws.csv.gz'
+    with pytest.raises(SystemExit) as exc:
+        match_factor_export.main(['monte-carlo', '-o', str(path), '--excavator', 'R9300', '--truck', 'Bukan Truck',
+                                  '--material', 'Clay'])
+    assert exc.value.code == 2
+    assert "--truck 'Bukan Truck'" in capsys.readouterr().err
+    assert not path.exists()
+
+    assert match_factor_export.main(['monte-carlo', '-o', str(path), '--excavator', 'R9300', '--truck', 'HD785-7',
+                                     '--material', 'Clay', '--draws', '0']) == 0
+    frame = _read(path, 'csv.gz')
+    assert len(frame) == 0 and len(frame.columns) > 0
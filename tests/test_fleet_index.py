@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from fleet_index import FleetLookupIndex, build_fleet_index
+from match_factor_engine import calculate_optimal_trucks_for_mf1
+
+
+@pytest.fixture(scope='module')
+def index(catalog, tmp_path_factory):
+    excavators, trucks, materials, _ = catalog
+    path = tmp_path_factory.mktemp('index') / 'fleet_index.bin'
+    build_fleet_index(excavators, trucks, materials, str(path))
+    return FleetLookupIndex(str(path))
+
+
+def _scenarios(catalog, n=40, seed=0):
+    excavators, trucks, materials, _ = catalog
+    rng = np.random.default_rng(seed)
+    return [(rng.choice(excavators.index), rng.choice(trucks.index), rng.choice(materials.index),
+             float(rng.uniform(0.5, 15.0)), float(rng.choice([10, 20, 35])), float(rng.choice([0.85, 0.9])))
+            for _ in range(n)]
+
+
+@pytest.mark.parametrize('model, rtol', [('ratio', 1e-12), ('queue', 2e-5)])
+def test_index_matches_engine(catalog, index, model, rtol):
+    excavators, trucks, materials, _ = catalog
+    scenarios = _scenarios(catalog)
+    expected = np.array([
+        calculate_optimal_trucks_for_mf1(excavators.loc[e].to_dict(), trucks.loc[t].to_dict(), materials.loc[m].to_dict(),
+                                         d, reposition_time=r, model=model, target_utilisation=u)
+        for e, t, m, d, r, u in scenarios
+    ])
+    single = np.array([index.optimal_trucks(e, t, m, d, reposition_time=r, model=model, target_utilisation=u)
+                       for e, t, m, d, r, u in scenarios])
+    e, t, m, d, r, u = (np.array(column) for column in zip(*scenarios))
+    batch = np.concatenate([
+        index.optimal_trucks_batch(e[u == target], t[u == target], m[u == target], d[u == target],
+                                   reposition_time=r[u == target], model=model, target_utilisation=target)
+        for target in (0.85, 0.9)
+    ])
+    batch_expected = np.concatenate([expected[u == target] for target in (0.85, 0.9)])
+    assert np.isfinite(expected).all()
+    np.testing.assert_allclose(single, expected, rtol=rtol)
+    np.testing.assert_allclose(batch, batch_expected, rtol=rtol)
+
+
+def test_index_built_with_default_digest_is_fresh(index):
+    assert index.header['source_digest']
+    assert not index.is_stale()
+    assert index.is_stale(equipment_path='bukan-katalog.csv')
+
+
+def test_unknown_names_give_nan_in_batch(index):
+    excavator = index.header['excavators'][0]
+    truck = index.header['trucks'][0]
+    result = index.optimal_trucks_batch([excavator, 'Bukan Excavator'], truck, index.header['materials'][0], 3.0)
+    assert np.isfinite(result[0]) and np.isnan(result[1])
+    with pytest.raises(KeyError):
+        index.optimal_trucks('Bukan Excavator', truck, index.header['materials'][0], 3.0)
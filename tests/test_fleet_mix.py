@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+from match_factor_engine import catalog_to_dicts, mixed_fleet_match_factor, search_fleet_mix
+
+LOADERS = ['R9300', 'PC 2000']
+TRUCKS = ['HD785-7', 'Cat 785C', 'HD773E']
+
+
+def _brute_force(excavators, trucks, material, target, max_loaders, max_trucks, mf_max, unit_cost):
+    """Every loader mix x truck mix within the limits, scored with mixed_fleet_match_factor"""
+    rows, evaluated = [], 0
+    for loader_counts in itertools.product(range(max_loaders + 1), repeat=len(LOADERS)):
+        if not 1 <= sum(loader_counts) <= max_loaders:
+            continue
+        for truck_counts in itertools.product(range(max_trucks + 1), repeat=len(TRUCKS)):
+            if sum(truck_counts) > max_trucks:
+                continue
+            evaluated += 1
+            res = mixed_fleet_match_factor(excavators, trucks, material, 4.0, dict(zip(LOADERS, loader_counts)),
+                                           dict(zip(TRUCKS, truck_counts)))
+            if res['productivity'] < target - 1e-9 or res['match_factor'] > mf_max + 1e-9:
+                continue
+            cost = sum(c * unit_cost[name] for name, c in zip(LOADERS + TRUCKS, loader_counts + truck_counts))
+            rows.append((cost, abs(res['match_factor'] - 1.0)))
+    return sorted(rows), evaluated
+
+
+@pytest.mark.parametrize('target, unit_cost', [
+    (800.0, None),
+    (800.0, {'R9300': 9.0, 'PC 2000': 4.0, 'HD785-7': 1.3, 'Cat 785C': 1.5, 'HD773E': 1.0}),
+    (1100.0, {'R9300': 9.0, 'PC 2000': 4.0, 'HD785-7': 1.3, 'Cat 785C': 1.5, 'HD773E': 1.0}),
+])
+def test_branch_and_bound_matches_brute_force(catalog, target, unit_cost):
+    excavators, trucks, materials, _ = catalog
+    excavators, trucks = excavators.loc[LOADERS], trucks.loc[TRUCKS]
+    material = catalog_to_dicts(materials)['Clay']
+    found = search_fleet_mix(excavators, trucks, material, 4.0, target, max_loaders=2, max_trucks=9,
+                             unit_cost=unit_cost, top_n=4)
+    expected, evaluated = _brute_force(excavators, trucks, material, target, 2, 9, 1.2,
+                                       unit_cost or dict.fromkeys(LOADERS + TRUCKS, 1.0))
+    assert len(expected) >= 4
+    assert found['Cost'].tolist() == pytest.approx([cost for cost, _ in expected[:4]])
+    assert (found['Match_Factor'] - 1.0).abs().tolist() == pytest.approx([dev for _, dev in expected[:4]])
+    assert found.attrs['nodes_explored'] < evaluated
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import match_factor_engine
+from match_factor_engine import (
+    add_fleet_costs,
+    catalog_hourly_costs,
+    cost_pareto_frontier,
+    iter_catalog_sweep,
+    pareto_front,
+)
+
+
+def _brute_force_front(objectives):
+    """O(n^2) reference: finite rows not dominated by any finite row; exact duplicates keep the first"""
+    finite = np.isfinite(objectives).all(axis=1)
+    front = []
+    for i in np.flatnonzero(finite):
+        others = objectives[finite]
+        index = np.flatnonzero(finite)
+        weakly = (others <= objectives[i]).all(axis=1)
+        strictly = (others < objectives[i]).any(axis=1)
+        duplicate_before = (others == objectives[i]).all(axis=1) & (index < i)
+        if not (weakly & (strictly | duplicate_before)).any():
+            front.append(i)
+    return np.array(front, dtype=np.int64)
+
+
+def _random_objectives(rng, n, dims, levels):
+    """Integer grid values (many ties and duplicate rows) plus some NaN / inf rows"""
+    values = rng.integers(0, levels, size=(n, dims)).astype(float)
+    values[rng.random(n) < 0.05, rng.integers(dims)] = np.nan
+    values[rng.random(n) < 0.02, rng.integers(dims)] = np.inf
+    return values
+
+
+@pytest.mark.parametrize('dims', [2, 3])
+@pytest.mark.parametrize('n, levels', [(1, 5), (2, 1), (60, 4), (500, 12), (2000, 40)])
+def test_pareto_front_matches_brute_force(dims, n, levels):
+    rng = np.random.default_rng(n * 10 + dims)
+    objectives = _random_objectives(rng, n, dims, levels)
+    np.testing.assert_array_equal(np.sort(pareto_front(objectives)), _brute_force_front(objectives))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_pareto_front_pivot_screen_matches_brute_force(monkeypatch, seed):
+    # Sampel pivot kecil supaya penyaringan pivot ikut teruji pada n kecil
+    monkeypatch.setattr(match_factor_engine, 'PARETO_PIVOT_SAMPLE', 16)
+    monkeypatch.setattr(match_factor_engine, 'PARETO_MAX_PIVOTS', 5)
+    rng = np.random.default_rng(seed)
+    objectives = _random_objectives(rng, 1500, 3, 25)
+    objectives[:, 2] += rng.random(1500) * (seed % 2)  # sebagian tanpa seri di objektif ketiga
+    np.testing.assert_array_equal(np.sort(pareto_front(objectives)), _brute_force_front(objectives))
+
+
+def test_pareto_front_rejects_bad_shape():
+    with pytest.raises(ValueError):
+        pareto_front(np.zeros((4, 4)))
+
+
+def _costs(catalog):
+    excavators, trucks, _, _ = catalog
+    return (catalog_hourly_costs(excavators, default=excavators['bucket_capacity'] * 25.0),
+            catalog_hourly_costs(trucks, default=trucks['capacity'] * 1.5))
+
+
+def test_chunked_cost_frontier_matches_unchunked(catalog):
+    excavators, trucks, materials, _ = catalog
+    excavator_costs, truck_costs = _costs(catalog)
+    args = (excavators.iloc[:6], trucks.iloc[:8], materials.iloc[:2], [2.0, 5.0], np.arange(1, 16))
+    kwargs = dict(excavator_costs=excavator_costs, truck_costs=truck_costs, mf_min=0.5, mf_max=1.5)
+
+    whole = cost_pareto_frontier(*args, chunk_size=10_000_000, **kwargs)
+    chunked = cost_pareto_frontier(*args, chunk_size=37, **kwargs)
+
+    assert len(whole) > 0
+    assert whole.attrs == chunked.attrs
+    key = ['Excavator', 'Truck', 'Material', 'Haul_Distance_km', 'Num_Trucks', 'Job_Condition']
+    pd.testing.assert_frame_equal(whole.sort_values(key).reset_index(drop=True),
+                                  chunked.sort_values(key).reset_index(drop=True))
+    # Referensi O(n^2) atas seluruh baris sweep (urutan grid sama, jadi duplikat memilih baris yang sama)
+    rows = add_fleet_costs(pd.concat(iter_catalog_sweep(*args, mf_min=0.5, mf_max=1.5), ignore_index=True),
+                           excavator_costs, truck_costs)
+    objectives = np.column_stack([rows['Cost_per_BCM'], -rows['Total_Fleet_Productivity_BCM'], rows['MF_Deviation']])
+    expected = rows.iloc[_brute_force_front(objectives)]
+    pd.testing.assert_frame_equal(whole.sort_values(key).reset_index(drop=True),
+                                  expected.sort_values(key).reset_index(drop=True), check_like=True)
+
+
+def test_cost_frontier_requires_costs_on_both_sides(catalog):
+    excavators, trucks, materials, _ = catalog
+    excavator_costs, truck_costs = _costs(catalog)
+    args = (excavators.iloc[:2], trucks.iloc[:2], materials.iloc[:1], [3.0], [4, 8])
+    with pytest.raises(ValueError, match='excavator'):
+        cost_pareto_frontier(*args, excavator_costs=excavator_costs * np.nan, truck_costs=truck_costs)
+    with pytest.raises(ValueError, match='truck'):
+        cost_pareto_frontier(*args, excavator_costs=excavator_costs, truck_costs=truck_costs * np.nan)
@@ -0,0 +1,36 @@
+import pytest
+
+from match_factor_engine import DES_COMPONENTS, simulate_shift
+
+# Siklus deterministik 25 menit: muat 5 menit, 20 menit di luar loader
+COMPONENTS = {'loading': 5.0, 'travel_loaded': 8.0, 'dumping': 2.0, 'travel_empty': 8.0, 'spotting': 2.0}
+NO_VARIATION = dict.fromkeys(DES_COMPONENTS, 0.0)
+
+
+def test_over_trucked_shift_accounts_for_every_truck():
+    result = simulate_shift(COMPONENTS, num_trucks=12, shift_hours=10.0, cv=NO_VARIATION)
+    # Loader sibuk terus sejak t=0: muatan ke-k mulai 5k, k = 0..119
+    assert result['loads'] == 120
+    assert result['dumped_loads'] == 118
+    assert result['loader_utilisation'] == pytest.approx(1.0)
+    # Muatan k >= 115 kembali pada/setelah t=600 (5 truck di siklus), sisanya masih antre
+    assert result['queued_at_end'] == 7
+    # Menit-truck sejak start berstagger = antre + muat + di luar loader (dipotong di akhir shift)
+    truck_minutes = sum(600.0 - i * 25.0 / 12 for i in range(12))
+    loading_minutes = 120 * 5.0
+    away_minutes = 116 * 20.0 + 15.0 + 10.0 + 5.0
+    assert result['truck_queue_hours'] * 60.0 == pytest.approx(truck_minutes - loading_minutes - away_minutes)
+
+
+def test_under_trucked_shift_has_no_queue():
+    result = simulate_shift(COMPONENTS, num_trucks=3, shift_hours=10.0, cv=NO_VARIATION)
+    assert result['queued_at_end'] == 0
+    assert result['truck_queue_hours'] == 0.0
+    assert result['loader_utilisation'] == pytest.approx(result['loads'] * 5.0 / 600.0)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_queued_trucks_never_exceed_fleet(seed):
+    result = simulate_shift(COMPONENTS, num_trucks=9, shift_hours=8.0, seed=seed)
+    assert 0 <= result['queued_at_end'] < 9
+    assert result['truck_queue_hours'] * 60.0 >= result['queue_time_min'] * result['loads'] - 1e-9